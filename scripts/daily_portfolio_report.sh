@@ -11,5 +11,5 @@ if [ -f "venv/bin/activate" ]; then
 fi
 
 # Run daily portfolio report
-python -m portfolio.daily_report
+python -m src.portfolio.daily_report
 
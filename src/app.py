@@ -2,11 +2,18 @@ import os
 import csv
 import time
 import sys
+import asyncio
 from datetime import datetime, timezone
 
+import pandas as pd
 import requests
 from dotenv import load_dotenv
 
+from data.bootstrap import bootstrap_intraday
+from data.collector import FINNHUB_URL, FinnhubClient, LiveCollector
+from data.rollups import RollupStore
+from data.tick_store import TickStore, migrate_csv
+
 
 def get_aapl_price_finnhub(api_key: str) -> float:
     url = "https://finnhub.io/api/v1/quote"
@@ -21,65 +28,21 @@ def get_aapl_price_finnhub(api_key: str) -> float:
     return float(price)
 
 
+def to_iso_utc(ts: pd.Series) -> pd.Series:
+    """Vectorized ISO-8601 UTC strings ("2026-01-08T14:30:00+00:00"), same format as the live collector."""
+    return ts.dt.tz_convert("UTC").dt.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
 def bootstrap_history_yahoo(symbol: str = "AAPL"):
     """
     Bootstraps intraday history from Yahoo Finance via yfinance.
-    Tries to get a lot of points:
-      - 1m over 7d (max intraday depth)
-      - fallback: 5m over 30d
+    1m bars stitched over ~30 days (7-day windows), completed with 5m bars.
     Returns list of (timestamp_iso_utc, close_price).
     """
-    import yfinance as yf
-
-    tries = [
-        {"interval": "1m", "period": "7d"},
-        {"interval": "5m", "period": "30d"},
-    ]
-
-    last_err = None
-    for t in tries:
-        try:
-            df = yf.download(
-                tickers=symbol,
-                period=t["period"],
-                interval=t["interval"],
-                progress=False,
-                auto_adjust=False,
-                prepost=True,
-                threads=False,
-            )
-            if df is None or df.empty:
-                raise RuntimeError(f"Yahoo returned empty df for {t}")
-
-            # handle Close column (usually "Close")
-            if "Close" not in df.columns:
-                raise RuntimeError(f"Close column not found. columns={df.columns}")
-
-            s = df["Close"].dropna()
-            if s.empty:
-                raise RuntimeError("Close series empty after dropna().")
-
-            idx = s.index
-            if getattr(idx, "tz", None) is None:
-                idx = idx.tz_localize("UTC")
-            else:
-                idx = idx.tz_convert("UTC")
-
-            rows = []
-            for dt, close in zip(idx, s.values):
-                dt_iso = dt.to_pydatetime().replace(tzinfo=timezone.utc).isoformat(timespec="seconds")
-                rows.append((dt_iso, float(close)))
-
-            if len(rows) < 100:
-                raise RuntimeError(f"Too few points ({len(rows)}) for {t}, trying fallback...")
-
-            return rows
-
-        except Exception as e:
-            last_err = e
-            continue
-
-    raise RuntimeError(f"Yahoo history failed after fallbacks: {last_err}")
+    hist = bootstrap_intraday([symbol]).get(symbol.upper())
+    if hist is None or len(hist) < 100:
+        raise RuntimeError(f"Yahoo history failed: {0 if hist is None else len(hist)} points for {symbol}")
+    return list(zip(to_iso_utc(hist["timestamp_utc"]), hist["price"].astype(float)))
 
 
 
@@ -98,6 +61,8 @@ def main():
     data_dir = os.path.join(BASE_DIR, "data")
     os.makedirs(data_dir, exist_ok=True)
     csv_path = os.path.join(data_dir, "aapl_prices.csv")
+    store = TickStore(os.path.join(data_dir, "ticks"))
+    rollups = RollupStore(os.path.join(data_dir, "rollups"))
 
     # mode CLI
     mode = sys.argv[1].lower() if len(sys.argv) >= 2 else "once"
@@ -108,13 +73,95 @@ def main():
 
     # MODE HISTORY : Yahoo (pas besoin de FINNHUB_API_KEY) ----
     if mode == "history":
-        rows = bootstrap_history_yahoo("AAPL")  # <= c'est ça le changement clé
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["timestamp_utc", "price"])
-            for dt, p in rows:
-                writer.writerow([dt, p])
-        print(f"[OK] Yahoo history written: {len(rows)} points -> {csv_path}")
+        symbols = (sys.argv[2] if len(sys.argv) >= 3 else "AAPL").split(",")
+        histories = bootstrap_intraday(symbols)
+        if not histories:
+            raise RuntimeError(f"Yahoo history failed for {symbols}")
+
+        for symbol, hist in histories.items():
+            store.replace(symbol, hist["timestamp_utc"], hist["price"])
+            rollups.rebuild(store, symbol)
+            n_1m = int((hist["source"] == "1m").sum())
+            print(f"[OK] {symbol}: {len(hist)} points ({n_1m} en 1m, {len(hist) - n_1m} en 5m, {int(hist['gap'].sum())} trous) -> {store.root}")
+
+        if "AAPL" in histories:
+            # CSV (scripts/daily_report.sh) écrit d'un bloc, sans boucle ligne à ligne
+            aapl = histories["AAPL"]
+            pd.DataFrame({"timestamp_utc": to_iso_utc(aapl["timestamp_utc"]), "price": aapl["price"]}).to_csv(csv_path, index=False)
+            print(f"[OK] Yahoo history written: {len(aapl)} points -> {csv_path}")
+        return
+
+    # MODE MIGRATE : import one-shot du CSV existant dans le tick store ----
+    if mode == "migrate":
+        n = migrate_csv(csv_path, store, "AAPL")
+        rollups.rebuild(store, "AAPL")
+        print(f"[OK] {n} points migrés {csv_path} -> {store.root}")
+        return
+
+    # MODE STRATEGY : Quant A sans dashboard (même moteur, mêmes métriques) ----
+    # python src/app.py strategy [periodicity] [window] [fee_bps]
+    if mode == "strategy":
+        from strategy.engine import PriceData, StrategyEngine
+
+        periodicity = sys.argv[2] if len(sys.argv) >= 3 else "Raw"
+        window = int(sys.argv[3]) if len(sys.argv) >= 4 else 20
+        fee_bps = float(sys.argv[4]) if len(sys.argv) >= 5 else 0.0
+
+        engine = StrategyEngine(PriceData(BASE_DIR, "AAPL"))
+        if len(engine.series(periodicity)) < max(10, window + 2):
+            raise RuntimeError(f"Pas assez de points ({engine.data.source}, périodicité {periodicity}, N={window})")
+        res = engine.run(periodicity, window, fee_bps)
+        print(res.metrics_df.to_string())
+        print(f"[OK] {len(res.s)} points, position actuelle={int(res.position.iloc[-1])} ({engine.data.source})")
+        return
+
+    # MODE PRECOMPUTE : recalcule en arrière-plan les vues par défaut dès que de nouvelles données arrivent ----
+    # python src/app.py precompute [poll_seconds]
+    if mode == "precompute":
+        from precompute import Precomputer, default_jobs
+
+        poll_s = float(sys.argv[2]) if len(sys.argv) >= 3 else float(os.getenv("PRECOMPUTE_POLL_SECONDS", "5"))
+        pre = Precomputer(default_jobs(BASE_DIR, "AAPL"))
+        print(f"[INFO] precompute {len(pre.jobs)} vues toutes les {poll_s:g}s -> {pre.store.root}")
+        try:
+            pre.run_forever(poll_s)
+        except KeyboardInterrupt:
+            pass
+        print(f"[INFO] {pre.passes} passes, {pre.computed} vues recalculées, {pre.errors} erreurs")
+        return
+
+    # MODE STREAM : trades temps réel via WebSocket (STREAM_URL = stand-in local éventuel) ----
+    if mode == "stream":
+        from data.stream import FINNHUB_WS_URL, StreamIngestor
+
+        symbols = (sys.argv[2] if len(sys.argv) >= 3 else os.getenv("COLLECT_SYMBOLS", "AAPL")).split(",")
+        url = os.getenv("STREAM_URL")
+        if not url:
+            api_key = os.getenv("FINNHUB_API_KEY")
+            if not api_key:
+                raise RuntimeError("FINNHUB_API_KEY introuvable (ou définir STREAM_URL pour un flux local).")
+            url = f"{FINNHUB_WS_URL}?token={api_key}"
+
+        def sink(batch):
+            # Pas de miroir CSV ici : au niveau tick il grossirait sans limite
+            for symbol, (ts_ns, prices) in batch.items():
+                ts = pd.to_datetime(ts_ns, utc=True)
+                store.append(symbol, ts, prices)
+                rollups.update(store, symbol, set(ts.date))
+            print(f"[OK] {sum(len(p) for _, p in batch.values())} ticks écrits ({', '.join(batch)})")
+
+        ingestor = StreamIngestor(
+            url, symbols, sink,
+            batch_size=int(os.getenv("STREAM_BATCH_SIZE", "5000")),
+            flush_interval=float(os.getenv("STREAM_FLUSH_SECONDS", "5")),
+        )
+        print(f"[INFO] stream {','.join(ingestor.symbols)} <- {url.split('?')[0]}")
+        try:
+            asyncio.run(ingestor.run())
+        except KeyboardInterrupt:
+            pass
+        st = ingestor.stats
+        print(f"[INFO] {st.ticks} ticks, {st.reconnects} reconnexions, {st.ticks_per_sec:,.0f} ticks/s, {ingestor.buffer.dropped} perdus")
         return
 
     # MODE ONCE / LOOP : Finnhub (clé obligatoire ici) ----
@@ -125,10 +172,42 @@ def main():
             "FINNHUB_API_KEY=TA_CLE_ICI"
         )
 
+    # MODE COLLECT : poller longue durée multi-symboles (asyncio + session HTTP poolée) ----
+    if mode == "collect":
+        symbols = (sys.argv[2] if len(sys.argv) >= 3 else os.getenv("COLLECT_SYMBOLS", "AAPL")).split(",")
+        interval = float(os.getenv("COLLECT_INTERVAL", "300"))
+
+        def sink(batch):
+            for symbol, ticks in batch.items():
+                store.append(symbol, [ts for ts, _ in ticks], [p for _, p in ticks])
+                rollups.update(store, symbol, {datetime.fromisoformat(ts).date() for ts, _ in ticks})
+                if symbol == "AAPL":
+                    for ts, p in ticks:
+                        append_to_csv(csv_path, ts, p)
+            print(f"[OK] {sum(len(t) for t in batch.values())} ticks écrits ({', '.join(batch)})")
+
+        client = FinnhubClient(api_key, base_url=os.getenv("FINNHUB_BASE_URL", FINNHUB_URL))
+        collector = LiveCollector(
+            symbols, client.quote, sink,
+            interval=interval,
+            calls_per_second=float(os.getenv("FINNHUB_CALLS_PER_SEC", "1")),
+            flush_interval=min(60.0, interval),
+        )
+        print(f"[INFO] collect {','.join(collector.symbols)} every {interval:g}s")
+        try:
+            asyncio.run(collector.run())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.close()
+        return
+
     price = get_aapl_price_finnhub(api_key)
     ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
-    append_to_csv(csv_path, ts, price)
-    print(f"[OK] {ts} AAPL={price} (écrit dans {csv_path})")
+    store.append("AAPL", [ts], [price])
+    rollups.update(store, "AAPL", [datetime.fromisoformat(ts).date()])
+    append_to_csv(csv_path, ts, price)  # CSV gardé pour scripts/daily_report.sh
+    print(f"[OK] {ts} AAPL={price} (écrit dans {store.root} + {csv_path})")
 
     
 
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data.csv_tail import CsvTailReader
+from portfolio.backtest import backtest_portfolio, compute_returns, rebalance_dates
+from portfolio.metrics import annualized_return, annualized_vol, correlation_matrix, fused_metrics, max_drawdown, portfolio_daily_returns, sharpe_ratio
+from strategy.engine import PriceData
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = BASE_DIR / "benchmarks" / "baseline.json"
+
+# A timing / peak memory above baseline x (1 + tolerance) is flagged as a regression, unless the
+# difference is below the timer noise of sub-millisecond cases / the allocator noise of tiny ones
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_S = 2e-4
+NOISE_FLOOR_MB = 0.5
+
+
+def gbm_panel(n_days: int = 2520, n_assets: int = 50, mu: float = 0.07, sigma: float = 0.25, seed: int = 0, start: str = "2000-01-03") -> pd.DataFrame:
+    """Daily close panel (business days x assets) of independent geometric Brownian motions starting at 100."""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / 252
+    log_rets = rng.normal((mu - 0.5 * sigma ** 2) * dt, sigma * np.sqrt(dt), size=(n_days, n_assets))
+    log_rets[0] = 0.0
+    return pd.DataFrame(100.0 * np.exp(np.cumsum(log_rets, axis=0)), index=pd.bdate_range(start, periods=n_days), columns=[f"A{i:03d}" for i in range(n_assets)])
+
+
+def write_tick_csv(path: Union[str, Path], n_days: int = 30, freq: str = "5min", start_price: float = 180.0, sigma: float = 0.25, seed: int = 0, start: str = "2026-01-01") -> Path:
+    """Synthetic `timestamp_utc,price` CSV in the collector's format (24/7 GBM bars every `freq`)."""
+    index = pd.date_range(start, periods=int(n_days * pd.Timedelta("1D") / pd.Timedelta(freq)), freq=freq, tz="UTC")
+    rng = np.random.default_rng(seed)
+    step = sigma * np.sqrt(pd.Timedelta(freq) / pd.Timedelta("365D"))
+    prices = start_price * np.exp(np.cumsum(rng.normal(0.0, step, len(index))))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"timestamp_utc": index.strftime("%Y-%m-%dT%H:%M:%S+00:00"), "price": prices.round(4)}).to_csv(path, index=False)
+    return path
+
+
+@dataclass
+class BenchResult:
+    name: str
+    params: str
+    items: int  # work units per call (cells, dates, rows...)
+    seconds: float  # best of `repeat` calls
+    items_per_sec: float
+    peak_mb: float  # peak traced allocation during one call
+
+
+def measure(name: str, params: str, items: int, fn: Callable[[], object], repeat: int = 3) -> BenchResult:
+    fn()  # warm-up (imports, caches, first-touch)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+
+    # Separate traced call: tracemalloc slows allocations down, timings stay clean
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult(name=name, params=params, items=items, seconds=best, items_per_sec=items / best if best > 0 else float("nan"), peak_mb=peak / 1024 / 1024)
+
+
+def _cases(work_dir: Path, quick: bool) -> List[Tuple[str, str, int, Callable[[], object]]]:
+    n_days, n_assets = (1260, 20) if quick else (5040, 100)
+    panel = gbm_panel(n_days, n_assets)
+    rets = compute_returns(panel)
+    values = backtest_portfolio(panel).portfolio_value
+    port_rets = portfolio_daily_returns(values)
+    long_values = gbm_panel(50_000 if not quick else 20_000, 1).iloc[:, 0]  # ~200 years of business days: pandas ns bounds
+    cells = f"{n_days}d x {n_assets}"
+
+    small = panel.iloc[:252, :10]
+    cases = [
+        ("compute_returns", cells, panel.size, lambda: compute_returns(panel)),
+        ("rebalance_dates[Monthly]", f"{n_days}d", n_days, lambda: rebalance_dates(panel.index, "Monthly")),
+        ("rebalance_dates[Weekly]", f"{n_days}d", n_days, lambda: rebalance_dates(panel.index, "Weekly")),
+        ("backtest_portfolio[numpy, Monthly]", cells, panel.size, lambda: backtest_portfolio(panel, rebalance="Monthly")),
+        ("backtest_portfolio[numpy, Never]", cells, panel.size, lambda: backtest_portfolio(panel, rebalance="Never")),
+        ("backtest_portfolio[loop, Monthly]", "252d x 10", small.size, lambda: backtest_portfolio(small, rebalance="Monthly", engine="loop")),
+        ("max_drawdown", f"{len(long_values)} values", len(long_values), lambda: max_drawdown(long_values)),
+        ("annualized_return", f"{len(long_values)} values", len(long_values), lambda: annualized_return(long_values)),
+        ("annualized_vol", f"{len(port_rets)} returns", len(port_rets), lambda: annualized_vol(port_rets)),
+        ("sharpe_ratio", f"{len(port_rets)} returns", len(port_rets), lambda: sharpe_ratio(port_rets)),
+        ("fused_metrics", f"{len(long_values)} values", len(long_values), lambda: fused_metrics(long_values)),
+        ("correlation_matrix", cells, rets.size, lambda: correlation_matrix(rets)),
+    ]
+
+    # Quant A price loading: full CSV parse (the former dashboard.load_prices), tail refresh, resample
+    tick_days = 30 if quick else 365
+    base = work_dir / "quant_a"
+    csv_path = write_tick_csv(base / "data" / "aapl_prices.csv", n_days=tick_days)
+    n_rows = sum(1 for _ in open(csv_path)) - 1
+    tail = CsvTailReader(str(csv_path))
+    tail.refresh()
+    data = PriceData(base, "AAPL")
+    data.csv_frame()
+
+    cases += [
+        ("csv load[cold]", f"{n_rows} ticks", n_rows, lambda: CsvTailReader(str(csv_path)).refresh()),
+        ("csv load[tail refresh]", f"{n_rows} ticks, nothing new", 1, tail.refresh),
+        ("resample[1H]", f"{n_rows} ticks", n_rows, lambda: data.series("1H", None, None)),
+        ("resample[1D]", f"{n_rows} ticks", n_rows, lambda: data.series("1D", None, None)),
+    ]
+    return cases
+
+
+def run_suite(quick: bool = False, repeat: int = 3, only: Optional[str] = None) -> pd.DataFrame:
+    """Every case on synthetic data written to a temp dir (no network); one row per case."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = _cases(Path(tmp), quick)
+        rows = [asdict(measure(name, params, items, fn, repeat)) for name, params, items, fn in cases if only is None or only in name]
+    return pd.DataFrame(rows)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_baseline(results: pd.DataFrame, path: Union[str, Path] = DEFAULT_BASELINE, quick: bool = False) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "commit": _git_commit(),
+        "created_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "machine": {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__, "platform": platform.platform()},
+        "results": results.to_dict(orient="records"),
+    }
+    path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    return path
+
+
+def compare(results: pd.DataFrame, baseline: Union[str, Path] = DEFAULT_BASELINE, tolerance: float = DEFAULT_TOLERANCE) -> pd.DataFrame:
+    """Results next to a saved baseline: time / memory ratios and a regression flag per case."""
+    base = pd.DataFrame(json.loads(Path(baseline).read_text(encoding="utf-8"))["results"])
+    out = results.merge(base[["name", "params", "seconds", "peak_mb"]], on=["name", "params"], how="left", suffixes=("", "_base"))
+    out["time_ratio"] = out["seconds"] / out["seconds_base"]
+    out["mem_ratio"] = out["peak_mb"] / out["peak_mb_base"]
+    slower = (out["time_ratio"] > 1.0 + tolerance) & (out["seconds"] - out["seconds_base"] > NOISE_FLOOR_S)
+    heavier = (out["mem_ratio"] > 1.0 + tolerance) & (out["peak_mb"] - out["peak_mb_base"] > NOISE_FLOOR_MB)
+    out["regression"] = slower | heavier
+    return out
+
+
+if __name__ == "__main__":
+    # python src/benchmarks.py [--quick] [--save [path]] [--compare [path]] [--only name]
+    args = sys.argv[1:]
+
+    def _opt(flag: str, default=None):
+        if flag not in args:
+            return None
+        i = args.index(flag)
+        return args[i + 1] if i + 1 < len(args) and not args[i + 1].startswith("--") else default
+
+    quick = "--quick" in args
+    res = run_suite(quick=quick, only=_opt("--only"))
+    pd.set_option("display.width", 200)
+    print(res.to_string(index=False, formatters={"seconds": "{:.5f}".format, "items_per_sec": "{:,.0f}".format, "peak_mb": "{:.1f}".format}))
+
+    if "--compare" in args:
+        cmp = compare(res, _opt("--compare", DEFAULT_BASELINE))
+        print(cmp[["name", "params", "seconds", "seconds_base", "time_ratio", "mem_ratio", "regression"]].to_string(index=False))
+        if cmp["regression"].any():
+            print(f"[WARN] {int(cmp['regression'].sum())} regression(s) beyond {DEFAULT_TOLERANCE:.0%}")
+            sys.exit(1)
+    if "--save" in args:
+        print(f"[OK] baseline -> {save_baseline(res, _opt('--save', DEFAULT_BASELINE), quick)}")
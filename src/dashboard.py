@@ -1,5 +1,4 @@
 import os
-import numpy as np
 import pandas as pd
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
@@ -7,6 +6,11 @@ from streamlit_autorefresh import st_autorefresh
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from data.result_store import ResultStore
+from portfolio.downsample import DEFAULT_MAX_POINTS, make_trace
+from precompute import DEFAULT_FEE_BPS, DEFAULT_MOM_WINDOW, format_age, lookup, strategy_inputs, strategy_view
+from strategy.engine import PriceData, StrategyEngine
+
 st.set_page_config(page_title="Quant Dashboard - AAPL", layout="wide")
 st_autorefresh(interval=300_000, key="refresh")
 
@@ -15,82 +19,48 @@ st.title("Quant Dashboard - AAPL")
 # Chemins absolus
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 csv_path = os.path.join(BASE_DIR, "data", "aapl_prices.csv")
+SYMBOL = "AAPL"
 
 
-@st.cache_data(ttl=300)
-def load_prices(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-
-    required_cols = {"timestamp_utc", "price"}
-    if not required_cols.issubset(df.columns):
-        raise ValueError(f"CSV invalide. Attendu: {required_cols}, reçu: {set(df.columns)}")
-
-    df["timestamp_utc"] = pd.to_datetime(df["timestamp_utc"], utc=True, errors="coerce")
-    df["price"] = pd.to_numeric(df["price"], errors="coerce")
-    df = df.dropna(subset=["timestamp_utc", "price"]).copy()
-
-    # Dédupe + tri
-    df = df.drop_duplicates(subset=["timestamp_utc"]).sort_values("timestamp_utc")
-    return df
-
-
-def infer_periods_per_year(index: pd.DatetimeIndex) -> float:
-    diffs = index.to_series().diff().dropna().dt.total_seconds()
-    if len(diffs) == 0:
-        return 0.0
-    dt = float(diffs.median())
-    if dt <= 0:
-        return 0.0
-    return (365.0 * 24.0 * 3600.0) / dt
-
-
-def max_drawdown(equity: pd.Series) -> float:
-    peak = equity.cummax()
-    dd = equity / peak - 1.0
-    return float(dd.min())
+@st.cache_resource
+def _engine(base_dir: str, symbol: str) -> StrategyEngine:
+    # Un moteur par symbole, partagé par toutes les sessions du serveur (résultats mémoïsés)
+    return StrategyEngine(PriceData(base_dir, symbol))
 
 
-def drawdown_series(equity: pd.Series) -> pd.Series:
-    peak = equity.cummax()
-    return equity / peak - 1.0
+@st.cache_resource
+def _store() -> ResultStore:
+    # Vues par défaut écrites par `python src/app.py precompute`
+    return ResultStore()
 
 
-def perf_metrics(ret: pd.Series, equity: pd.Series, ppy: float) -> dict:
-    # ret: série de rendements périodiques
-    mean_r = float(ret.mean())
-    std_r = float(ret.std(ddof=0))
-    tot_return = float(equity.iloc[-1] - 1.0)
-    vol = (std_r * np.sqrt(ppy)) if (std_r > 0 and ppy > 0) else np.nan
-    sharpe = (mean_r / std_r * np.sqrt(ppy)) if (std_r > 0 and ppy > 0) else np.nan
-    mdd = max_drawdown(equity)
+engine = _engine(BASE_DIR, SYMBOL)
+data = engine.data
 
-    win_rate = float((ret > 0).mean()) if len(ret) else np.nan
+if data.from_store():
+    # Tick store (Parquet partitionné par jour) : bornes connues sans rien charger
+    min_dt, max_dt = data.bounds()
+else:
+    # Fallback : ancien CSV (avant `python src/app.py migrate`)
+    if not os.path.exists(csv_path):
+        st.error("Pas de données encore. Lance `python -u src/app.py history` puis attends cron.")
+        st.stop()
 
-    return {
-        "Total return": tot_return,
-        "Vol (ann.)": vol,
-        "Sharpe (ann.)": sharpe,
-        "Max drawdown": mdd,
-        "Win rate": win_rate,
-    }
+    try:
+        df = data.csv_frame()
+    except Exception as e:
+        st.error(f"Impossible de lire le CSV: {e}")
+        st.stop()
 
+    if len(df) < 3:
+        st.warning("Pas assez de points (min 3).")
+        st.dataframe(df, width="stretch")
+        st.stop()
 
-if not os.path.exists(csv_path):
-    st.error("Pas de données encore. Lance `python -u src/app.py history` puis attends cron.")
-    st.stop()
+    min_dt = df.index.min().date()
+    max_dt = df.index.max().date()
 
-try:
-    df = load_prices(csv_path)
-except Exception as e:
-    st.error(f"Impossible de lire le CSV: {e}")
-    st.stop()
-
-if len(df) < 3:
-    st.warning("Pas assez de points (min 3).")
-    st.dataframe(df, width="stretch")
-    st.stop()
-
-df = df.set_index("timestamp_utc").sort_index()
+data_source = data.source
 
 # -----------------------
 # Controls
@@ -99,15 +69,13 @@ top1, top2, top3, top4 = st.columns([1, 1, 1, 2])
 with top1:
     periodicity = st.selectbox("Périodicité", ["Raw", "15min", "1H", "1D"], index=0)
 with top2:
-    mom_window = st.slider("Momentum window (N périodes)", min_value=2, max_value=200, value=20, step=1)
+    mom_window = st.slider("Momentum window (N périodes)", min_value=2, max_value=200, value=DEFAULT_MOM_WINDOW, step=1)
 with top3:
     log_scale = st.checkbox("Échelle log (graph principal)", value=False)
 with top4:
-    fee_bps = st.number_input("Frais (bps) appliqués aux trades Momentum", min_value=0.0, max_value=200.0, value=0.0, step=1.0)
+    fee_bps = st.number_input("Frais (bps) appliqués aux trades Momentum", min_value=0.0, max_value=200.0, value=DEFAULT_FEE_BPS, step=1.0)
 
 # Date range (UTC)
-min_dt = df.index.min().date()
-max_dt = df.index.max().date()
 dcol1, dcol2 = st.columns(2)
 with dcol1:
     start_date = st.date_input("Date début (UTC)", value=min_dt, min_value=min_dt, max_value=max_dt)
@@ -118,64 +86,25 @@ if start_date > end_date:
     st.error("La date début doit être <= date fin.")
     st.stop()
 
-mask = (df.index.date >= start_date) & (df.index.date <= end_date)
-dfw = df.loc[mask].copy()
+# Vue précalculée (`python src/app.py precompute`) sur exactement ces données / paramètres :
+# simple lecture, rien à charger ni à calculer
+pre = lookup(_store(), strategy_view(SYMBOL, periodicity, mom_window, fee_bps), strategy_inputs(engine, periodicity, mom_window, fee_bps, start_date, end_date))
+s = pre.value.s if pre is not None else engine.series(periodicity, start_date, end_date)
 
-if len(dfw) < 3:
+if len(s) < 3:
     st.warning("Pas assez de points sur la fenêtre sélectionnée.")
     st.stop()
 
-# Resample
-if periodicity == "Raw":
-    s = dfw["price"].copy()
-else:
-    rule = {"15min": "15min", "1H": "1H", "1D": "1D"}[periodicity]
-    s = dfw["price"].resample(rule).last().dropna()
-
 if len(s) < max(10, mom_window + 2):
     st.warning("Pas assez de points après resampling / pour la fenêtre momentum. Réduis N ou choisis une périodicité plus fine.")
     st.stop()
 
 
-# Returns & strategies
-ret = s.pct_change().fillna(0.0)
-
-# Buy & Hold
-bh_ret = ret.copy()
-
-# Momentum (long/flat) : investi si perf sur N périodes précédentes > 0 (avec shift pour éviter look-ahead)
-mom_raw = s.pct_change(mom_window)
-position = (mom_raw.shift(1) > 0).astype(float)  # 1.0 ou 0.0
-mom_ret_gross = (position * ret).fillna(0.0)
-
-# Frais sur changement de position (trades)
-# fee_bps = basis points, ex: 10 bps = 0.001
-fee = fee_bps / 10_000.0
-turnover = position.diff().abs().fillna(0.0)  # 1 quand on entre/sort (approx)
-mom_ret = mom_ret_gross - turnover * fee
-
-# Equity curves normalisées (base = 1)
-bh_equity = (1.0 + bh_ret).cumprod()
-mom_equity = (1.0 + mom_ret).cumprod()
-price_norm = s / float(s.iloc[0])
-
-# Drawdowns
-bh_dd = drawdown_series(bh_equity)
-mom_dd = drawdown_series(mom_equity)
-
-# Annualisation approx
-ppy = infer_periods_per_year(s.index)
-
-# Metrics
-bh_m = perf_metrics(bh_ret, bh_equity, ppy)
-mom_m = perf_metrics(mom_ret, mom_equity, ppy)
-
-# Extra momentum metrics
-nb_trades = int((position.diff().abs() > 0).sum())
-mom_m["# Trades (approx)"] = nb_trades
-bh_m["# Trades (approx)"] = 0
-
-metrics_df = pd.DataFrame([bh_m, mom_m], index=["Buy & Hold", "Momentum"])
+# Sans précalcul : calcul mémoïsé par (version des données, périodicité, N, frais, dates) :
+# log_scale / expander debug ne relancent rien
+res = pre.value if pre is not None else engine.run(periodicity, mom_window, fee_bps, start_date, end_date)
+metrics_df = res.metrics_df
+position = res.position
 
 # Pretty formatting
 fmt = metrics_df.copy()
@@ -197,10 +126,44 @@ k4.metric("Momentum: position actuelle", "1 (IN)" if position.iloc[-1] > 0 else
 k5.metric("Frais (bps)", f"{fee_bps:.1f}")
 
 st.caption("Note: annualisation = approximation (collecte potentiellement 24/7).")
+if pre is not None:
+    st.caption(f"Résultat précalculé il y a {format_age(pre.age_s())} sur les données actuelles ({pre.seconds * 1000:.0f} ms de calcul évités).")
+else:
+    st.caption("Résultat calculé à la demande (pas de précalcul à jour pour ces paramètres).")
 
 # -----------------------
 # Charts (Plotly)
 # -----------------------
+# Chaque courbe est réduite côté serveur à ~DEFAULT_MAX_POINTS points (min/max par bucket :
+# pics et creux de drawdown conservés). Le zoom re-découpe la fenêtre déjà calculée et
+# re-échantillonne : sur une fenêtre assez courte, tous les points sont envoyés.
+zcol1, zcol2, zcol3 = st.columns([3, 1, 1])
+with zcol2:
+    full_res = st.checkbox("Résolution complète", value=False)
+with zcol3:
+    use_gl = st.checkbox("WebGL (Scattergl)", value=len(s) > 50_000)
+with zcol1:
+    # Slider en datetimes naïfs UTC, re-localisés pour découper l'index
+    tz = s.index.tz
+    t0, t1 = (ts.tz_convert(None) if tz is not None else ts for ts in (s.index[0], s.index[-1]))
+    # Pas = écart médian entre deux points (le pas par défaut d'un slider de datetimes est 1 jour)
+    spacing = s.index.to_series().diff().median() if len(s) > 1 else pd.NaT
+    zoom_step = max(spacing, pd.Timedelta(seconds=1)) if pd.notna(spacing) else pd.Timedelta(minutes=1)
+    zoom = st.slider("Zoom (UTC)", min_value=t0.to_pydatetime(), max_value=t1.to_pydatetime(), value=(t0.to_pydatetime(), t1.to_pydatetime()), step=zoom_step.to_pytimedelta(), format="YYYY-MM-DD HH:mm")
+
+z0, z1 = (pd.Timestamp(z).tz_localize("UTC").tz_convert(tz) if tz is not None else pd.Timestamp(z) for z in zoom)
+view = slice(z0, z1)
+max_points = None if full_res else DEFAULT_MAX_POINTS
+
+
+def _trace(series: pd.Series, name: str, **kwargs):
+    return make_trace(series.loc[view], max_points=max_points, use_gl=use_gl, name=name, mode="lines", **kwargs)
+
+
+# Position en escalier : seuls les changements (et le dernier point) suffisent, sans perte
+pos_view = position.loc[view]
+pos_steps = pos_view[(pos_view.diff() != 0) | (pos_view.index == pos_view.index[-1])] if len(pos_view) else pos_view
+
 fig = make_subplots(
     rows=3, cols=1, shared_xaxes=True,
     vertical_spacing=0.07,
@@ -213,17 +176,17 @@ fig = make_subplots(
 )
 
 # Row 1: price + equities
-fig.add_trace(go.Scatter(x=s.index, y=price_norm, name="Price (norm)", mode="lines"), row=1, col=1)
-fig.add_trace(go.Scatter(x=s.index, y=bh_equity, name="Buy & Hold (equity)", mode="lines"), row=1, col=1)
-fig.add_trace(go.Scatter(x=s.index, y=mom_equity, name="Momentum (equity)", mode="lines"), row=1, col=1)
+fig.add_trace(_trace(res.price_norm, "Price (norm)"), row=1, col=1)
+fig.add_trace(_trace(res.bh_equity, "Buy & Hold (equity)"), row=1, col=1)
+fig.add_trace(_trace(res.mom_equity, "Momentum (equity)"), row=1, col=1)
 
 # Row 2: drawdowns
-fig.add_trace(go.Scatter(x=s.index, y=bh_dd, name="B&H drawdown", mode="lines"), row=2, col=1)
-fig.add_trace(go.Scatter(x=s.index, y=mom_dd, name="Momentum drawdown", mode="lines"), row=2, col=1)
+fig.add_trace(_trace(res.bh_dd, "B&H drawdown"), row=2, col=1)
+fig.add_trace(_trace(res.mom_dd, "Momentum drawdown"), row=2, col=1)
 
 # Row 3: position (step-like)
-fig.add_trace(go.Scatter(
-    x=s.index, y=position,
+fig.add_trace((go.Scattergl if use_gl else go.Scatter)(
+    x=pos_steps.index, y=pos_steps.values,
     name="Momentum position",
     mode="lines",
     line=dict(shape="hv")
@@ -249,18 +212,35 @@ st.subheader("Métriques comparatives")
 st.dataframe(fmt, width="stretch")
 
 # Debug / table récente
-tail_df = pd.DataFrame({
-    "price": s,
-    "ret": ret,
-    "bh_ret": bh_ret,
-    "mom_signal": mom_raw,
-    "position": position,
-    "mom_ret_net": mom_ret,
-    "bh_equity": bh_equity,
-    "mom_equity": mom_equity,
-}).tail(50)
+tail_df = res.tail(50)
 
 with st.expander("Voir les dernières lignes (debug)", expanded=False):
     st.dataframe(tail_df, width="stretch")
+    # Cache de résultats partagé par toutes les sessions du serveur
+    st.json(engine.cache.stats())
 
-st.caption(f"Fichier utilisé: {csv_path}")
+# -----------------------
+# Optimisation momentum (grille window x frais)
+# -----------------------
+st.subheader("Optimisation Momentum (window × frais)")
+if st.checkbox("Calculer la grille (windows 2–200 × frais)", value=False):
+    grid = engine.grid(periodicity, start_date, end_date)
+    best = grid.best("sharpe")
+    if best:
+        st.caption(
+            f"Meilleur Sharpe: window={best['window']}, frais={best['fee_bps']:.0f} bps "
+            f"→ Sharpe {best['sharpe']:.2f}, total return {best['total_return']*100:.2f}%"
+        )
+
+    gcol1, gcol2 = st.columns(2)
+    for col, metric, title, zfmt in [(gcol1, "sharpe", "Sharpe (ann.)", ".2f"), (gcol2, "total_return", "Total return", ".1%")]:
+        table = grid.frame(metric)
+        heat = go.Figure(data=go.Heatmap(
+            z=table.values, x=table.columns, y=[f"{v:g} bps" for v in table.index],
+            colorscale="RdYlGn", zmid=0.0, colorbar=dict(tickformat=zfmt),
+        ))
+        heat.update_layout(title=title, xaxis_title="Momentum window (N)", yaxis_title="Frais", height=420, margin=dict(l=20, r=20, t=50, b=20))
+        with col:
+            st.plotly_chart(heat, width="stretch")
+
+st.caption(f"Données utilisées: {data_source}")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Yahoo serves 1m bars for the last ~30 days, at most 7 days per request
+ONE_MINUTE_DAYS = 29
+WINDOW_DAYS = 7
+
+BAR_SECONDS = {"1m": 60, "5m": 300}
+
+
+def _empty_panel(symbols: List[str]) -> pd.DataFrame:
+    return pd.DataFrame(columns=symbols, index=pd.DatetimeIndex([], tz="UTC"), dtype=float)
+
+
+def _close_panel(data: pd.DataFrame, symbols: List[str]) -> pd.DataFrame:
+    """Close prices (UTC index, one column per symbol) from a yf.download result."""
+    if data is None or data.empty:
+        return _empty_panel(symbols)
+
+    if isinstance(data.columns, pd.MultiIndex):
+        close = data["Close"]
+    else:
+        close = data[["Close"]].rename(columns={"Close": symbols[0]})
+
+    idx = pd.DatetimeIndex(close.index)
+    close.index = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    return close.astype(float)
+
+
+def download_intraday(symbols: List[str], interval: str, period: Optional[str] = None, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """One yf.download call for every symbol (yfinance fetches the tickers on parallel threads)."""
+    import yfinance as yf
+
+    kwargs = {"period": period} if period else {"start": start, "end": end}
+    data = yf.download(tickers=symbols, interval=interval, progress=False, auto_adjust=False, prepost=True, threads=True, **kwargs)
+    return _close_panel(data, symbols)
+
+
+def stitch(fine: pd.Series, coarse: pd.Series, coarse_seconds: int = BAR_SECONDS["5m"]) -> pd.DataFrame:
+    """
+    Merge a fine series (1m) with a coarse fallback (5m): coarse bars are kept only where no fine
+    bar falls inside them. Returns timestamp_utc / price / source, sorted and deduplicated.
+    """
+    fine, coarse = fine.dropna().sort_index(), coarse.dropna().sort_index()
+
+    # Does any 1m bar fall in [t, t + 5m)? (binary search, no per-row Python)
+    covered = np.zeros(len(coarse), dtype=bool)
+    if len(fine):
+        pos = fine.index.searchsorted(coarse.index)
+        nxt = fine.index[np.minimum(pos, len(fine) - 1)]
+        covered = (pos < len(fine)) & (nxt < coarse.index + pd.Timedelta(seconds=coarse_seconds))
+
+    out = pd.concat([
+        fine.rename("price").to_frame().assign(source="1m"),
+        coarse[~covered].rename("price").to_frame().assign(source="5m"),
+    ])
+    out.index.name = "timestamp_utc"
+    out = out.sort_index(kind="stable")
+    return out[~out.index.duplicated(keep="first")].reset_index()
+
+
+def annotate_gaps(history: pd.DataFrame) -> pd.DataFrame:
+    """Add gap_s (seconds since previous point) and gap (longer than twice the bar length of its source)."""
+    gap_s = history["timestamp_utc"].diff().dt.total_seconds()
+    expected = history["source"].map(BAR_SECONDS).astype(float)
+    return history.assign(gap_s=gap_s, gap=(gap_s > 2 * expected).fillna(False))
+
+
+def bootstrap_intraday(symbols: Sequence[str], now: Optional[pd.Timestamp] = None, fallback_period: str = "30d") -> Dict[str, pd.DataFrame]:
+    """
+    Intraday history for many symbols at once: 1m bars stitched from 7-day windows over the last
+    ~30 days, completed with 5m bars, deduplicated and gap-annotated.
+    Returns {symbol: DataFrame(timestamp_utc, price, source, gap_s, gap)}; symbols without data are omitted.
+    """
+    symbols = [s.upper() for s in symbols]
+    now = now or pd.Timestamp.now(tz="UTC")
+
+    one_m: List[pd.DataFrame] = []
+    for k in range(0, ONE_MINUTE_DAYS, WINDOW_DAYS):
+        end = now - timedelta(days=k)
+        start = now - timedelta(days=min(k + WINDOW_DAYS, ONE_MINUTE_DAYS))
+        try:
+            one_m.append(download_intraday(symbols, "1m", start=start, end=end))
+        except Exception as e:
+            print(f"[WARN] 1m {start.date()}..{end.date()}: {e}")
+
+    fine = pd.concat(one_m) if one_m else _empty_panel(symbols)
+    fine = fine[~fine.index.duplicated(keep="last")].sort_index()
+
+    try:
+        coarse = download_intraday(symbols, "5m", period=fallback_period)
+    except Exception as e:
+        print(f"[WARN] 5m fallback: {e}")
+        coarse = _empty_panel(symbols)
+
+    out: Dict[str, pd.DataFrame] = {}
+    empty = _empty_panel(["_"])["_"]
+    for s in symbols:
+        hist = stitch(fine.get(s, empty), coarse.get(s, empty))
+        if not hist.empty:
+            out[s] = annotate_gaps(hist)
+    return out
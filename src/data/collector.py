@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+FINNHUB_URL = "https://finnhub.io/api/v1"
+
+Tick = Tuple[str, float]  # (timestamp_iso_utc, price)
+Sink = Callable[[Dict[str, List[Tick]]], None]
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class FinnhubClient:
+    """Finnhub /quote client over one pooled HTTP session (keep-alive shared by every symbol)."""
+
+    def __init__(self, api_key: str, base_url: str = FINNHUB_URL, pool_size: int = 10, timeout: float = 10.0):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def quote(self, symbol: str) -> float:
+        r = self.session.get(f"{self.base_url}/quote", params={"symbol": symbol, "token": self.api_key}, timeout=self.timeout)
+        if r.status_code == 429:
+            raise RateLimited(float(r.headers.get("Retry-After", 60)))
+        r.raise_for_status()
+        data = r.json()
+
+        price = data.get("c")  # current price
+        if not price:
+            raise ValueError(f"Réponse Finnhub inattendue pour {symbol}: {data}")
+        return float(price)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class TokenBucket:
+    """Async token bucket: at most `rate` calls per second on average, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while (server said 429)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+@dataclass
+class SymbolState:
+    next_due: float = 0.0
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class CollectorStats:
+    polls: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    flushes: int = 0
+    ticks_written: int = 0
+    per_symbol: Dict[str, SymbolState] = field(default_factory=dict)
+
+
+class LiveCollector:
+    """
+    Long-running poller for many symbols.
+    - each symbol is polled every `interval` seconds (sub-minute cadences are fine)
+    - requests run concurrently (bounded by `max_concurrency`) and share one rate limiter
+    - a failing symbol backs off exponentially without slowing the others
+    - ticks are buffered and handed to `sink` in batches (`batch_size` or `flush_interval`)
+    """
+
+    def __init__(self, symbols: Sequence[str], fetch: Callable[[str], float], sink: Sink, interval: float = 300.0, max_concurrency: int = 8, calls_per_second: float = 1.0, batch_size: int = 100, flush_interval: float = 60.0, max_backoff: float = 600.0,):
+        self.symbols = [s.upper() for s in symbols]
+        self.fetch = fetch
+        self.sink = sink
+        self.interval = interval
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.limiter = TokenBucket(calls_per_second)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats = CollectorStats(per_symbol={s: SymbolState() for s in self.symbols})
+        self._buffer: Dict[str, List[Tick]] = {}
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def _backoff(self, state: SymbolState) -> float:
+        delay = min(self.max_backoff, self.interval * (2 ** min(state.failures, 16)))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def poll(self, symbol: str) -> None:
+        state = self.stats.per_symbol[symbol]
+        async with self.semaphore:
+            await self.limiter.acquire()
+            self.stats.polls += 1
+            try:
+                # requests is blocking: run it in a worker thread, the session pool is thread-safe for GETs
+                price = await asyncio.to_thread(self.fetch, symbol)
+            except RateLimited as e:
+                self.stats.rate_limited += 1
+                self.limiter.pause(e.retry_after)
+                state.next_due = time.monotonic() + e.retry_after
+                return
+            except Exception as e:
+                self.stats.errors += 1
+                state.failures += 1
+                state.last_error = str(e)
+                state.next_due = time.monotonic() + self._backoff(state)
+                print(f"[ERROR] {symbol}: {e} (retry in {state.next_due - time.monotonic():.0f}s)")
+                return
+
+        state.failures = 0
+        state.last_error = None
+        ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._buffer.setdefault(symbol, []).append((ts, price))
+        self._buffered += 1
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        batch, self._buffer, n = self._buffer, {}, self._buffered
+        self._buffered = 0
+        self.sink(batch)
+        self.stats.flushes += 1
+        self.stats.ticks_written += n
+
+    async def run(self, duration: Optional[float] = None) -> CollectorStats:
+        """Poll until cancelled (or for `duration` seconds), flushing what is buffered on exit."""
+        start = time.monotonic()
+        for st in self.stats.per_symbol.values():
+            st.next_due = start  # the rate limiter spreads the first round
+
+        try:
+            while duration is None or time.monotonic() - start < duration:
+                now = time.monotonic()
+                due = [s for s in self.symbols if self.stats.per_symbol[s].next_due <= now]
+                for s in due:
+                    self.stats.per_symbol[s].next_due = now + self.interval
+                if due:
+                    await asyncio.gather(*(self.poll(s) for s in due))
+
+                if self._buffered >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                    await asyncio.to_thread(self.flush)
+
+                next_due = min(st.next_due for st in self.stats.per_symbol.values())
+                wake = min(next_due, self._last_flush + self.flush_interval)
+                await asyncio.sleep(max(0.0, min(wake - time.monotonic(), 1.0)))
+        finally:
+            self.flush()
+
+        return self.stats
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLS = {"timestamp_utc", "price"}
+
+
+class CsvTailReader:
+    """
+    Incremental reader for an append-only `timestamp_utc,price` CSV.
+    Remembers the byte offset of the last complete line and only parses what was appended since;
+    the file is reloaded from scratch only when it was rewritten (truncated, replaced, or the
+    bytes before the saved offset changed, e.g. after `app.py history`).
+    Rows are kept sorted and deduplicated on timestamp (first occurrence wins, as before).
+    """
+
+    # bytes re-checked before the saved offset to detect a rewrite
+    GUARD = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.full_reloads = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self._inode: Optional[int] = None
+        self._guard = b""
+        self._cols: Optional[list] = None
+        self._ts = np.empty(0, dtype=np.int64)  # ns since epoch, UTC
+        self._px = np.empty(0, dtype=np.float64)
+        self._n = 0
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self._ts[self._n - 1], tz="UTC") if self._n else None
+
+    def _rewritten(self, st: os.stat_result, f) -> bool:
+        if self._inode is None:
+            return True
+        if st.st_ino != self._inode or st.st_size < self.offset:
+            return True
+        f.seek(self.offset - len(self._guard))
+        return f.read(len(self._guard)) != self._guard
+
+    def _parse(self, chunk: bytes) -> pd.DataFrame:
+        df = pd.read_csv(io.BytesIO(chunk), header=None, names=self._cols, dtype=str)
+        ts = pd.to_datetime(df["timestamp_utc"], utc=True, errors="coerce", format="ISO8601")
+        px = pd.to_numeric(df["price"], errors="coerce")
+        ok = ts.notna().to_numpy() & px.notna().to_numpy()
+        return pd.DataFrame({"ts": pd.DatetimeIndex(ts[ok]).as_unit("ns").asi8, "px": px[ok].to_numpy(dtype=float)})
+
+    def _extend(self, ts: np.ndarray, px: np.ndarray) -> None:
+        need = self._n + len(ts)
+        if need > len(self._ts):
+            cap = max(need, 2 * len(self._ts), 1024)
+            self._ts = np.resize(self._ts, cap)
+            self._px = np.resize(self._px, cap)
+        self._ts[self._n:need] = ts
+        self._px[self._n:need] = px
+        self._n = need
+
+    def _ingest(self, new: pd.DataFrame) -> None:
+        if new.empty:
+            return
+        ts, px = new["ts"].to_numpy(), new["px"].to_numpy()
+
+        in_order = (self._n == 0 or ts[0] > self._ts[self._n - 1]) and bool(np.all(np.diff(ts) > 0))
+        if in_order:
+            # Common case: strictly newer rows appended at the end -> O(new rows)
+            self._extend(ts, px)
+            return
+
+        # Out-of-order or duplicated timestamps: merge (first occurrence wins) into fresh buffers,
+        # frames returned earlier keep viewing the old ones
+        all_ts = np.concatenate([self._ts[:self._n], ts])
+        all_px = np.concatenate([self._px[:self._n], px])
+        _, first = np.unique(all_ts, return_index=True)  # sorted unique timestamps, first position
+        self._ts, self._px, self._n = all_ts[first], all_px[first], len(first)
+
+    def refresh(self) -> pd.DataFrame:
+        """Read what was appended since the last call and return the full frame (indexed by timestamp_utc)."""
+        with self._lock:
+            st = os.stat(self.path)
+            with open(self.path, "rb") as f:
+                if self._rewritten(st, f):
+                    self._reset()
+                    self.full_reloads += 1
+                    self._inode = st.st_ino
+
+                    header = f.readline()
+                    self._cols = [c.strip() for c in header.decode("utf-8").split(",")]
+                    if not REQUIRED_COLS.issubset(self._cols):
+                        raise ValueError(f"CSV invalide. Attendu: {REQUIRED_COLS}, reçu: {set(self._cols)}")
+                    self.offset = f.tell()
+                    self._guard = header[-self.GUARD:]
+
+                f.seek(self.offset)
+                chunk = f.read()
+
+            # Keep a partially written last line for the next refresh
+            end = chunk.rfind(b"\n") + 1
+            if end > 0:
+                self._ingest(self._parse(chunk[:end]))
+                self.offset += end
+                self._guard = (self._guard + chunk[:end])[-self.GUARD:]
+
+            return self.frame()
+
+    def frame(self) -> pd.DataFrame:
+        idx = pd.DatetimeIndex(self._ts[:self._n].view("datetime64[ns]"), name="timestamp_utc").tz_localize("UTC")
+        return pd.DataFrame({"price": self._px[:self._n]}, index=idx, copy=False)
@@ -1,8 +1,58 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+
 import pandas as pd
 import yfinance as yf
 
+from .price_cache import PriceCache, PriceSource
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_DIR = Path(os.getenv("PRICE_CACHE_DIR", BASE_DIR / "data" / "cache" / "prices"))
+
+
+# yf.download keeps per-call results in module-level state: two calls must not overlap.
+# Each call already fetches its tickers on parallel threads (threads=True).
+_YF_LOCK = threading.Lock()
+
+
+def download_close(tickers: List[str], interval: str, period: Optional[str] = None, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Download adjusted close prices from Yahoo Finance (by period, or from a start date)."""
+    with _YF_LOCK:
+        if start is not None:
+            data = yf.download(tickers=tickers, start=start, interval=interval, auto_adjust=True, progress=False, threads=True)
+        else:
+            data = yf.download(tickers=tickers, period=period, interval=interval, auto_adjust=True, progress=False, threads=True)
+
+    # yfinance returns MultiIndex columns when multiple tickers
+    if isinstance(data.columns, pd.MultiIndex):
+        # "Close" exists even with auto_adjust=True
+        prices = data["Close"].copy()
+    else:
+        # Single ticker: columns not MultiIndex -> build a consistent DF
+        prices = data[["Close"]].rename(columns={"Close": tickers[0]}).copy()
+
+    prices.index = pd.to_datetime(prices.index, errors="coerce")
+    return prices
 
-def get_prices(tickers: list[str], period: str = "2y", interval: str = "1d") -> pd.DataFrame:
+
+_price_cache: Optional[PriceCache] = None
+
+
+def configure_price_cache(root: Optional[str] = None, source: Optional[PriceSource] = None, **kwargs) -> PriceCache:
+    """(Re)create the process-wide price cache, e.g. on a temp dir with a FrameSource for offline runs."""
+    global _price_cache
+    _price_cache = PriceCache(root or DEFAULT_CACHE_DIR, source or download_close, **kwargs)
+    return _price_cache
+
+
+def price_cache() -> PriceCache:
+    return _price_cache or configure_price_cache()
+
+
+def get_prices(tickers: list[str], period: str = "2y", interval: str = "1d", use_cache: bool = True) -> pd.DataFrame:
     """
 Download historical price data for a list of assets using Yahoo Finance.
 The function returns adjusted prices for the selected tickers over the chosen time period and frequency.
@@ -13,6 +63,8 @@ period : str
     Time window used to retrieve the data (e.g. "1y", "2y").
 interval : str
     Data frequency (e.g. daily "1d", weekly "1wk").
+use_cache : bool
+    Read/write the on-disk Parquet cache (only bars newer than the cache are downloaded).
 
 Returns
 pd.DataFrame
@@ -28,21 +80,13 @@ pd.DataFrame
         return pd.DataFrame()
 
     try:
-        data = yf.download(
-            tickers=tickers,
-            period=period,
-            interval=interval,
-            auto_adjust=True,
-            progress=False,
-        )
-
-        # yfinance returns MultiIndex columns when multiple tickers
-        if isinstance(data.columns, pd.MultiIndex):
-            # "Close" exists even with auto_adjust=True
-            prices = data["Close"].copy()
+        if use_cache:
+            prices = price_cache().get(tickers, period=period, interval=interval)
         else:
-            # Single ticker: columns not MultiIndex -> build a consistent DF
-            prices = data[["Close"]].rename(columns={"Close": tickers[0]}).copy()
+            prices = download_close(tickers, interval, period=period)
+
+        if prices.empty:
+            return pd.DataFrame()
 
         # Clean index / rows
         prices.index = pd.to_datetime(prices.index, errors="coerce")
@@ -52,5 +96,3 @@ pd.DataFrame
 
     except Exception:
         return pd.DataFrame()
-    
-
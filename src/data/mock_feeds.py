@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+
+class MockQuoteServer:
+    """
+    Local stand-in for the Finnhub /quote endpoint (random-walk prices per symbol).
+    Every `rate_limit_every`-th request answers 429, every `fail_every`-th answers 500.
+        with MockQuoteServer() as srv:
+            FinnhubClient("test", base_url=srv.url)
+    """
+
+    def __init__(self, port: int = 0, start_price: float = 100.0, rate_limit_every: int = 0, fail_every: int = 0, seed: Optional[int] = None):
+        self.prices: Dict[str, float] = {}
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                symbol = parse_qs(url.query).get("symbol", [""])[0].upper()
+                with server._lock:
+                    server.requests += 1
+                    n = server.requests
+                    price = server.prices.get(symbol, start_price) * (1.0 + server._rng.gauss(0.0, 0.001))
+                    server.prices[symbol] = price
+
+                if url.path != "/quote" or not symbol:
+                    return self._send(404, {"error": "not found"})
+                if rate_limit_every and n % rate_limit_every == 0:
+                    return self._send(429, {"error": "API limit reached"}, {"Retry-After": "1"})
+                if fail_every and n % fail_every == 0:
+                    return self._send(500, {"error": "boom"})
+                self._send(200, {"c": round(price, 4), "t": int(time.time())})
+
+            def _send(self, code, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "MockQuoteServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ReplayServer:
+    """
+    Local stand-in for the Finnhub trade WebSocket: after a subscribe message it replays recorded
+    ticks (`timestamp_utc`, `price` frame) as {"type": "trade", "data": [...]} messages.
+    speed=0 sends as fast as possible, speed=60 plays one minute of history per second.
+    disconnect_every=N drops the connection every N messages (replay resumes after reconnect).
+        async with ReplayServer(df, speed=0) as srv:
+            StreamIngestor(srv.url, ["AAPL"], sink)
+    """
+
+    def __init__(self, ticks: pd.DataFrame, symbol: str = "AAPL", speed: float = 0.0, trades_per_message: int = 1, disconnect_every: int = 0, port: int = 0):
+        ts = pd.to_datetime(ticks["timestamp_utc"], utc=True, errors="coerce", format="ISO8601")
+        px = pd.to_numeric(ticks["price"], errors="coerce")
+        ok = (ts.notna() & px.notna()).to_numpy()
+        self.ts_ms = pd.DatetimeIndex(ts[ok]).as_unit("ms").asi8
+        self.prices = px[ok].to_numpy(dtype=float)
+        self.symbol = symbol
+        self.speed = speed
+        self.trades_per_message = max(1, trades_per_message)
+        self.disconnect_every = disconnect_every
+        self.port = port
+        self.position = 0
+        self.connections = 0
+        self.done = asyncio.Event()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def _handler(self, ws) -> None:
+        self.connections += 1
+        await ws.recv()  # wait for the first subscribe
+        sent = 0
+        step = self.trades_per_message
+        while self.position < len(self.prices):
+            lo, hi = self.position, min(self.position + step, len(self.prices))
+            if self.speed > 0 and lo > 0:
+                await asyncio.sleep(max(0.0, (self.ts_ms[lo] - self.ts_ms[lo - 1]) / 1000.0 / self.speed))
+            data = [{"s": self.symbol, "p": float(p), "t": int(t), "v": 0} for t, p in zip(self.ts_ms[lo:hi], self.prices[lo:hi])]
+            await ws.send(json.dumps({"type": "trade", "data": data}))
+            self.position = hi
+            sent += 1
+            if self.disconnect_every and sent % self.disconnect_every == 0 and self.position < len(self.prices):
+                await ws.close()
+                return
+        self.done.set()
+        await ws.wait_closed()
+
+    async def __aenter__(self) -> "ReplayServer":
+        from websockets.asyncio.server import serve
+
+        self._server = await serve(self._handler, "127.0.0.1", self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+# source(tickers, interval, period=None, start=None) -> DataFrame (index = dates, one column per ticker)
+PriceSource = Callable[..., pd.DataFrame]
+
+# How long a cached series is served without asking the source for newer bars
+DEFAULT_MAX_AGE: Dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(hours=6),
+    "1wk": timedelta(days=1),
+    "1mo": timedelta(days=1),
+}
+
+# A cached series "covers" a period if it starts at most this long after the period start
+# (weekends / holidays mean the first bar is rarely exactly on the start date)
+COVERAGE_SLACK = timedelta(days=7)
+
+# Relative gap between a re-fetched bar and its cached value beyond which the source is deemed to
+# have re-adjusted its history (split, dividend with auto_adjust=True, vendor correction)
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """First date covered by a yfinance-style period ("5d", "6mo", "2y", "ytd"). None for "max"."""
+    now = now or pd.Timestamp.now(tz="UTC").tz_localize(None)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+
+    m = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not m:
+        raise ValueError(f"Unsupported period: {period!r}")
+
+    n, unit = int(m.group(1)), m.group(2)
+    offset = {"d": pd.DateOffset(days=n), "wk": pd.DateOffset(weeks=n), "mo": pd.DateOffset(months=n), "y": pd.DateOffset(years=n)}[unit]
+    return (now - offset).normalize()
+
+
+def _naive(ts: pd.Timestamp) -> pd.Timestamp:
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+class FrameSource:
+    """Offline price source serving slices of a local DataFrame (tests, replays, no network)."""
+
+    def __init__(self, prices: pd.DataFrame):
+        self.prices = prices.sort_index()
+        self.calls: List[dict] = []
+
+    def __call__(self, tickers: List[str], interval: str, period: Optional[str] = None, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        self.calls.append({"tickers": list(tickers), "interval": interval, "period": period, "start": start})
+        cols = [t for t in tickers if t in self.prices.columns]
+        out = self.prices[cols]
+
+        first = start if start is not None else (period_start(period, _naive(out.index[-1])) if period and len(out) else None)
+        if first is not None:
+            out = out[out.index >= first]
+        return out.copy()
+
+
+class PriceCache:
+    """
+    On-disk Parquet cache of close prices, one file per (interval, ticker).
+    Fresh series are served as-is, stale ones are topped up with the bars after the last cached
+    date, and series that do not reach back far enough are downloaded in full.
+    A top-up re-fetches one completed cached bar as an anchor: when the source now reports another
+    value for it, the cached history is rescaled by that ratio before merging, so a split or
+    dividend re-adjustment does not leave a fake jump between the old and the new bars.
+    Series read from disk stay in memory until their file changes, and missing tickers are
+    fetched in batches of `batch_size` on up to `max_workers` threads, so a large selection is
+    assembled from cached columns plus a few concurrent downloads.
+    """
+
+    def __init__(self, root: Union[str, Path], source: PriceSource, max_age: Union[timedelta, Dict[str, timedelta], None] = None, max_workers: int = 8, batch_size: int = 50):
+        self.root = Path(root)
+        self.source = source
+        self.max_age = max_age if max_age is not None else DEFAULT_MAX_AGE
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.counters = {"hits": 0, "topups": 0, "misses": 0, "errors": 0, "readjusted": 0}
+        self._lock = threading.Lock()
+        self._memory: Dict[Tuple[str, str], Tuple[int, pd.Series]] = {}
+
+    # -- storage --------------------------------------------------------------
+    def _path(self, ticker: str, interval: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9._^=-]", "_", ticker)
+        return self.root / interval / f"{safe}.parquet"
+
+    def load(self, ticker: str, interval: str) -> pd.Series:
+        path = self._path(ticker, interval)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return pd.Series(dtype=float, name=ticker)
+
+        hit = self._memory.get((ticker, interval))
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+        series = pd.read_parquet(path)["close"].rename(ticker)
+        self._memory[(ticker, interval)] = (mtime, series)
+        return series
+
+    def store(self, ticker: str, interval: str, series: pd.Series) -> None:
+        path = self._path(ticker, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".parquet.{threading.get_ident()}.tmp")
+        series.rename("close").to_frame().to_parquet(tmp)
+        os.replace(tmp, path)  # atomic: readers never see a half-written file
+        self._memory[(ticker, interval)] = (path.stat().st_mtime_ns, series)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[key] += n
+
+    def _is_fresh(self, ticker: str, interval: str) -> bool:
+        max_age = self.max_age.get(interval, timedelta(0)) if isinstance(self.max_age, dict) else self.max_age
+        age = time.time() - self._path(ticker, interval).stat().st_mtime
+        return age <= max_age.total_seconds()
+
+    # -- public API -----------------------------------------------------------
+    def stats(self) -> dict:
+        served = self.counters["hits"] + self.counters["topups"] + self.counters["misses"]
+        return {**self.counters, "hit_rate": (self.counters["hits"] / served) if served else float("nan")}
+
+    def get(self, tickers: List[str], period: str = "2y", interval: str = "1d") -> pd.DataFrame:
+        """Close prices for tickers over period, reading the cache first and fetching only what is missing."""
+        return self._get(list(dict.fromkeys(tickers)), period, interval)
+
+    def _batches(self, tickers: List[str]) -> List[List[str]]:
+        return [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+
+    def _get(self, tickers: List[str], period: str, interval: str) -> pd.DataFrame:
+        start = period_start(period)
+        if len(tickers) > 16 and self.max_workers > 1:
+            # Parquet reads release the GIL: cold-loading a large selection is I/O bound
+            with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+                cached = dict(zip(tickers, ex.map(lambda t: self.load(t, interval), tickers)))
+        else:
+            cached = {t: self.load(t, interval) for t in tickers}
+
+        full: List[str] = []
+        topup: Dict[pd.Timestamp, List[str]] = {}
+        for t, s in cached.items():
+            if s.empty or (start is not None and _naive(s.index[0]) > start + COVERAGE_SLACK):
+                full.append(t)
+            elif self._is_fresh(t, interval):
+                self._count("hits")
+            else:
+                # Re-fetch from the bar before the last cached one: the last may have been a partial
+                # (intraday) bar, the one before is complete and anchors the adjustment check
+                topup.setdefault(s.index[-2] if len(s) > 1 else s.index[-1], []).append(t)
+
+        jobs = [dict(tickers=b, period=period) for b in self._batches(full)]
+        jobs += [dict(tickers=b, start=last) for last, group in topup.items() for b in self._batches(group)]
+        self._count("misses", len(full))
+        self._count("topups", sum(len(g) for g in topup.values()))
+
+        if len(jobs) == 1 or self.max_workers <= 1:
+            for job in jobs:
+                self._fetch_and_merge(cached, interval=interval, **job)
+        elif jobs:
+            # Every batch writes distinct tickers: safe to run side by side
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as ex:
+                list(ex.map(lambda job: self._fetch_and_merge(cached, interval=interval, **job), jobs))
+
+        frames = [cached[t] for t in tickers if not cached[t].empty]
+        if not frames:
+            return pd.DataFrame()
+
+        prices = pd.concat(frames, axis=1)
+        if start is not None:
+            first = start.tz_localize(prices.index.tz) if prices.index.tz is not None else start
+            prices = prices[prices.index >= first]
+        return prices
+
+    def _fetch_and_merge(self, cached: Dict[str, pd.Series], tickers: List[str], interval: str, period: Optional[str] = None, start: Optional[pd.Timestamp] = None) -> None:
+        try:
+            fresh = self.source(tickers, interval, period=period, start=start)
+        except Exception:
+            fresh = pd.DataFrame()
+
+        for t in tickers:
+            if fresh is None or t not in fresh.columns:
+                # Source failed: keep serving what we have (possibly stale)
+                self._count("errors")
+                continue
+
+            new = fresh[t].dropna()
+            if start is not None:
+                self._count("readjusted", self._rebase(cached, t, new, start))
+            merged = pd.concat([cached[t], new]) if not cached[t].empty else new
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index().astype(float).rename(t)
+            self.store(t, interval, merged)
+            cached[t] = merged
+
+    def _rebase(self, cached: Dict[str, pd.Series], ticker: str, new: pd.Series, anchor: pd.Timestamp) -> int:
+        """Rescale cached[ticker] onto the price basis of new when their anchor bars disagree; 1 if rescaled."""
+        old = cached[ticker]
+        if anchor not in old.index or anchor not in new.index or not old[anchor]:
+            return 0
+        ratio = float(new[anchor]) / float(old[anchor])
+        if abs(ratio - 1.0) <= ADJUSTMENT_TOLERANCE:
+            return 0
+        print(f"[WARN] {ticker}: source re-adjusted its history (x{ratio:.6g} at {anchor}), rescaling the cached series")
+        cached[ticker] = old * ratio
+        return 1
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Memory budget of the process-wide cache (MB), shared by every Streamlit session
+DEFAULT_MAX_MB = float(os.getenv("RESULT_CACHE_MB", "512"))
+
+
+def _feed(h, obj: Any) -> None:
+    """Add a canonical byte representation of obj to the hash h (content, not identity)."""
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes, date, datetime, timedelta, pd.Timestamp, np.generic)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, pd.DataFrame):
+        h.update(f"df{obj.shape}{list(obj.columns)!r}{list(obj.dtypes.astype(str))};".encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(f"series{obj.shape}{obj.name!r}{obj.dtype};".encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Index):
+        h.update(f"index{obj.shape}{obj.dtype};".encode())
+        h.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"nd{obj.shape}{obj.dtype};".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=repr):
+            _feed(h, k)
+            _feed(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[" if isinstance(obj, list) else b"(")
+        for x in obj:
+            _feed(h, x)
+        h.update(b"]")
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(f"{type(obj).__qualname__}(".encode())
+        for f in dataclasses.fields(obj):
+            _feed(h, f.name)
+            _feed(h, getattr(obj, f.name))
+        h.update(b")")
+    elif callable(obj):
+        h.update(f"fn:{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))};".encode())
+    else:
+        raise TypeError(f"Cannot content-hash object of type {type(obj).__name__}")
+
+
+def content_key(*parts: Any) -> str:
+    """Hex digest of the content of parts (DataFrames / arrays by value, dicts order-independent)."""
+    h = hashlib.blake2b(digest_size=20)
+    for p in parts:
+        _feed(h, p)
+    return h.hexdigest()
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """Approximate memory held by a cached result (pandas / numpy buffers, containers, dataclasses)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(x) for x in obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(getattr(obj, f.name)) for f in dataclasses.fields(obj))
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of computed results keyed by content hash, bounded by total size (bytes).
+    - single flight: concurrent requests for a key being computed wait for that computation
+      instead of starting their own; a failure is re-raised to every waiter and not cached
+    - results larger than the whole budget are returned but not kept
+    Cached objects are shared between callers (sessions): they must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024)):
+        self.max_bytes = int(max_bytes)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()  # key -> (value, nbytes, compute seconds)
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "errors": 0}
+        self.compute_seconds = 0.0  # spent on misses
+        self.saved_seconds = 0.0  # compute time of the entries served from cache
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                self.saved_seconds += entry[2]
+                return entry[0]
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                self.counters["misses"] += 1
+                leader = True
+            else:
+                self.counters["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            return pending.result()
+
+        t0 = time.perf_counter()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+                self.counters["errors"] += 1
+            pending.set_exception(e)
+            raise
+        seconds = time.perf_counter() - t0
+        nbytes = estimate_nbytes(value)
+
+        with self._lock:
+            del self._inflight[key]
+            self.compute_seconds += seconds
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (value, nbytes, seconds)
+                self.bytes += nbytes
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted, _) = self._entries.popitem(last=False)
+                    self.bytes -= evicted
+                    self.counters["evictions"] += 1
+        pending.set_result(value)
+        return value
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """fn(*args, **kwargs), memoized by the content of fn's name and every argument."""
+        key = content_key(fn, args, kwargs)
+        return self.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            served = self.counters["hits"] + self.counters["coalesced"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": (self.counters["hits"] + self.counters["coalesced"]) / served if served else float("nan"),
+                "entries": len(self._entries),
+                "mb": self.bytes / 1024 / 1024,
+                "max_mb": self.max_bytes / 1024 / 1024,
+                "compute_s": self.compute_seconds,
+                "saved_s": self.saved_seconds,
+            }
+
+
+_SHARED: Optional[ResultCache] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_cache() -> ResultCache:
+    """The process-wide cache (one per Streamlit server, shared by every session and page)."""
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = ResultCache()
+        return _SHARED
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_STORE_DIR = Path(os.getenv("PRECOMPUTE_DIR", BASE_DIR / "data" / "cache" / "precomputed"))
+
+
+@dataclass(frozen=True)
+class StoredResult:
+    name: str
+    version: str  # content key of the inputs the value was computed from
+    value: Any
+    computed_at: pd.Timestamp  # UTC
+    seconds: float  # compute time
+
+    def age_s(self, now: Optional[pd.Timestamp] = None) -> float:
+        now = now or pd.Timestamp.now(tz="UTC")
+        return (now - self.computed_at).total_seconds()
+
+
+class ResultStore:
+    """
+    Results shared between processes (precompute scheduler -> Streamlit server), one pickle per
+    view name under root. Writes are atomic (temp file + rename), so readers never see a partial
+    file. Reads are kept in memory until the file changes, so a page rerun costs one stat().
+    Files are only written by our own scheduler: pickle is fine here.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_STORE_DIR):
+        self.root = Path(root)
+        self._memory: Dict[str, Tuple[int, StoredResult]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name.replace('/', '__')}.pkl"
+
+    def put(self, name: str, value: Any, version: str, seconds: float = float("nan")) -> StoredResult:
+        item = StoredResult(name=name, version=version, value=value, computed_at=pd.Timestamp.now(tz="UTC"), seconds=seconds)
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return item
+
+    def get(self, name: str) -> Optional[StoredResult]:
+        path = self._path(name)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            hit = self._memory.get(name)
+            if hit is not None and hit[0] == mtime:
+                return hit[1]
+        try:
+            with open(path, "rb") as f:
+                item = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            print(f"[WARN] unreadable precomputed result {path}: {e}")
+            return None
+        with self._lock:
+            self._memory[name] = (mtime, item)
+        return item
+
+    def names(self) -> List[str]:
+        return sorted(p.stem.replace("__", "/") for p in self.root.glob("*.pkl"))
+
+    def remove(self, name: str) -> None:
+        self._path(name).unlink(missing_ok=True)
+        with self._lock:
+            self._memory.pop(name, None)
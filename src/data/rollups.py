@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from .tick_store import TickStore
+
+# Dashboard periodicity -> pandas rule. Every level divides a UTC day, so a day's buckets
+# only depend on that day's tick partition.
+LEVELS: Dict[str, str] = {"15min": "15min", "1H": "1h", "1D": "1D"}
+
+OHLC_COLUMNS = ["open", "high", "low", "close", "count"]
+
+
+def ohlc(prices: pd.Series, rule: str) -> pd.DataFrame:
+    """OHLC + tick count per bucket (bucket start label), empty buckets dropped."""
+    r = prices.resample(rule)
+    out = r.ohlc()
+    out["count"] = r.count()
+    return out[out["count"] > 0]
+
+
+def slice_days(index: pd.DatetimeIndex, start: Optional[date], end: Optional[date]) -> slice:
+    """Positional slice of a sorted UTC index covering the days [start, end] (binary search, no per-row dates)."""
+    lo = index.searchsorted(pd.Timestamp(start, tz="UTC")) if start is not None else 0
+    hi = index.searchsorted(pd.Timestamp(end, tz="UTC") + timedelta(days=1)) if end is not None else len(index)
+    return slice(lo, hi)
+
+
+class RollupStore:
+    """
+    Precomputed OHLC bars for each dashboard periodicity, one Parquet file per (symbol, level, month):
+        <root>/<SYMBOL>/<level>/<YYYY-MM>.parquet
+    Kept in sync with a TickStore by recomputing only the days that received new ticks.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def _path(self, symbol: str, level: str, month: str) -> Path:
+        return self.root / symbol.upper() / level / f"{month}.parquet"
+
+    def _months(self, symbol: str, level: str) -> List[str]:
+        d = self.root / symbol.upper() / level
+        return sorted(p.stem for p in d.glob("*.parquet")) if d.exists() else []
+
+    def _read_month(self, symbol: str, level: str, month: str) -> pd.DataFrame:
+        path = self._path(symbol, level, month)
+        if not path.exists():
+            return pd.DataFrame(columns=OHLC_COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="timestamp_utc"))
+        return pd.read_parquet(path)
+
+    def _write_month(self, symbol: str, level: str, month: str, df: pd.DataFrame) -> None:
+        path = self._path(symbol, level, month)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def update(self, ticks: TickStore, symbol: str, days: Iterable[date]) -> None:
+        """Recompute every level for the given days from their tick partitions."""
+        days = sorted(set(days))
+        if not days:
+            return
+
+        by_month: Dict[str, List[date]] = {}
+        for d in days:
+            by_month.setdefault(d.strftime("%Y-%m"), []).append(d)
+
+        for month, month_days in by_month.items():
+            raw = ticks.read(symbol, month_days[0], month_days[-1])
+            raw = raw[raw["timestamp_utc"].dt.date.isin(month_days)]
+            prices = raw.set_index("timestamp_utc")["price"]
+
+            for level, rule in LEVELS.items():
+                fresh = ohlc(prices, rule)
+                old = self._read_month(symbol, level, month)
+                keep = old[~pd.Index(old.index.date).isin(month_days)]
+                merged = pd.concat([keep, fresh]).sort_index() if len(keep) else fresh
+                merged.index.name = "timestamp_utc"
+                self._write_month(symbol, level, month, merged)
+
+    def rebuild(self, ticks: TickStore, symbol: str) -> None:
+        """Drop and recompute every rollup of symbol from the full tick history."""
+        for level in LEVELS:
+            for month in self._months(symbol, level):
+                self._path(symbol, level, month).unlink()
+        self.update(ticks, symbol, ticks.partitions(symbol))
+
+    def exists(self, symbol: str, level: str) -> bool:
+        return bool(self._months(symbol, level))
+
+    def read(self, symbol: str, level: str, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Bars of one level for the days [start, end], reading only the months in range."""
+        months = self._months(symbol, level)
+        lo = start.strftime("%Y-%m") if start is not None else None
+        hi = end.strftime("%Y-%m") if end is not None else None
+        months = [m for m in months if (lo is None or m >= lo) and (hi is None or m <= hi)]
+        if not months:
+            return self._read_month(symbol, level, "")
+
+        df = pd.concat([self._read_month(symbol, level, m) for m in months])
+        return df.iloc[slice_days(df.index, start, end)]
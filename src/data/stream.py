@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+FINNHUB_WS_URL = "wss://ws.finnhub.io"
+
+# {symbol: (timestamps in ns since epoch UTC, prices)}
+TickBatch = Dict[str, Tuple[np.ndarray, np.ndarray]]
+BatchSink = Callable[[TickBatch], None]
+
+
+class TickRingBuffer:
+    """
+    Bounded buffer of (symbol, timestamp_ns, price) in preallocated arrays.
+    When full, the oldest ticks are overwritten and counted in `dropped`.
+    drain() coalesces ticks sharing (symbol, timestamp): the last price wins.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self._sym = np.empty(capacity, dtype=np.int32)
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._px = np.empty(capacity, dtype=np.float64)
+        self._symbols: Dict[str, int] = {}
+        self._names: List[str] = []
+        self.start = 0
+        self.size = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _code(self, symbol: str) -> int:
+        code = self._symbols.get(symbol)
+        if code is None:
+            code = self._symbols[symbol] = len(self._names)
+            self._names.append(symbol)
+        return code
+
+    def push(self, symbol: str, ts_ns: int, price: float) -> None:
+        i = (self.start + self.size) % self.capacity
+        self._sym[i], self._ts[i], self._px[i] = self._code(symbol), ts_ns, price
+        if self.size == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.dropped += 1
+        else:
+            self.size += 1
+
+    def drain(self) -> TickBatch:
+        if self.size == 0:
+            return {}
+        order = (self.start + np.arange(self.size)) % self.capacity
+        sym, ts, px = self._sym[order], self._ts[order], self._px[order]
+        self.start, self.size = 0, 0
+
+        out: TickBatch = {}
+        for code in np.unique(sym):
+            sel = sym == code
+            s_ts, s_px = ts[sel], px[sel]
+            # Keep the last tick of each timestamp (arrival order), sorted by time
+            rev_ts = s_ts[::-1]
+            _, last = np.unique(rev_ts, return_index=True)
+            keep = len(s_ts) - 1 - last
+            out[self._names[code]] = (s_ts[keep], s_px[keep])
+        return out
+
+
+@dataclass
+class StreamStats:
+    messages: int = 0
+    ticks: int = 0
+    malformed: int = 0  # messages / trades skipped because they could not be parsed
+    flushes: int = 0
+    failed_flushes: int = 0  # sink errors; the batch is kept and retried at the next flush
+    ticks_flushed: int = 0
+    reconnects: int = 0
+    started: float = 0.0
+    finished: Optional[float] = None
+
+    @property
+    def ticks_per_sec(self) -> float:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.ticks / elapsed if elapsed > 0 else float("nan")
+
+
+class StreamIngestor:
+    """
+    Subscribes to a Finnhub-style trade feed ({"type": "trade", "data": [{"s", "p", "t"}, ...]}),
+    buffers ticks in a TickRingBuffer and hands them to `sink` in batches when `batch_size`
+    ticks are pending or every `flush_interval` seconds. Reconnects with backoff and re-subscribes.
+    """
+
+    def __init__(self, url: str, symbols: Sequence[str], sink: BatchSink, batch_size: int = 5_000, flush_interval: float = 5.0, capacity: int = 200_000, max_backoff: float = 60.0,):
+        self.url = url
+        self.symbols = [s.upper() for s in symbols]
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.buffer = TickRingBuffer(capacity)
+        self.stats = StreamStats()
+        self._failed: Optional[TickBatch] = None  # batch the sink raised on, written before newer ticks
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+
+    def _malformed(self, what: str, e: Exception) -> None:
+        self.stats.malformed += 1
+        if self.stats.malformed == 1:
+            print(f"[WARN] stream: skipping malformed {what} ({e!r}), further ones are only counted")
+
+    def _on_message(self, raw) -> None:
+        self.stats.messages += 1
+        try:
+            msg = json.loads(raw)
+            if msg.get("type") != "trade":
+                return  # ping / subscription acks
+            trades = list(msg.get("data") or ())
+        except (ValueError, TypeError, AttributeError) as e:
+            self._malformed("message", e)
+            return
+
+        for trade in trades:
+            try:
+                # Finnhub sends trade time in ms since epoch
+                symbol, ts_ns, price = trade["s"], int(trade["t"]) * 1_000_000, float(trade["p"])
+            except (KeyError, ValueError, TypeError) as e:
+                self._malformed("trade", e)
+                continue
+            self.buffer.push(symbol, ts_ns, price)
+            self.stats.ticks += 1
+        if len(self.buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self._failed is not None:
+            if not await self._write(self._failed):
+                return  # sink still failing: new ticks wait in the (bounded) ring buffer
+            self._failed = None
+        batch = self.buffer.drain()
+        if batch and not await self._write(batch):
+            self._failed = batch
+
+    async def _write(self, batch: TickBatch) -> bool:
+        n = sum(len(ts) for ts, _ in batch.values())
+        try:
+            # Storage writes are blocking: keep them off the event loop so the socket keeps draining
+            await asyncio.to_thread(self.sink, batch)
+        except Exception as e:
+            self.stats.failed_flushes += 1
+            print(f"[ERROR] stream: sink failed on {n} ticks, retrying at the next flush: {e!r}")
+            return False
+        self.stats.flushes += 1
+        self.stats.ticks_flushed += n
+        return True
+
+    async def _consume(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                async with connect(self.url, max_queue=None) as ws:
+                    for s in self.symbols:
+                        await ws.send(json.dumps({"type": "subscribe", "symbol": s}))
+                    backoff = 1.0
+                    async for raw in ws:
+                        self._on_message(raw)
+                    if self._stop.is_set():
+                        return
+            except (OSError, WebSocketException) as e:
+                print(f"[ERROR] stream: {e}")
+            if self._stop.is_set():
+                return
+
+            self.stats.reconnects += 1
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(self.max_backoff, backoff * 2)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    async def run(self, duration: Optional[float] = None) -> StreamStats:
+        """Ingest until stop() (or for `duration` seconds); pending ticks are flushed on exit."""
+        self.stats.started = time.monotonic()
+        flusher = asyncio.create_task(self._flush_loop())
+        consumer = asyncio.create_task(self._consume())
+        stopper = asyncio.create_task(self._stop.wait())
+        try:
+            await asyncio.wait([consumer, stopper], timeout=duration, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.stop()
+            consumer.cancel()
+            await asyncio.gather(consumer, stopper, return_exceptions=True)
+            await flusher
+            await self.flush()
+            if self.stats.finished is None:
+                self.stats.finished = time.monotonic()
+        return self.stats
+
+
+async def replay_benchmark(ticks: pd.DataFrame, symbol: str = "AAPL", speed: float = 0.0, batch_size: int = 5_000, trades_per_message: int = 50) -> StreamStats:
+    """Replay recorded ticks through a local ReplayServer into a no-op sink and return throughput stats."""
+    from .mock_feeds import ReplayServer
+
+    async with ReplayServer(ticks, symbol=symbol, speed=speed, trades_per_message=trades_per_message) as srv:
+        ingestor = StreamIngestor(srv.url, [symbol], lambda batch: None, batch_size=batch_size)
+        task = asyncio.create_task(ingestor.run())
+        await srv.done.wait()
+        # let the socket drain what was already sent
+        # (compare with what the server sent: rows it could not parse were never sent)
+        while ingestor.stats.ticks < len(srv.prices) and not task.done():
+            await asyncio.sleep(0.01)
+        ingestor.stats.finished = time.monotonic()  # throughput over the replay only, not shutdown
+        ingestor.stop()
+        stats = await task
+    return stats
+
+
+if __name__ == "__main__":
+    # python -m src.data.stream data/aapl_prices.csv [speed]
+    df = pd.read_csv(sys.argv[1])
+    speed = float(sys.argv[2]) if len(sys.argv) >= 3 else 0.0
+    st = asyncio.run(replay_benchmark(df, speed=speed))
+    print(f"{st.ticks} ticks, {st.flushes} flushes, {st.ticks_per_sec:,.0f} ticks/sec")
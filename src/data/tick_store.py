@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+import pandas as pd
+
+DateLike = Union[str, date, pd.Timestamp]
+
+COLUMNS = ["timestamp_utc", "price"]
+
+
+def _utc(x: DateLike) -> pd.Timestamp:
+    t = pd.Timestamp(x)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+
+def _is_instant(x: Optional[DateLike]) -> bool:
+    """True for timestamps ("2026-01-08T14:30"), False for plain days ("2026-01-08", date objects)."""
+    return isinstance(x, datetime) or (isinstance(x, str) and ("T" in x or " " in x))
+
+
+def _to_ticks(timestamps, prices) -> pd.DataFrame:
+    """Typed tick frame: timestamp_utc (datetime64[ns, UTC]) + price (float64), sorted, deduplicated."""
+    df = pd.DataFrame({
+        "timestamp_utc": pd.to_datetime(timestamps, utc=True, errors="coerce"),
+        "price": pd.to_numeric(pd.Series(prices), errors="coerce").to_numpy(dtype=float),
+    })
+    df = df.dropna(subset=COLUMNS)
+    # First occurrence wins, like the CSV loaders (former dashboard.load_prices, CsvTailReader)
+    return df.drop_duplicates(subset=["timestamp_utc"], keep="first").sort_values("timestamp_utc").reset_index(drop=True)
+
+
+class TickStore:
+    """
+    Price ticks stored as one Parquet file per (symbol, UTC day):
+        <root>/<SYMBOL>/<YYYY-MM-DD>.parquet
+    Appends only rewrite the partitions they touch, reads only open partitions in the date range.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol.upper()
+
+    def _path(self, symbol: str, day: date) -> Path:
+        return self._dir(symbol) / f"{day.isoformat()}.parquet"
+
+    def partitions(self, symbol: str) -> List[date]:
+        """Sorted list of days that have data for symbol."""
+        d = self._dir(symbol)
+        if not d.exists():
+            return []
+        return sorted(date.fromisoformat(p.stem) for p in d.glob("*.parquet"))
+
+    def exists(self, symbol: str) -> bool:
+        return bool(self.partitions(symbol))
+
+    def _read_partition(self, symbol: str, day: date) -> pd.DataFrame:
+        path = self._path(symbol, day)
+        if not path.exists():
+            return pd.DataFrame({"timestamp_utc": pd.Series(dtype="datetime64[ns, UTC]"), "price": pd.Series(dtype=float)})
+        return pd.read_parquet(path, columns=COLUMNS)
+
+    def _write_partition(self, symbol: str, day: date, df: pd.DataFrame) -> None:
+        path = self._path(symbol, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)  # atomic swap: the dashboard never reads a half-written day
+
+    def append(self, symbol: str, timestamps, prices) -> int:
+        """Add ticks (any timestamp/price arrays). Ticks on timestamps already stored are ignored. Returns rows written."""
+        new = _to_ticks(timestamps, prices)
+        if new.empty:
+            return 0
+
+        days = new["timestamp_utc"].dt.date.to_numpy()
+        for day in pd.unique(days):
+            part = new[days == day]
+            merged = pd.concat([self._read_partition(symbol, day), part], ignore_index=True)
+            if len(merged) > len(part):
+                merged = merged.drop_duplicates(subset=["timestamp_utc"], keep="first").sort_values("timestamp_utc")
+            self._write_partition(symbol, day, merged.reset_index(drop=True))
+        return len(new)
+
+    def replace(self, symbol: str, timestamps, prices) -> int:
+        """Drop every partition of symbol and write the given ticks (full history rewrite)."""
+        for day in self.partitions(symbol):
+            self._path(symbol, day).unlink()
+        return self.append(symbol, timestamps, prices)
+
+    def read(self, symbol: str, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> pd.DataFrame:
+        """
+        Ticks of symbol between start and end (inclusive, UTC). Dates select whole days;
+        timestamps are also applied inside the boundary partitions.
+        """
+        days = self.partitions(symbol)
+        lo = (_utc(start) if _is_instant(start) else pd.Timestamp(start)).date() if start is not None else None
+        hi = (_utc(end) if _is_instant(end) else pd.Timestamp(end)).date() if end is not None else None
+        days = [d for d in days if (lo is None or d >= lo) and (hi is None or d <= hi)]
+        if not days:
+            return self._read_partition(symbol, date.min)
+
+        df = pd.concat([self._read_partition(symbol, d) for d in days], ignore_index=True)
+
+        # Exact bounds when timestamps (not plain dates) were given
+        if _is_instant(start):
+            df = df[df["timestamp_utc"] >= _utc(start)]
+        if _is_instant(end):
+            df = df[df["timestamp_utc"] <= _utc(end)]
+        return df.reset_index(drop=True)
+
+    def last_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        days = self.partitions(symbol)
+        if not days:
+            return None
+        return self._read_partition(symbol, days[-1])["timestamp_utc"].iloc[-1]
+
+
+def migrate_csv(csv_path: Union[str, Path], store: TickStore, symbol: str, chunksize: int = 1_000_000) -> int:
+    """One-shot import of a legacy `timestamp_utc,price` CSV into the store. Returns rows imported."""
+    total = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        missing = set(COLUMNS) - set(chunk.columns)
+        if missing:
+            raise ValueError(f"CSV invalide. Colonnes manquantes: {missing}")
+        total += store.append(symbol, chunk["timestamp_utc"].to_numpy(), chunk["price"].to_numpy())
+    return total
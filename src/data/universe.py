@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import io
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+import pandas as pd
+import requests
+
+# Nasdaq Trader symbol directory: every Nasdaq / NYSE / NYSE American / Arca listing, refreshed daily
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_INDEX_PATH = Path(os.getenv("SYMBOL_INDEX_PATH", BASE_DIR / "data" / "cache" / "universe" / "symbols.parquet"))
+
+COLUMNS = ["symbol", "name", "exchange", "etf"]
+
+# Always available (offline fallback, and assets the directory does not list)
+BUILTIN = pd.DataFrame(
+    [
+        ("AAPL", "Apple Inc.", "NASDAQ", False),
+        ("MSFT", "Microsoft Corporation", "NASDAQ", False),
+        ("GOOGL", "Alphabet Inc. Class A", "NASDAQ", False),
+        ("AMZN", "Amazon.com, Inc.", "NASDAQ", False),
+        ("META", "Meta Platforms, Inc.", "NASDAQ", False),
+        ("NVDA", "NVIDIA Corporation", "NASDAQ", False),
+        ("TSLA", "Tesla, Inc.", "NASDAQ", False),
+        ("SPY", "SPDR S&P 500 ETF Trust", "ARCA", True),
+        ("QQQ", "Invesco QQQ Trust", "NASDAQ", True),
+        ("GLD", "SPDR Gold Shares", "ARCA", True),
+        ("BTC-USD", "Bitcoin USD", "CRYPTO", False),
+        ("ETH-USD", "Ethereum USD", "CRYPTO", False),
+    ],
+    columns=COLUMNS,
+)
+
+OTHER_EXCHANGES = {"A": "NYSE American", "N": "NYSE", "P": "ARCA", "Z": "BATS", "V": "IEX"}
+
+
+def parse_symbol_directory(text: str, symbol_col: str, exchange: Optional[str] = None) -> pd.DataFrame:
+    """One pipe-delimited Nasdaq Trader file -> symbol / name / exchange / etf, test issues dropped."""
+    df = pd.read_csv(io.StringIO(text), sep="|", dtype=str, keep_default_na=False)
+    df = df[~df[symbol_col].str.startswith("File Creation Time")]
+    if "Test Issue" in df.columns:
+        df = df[df["Test Issue"] != "Y"]
+
+    out = pd.DataFrame({
+        "symbol": df[symbol_col].str.strip(),
+        "name": df["Security Name"].str.strip(),
+        "exchange": exchange if exchange is not None else df["Exchange"].map(OTHER_EXCHANGES).fillna(df["Exchange"]),
+        "etf": df["ETF"].eq("Y"),
+    })
+    # Preferreds / warrants / units carry '$' or '+'; Yahoo writes class shares with '-' (BRK.B -> BRK-B)
+    out = out[~out["symbol"].str.contains(r"[$+]", regex=True) & out["symbol"].ne("")]
+    out["symbol"] = out["symbol"].str.replace(".", "-", regex=False)
+    return out
+
+
+def download_symbol_directory(timeout: float = 30.0) -> pd.DataFrame:
+    """Every listed US symbol (~10k rows) from the two Nasdaq Trader directory files."""
+    with requests.Session() as session:
+        nasdaq = session.get(NASDAQ_LISTED_URL, timeout=timeout)
+        nasdaq.raise_for_status()
+        other = session.get(OTHER_LISTED_URL, timeout=timeout)
+        other.raise_for_status()
+
+    return pd.concat([
+        parse_symbol_directory(nasdaq.text, "Symbol", exchange="NASDAQ"),
+        parse_symbol_directory(other.text, "ACT Symbol"),
+    ], ignore_index=True)
+
+
+class SymbolIndex:
+    """
+    Searchable table of symbols (symbol, name, exchange, etf).
+    search() ranks exact symbol > symbol prefix > name word prefix > substring, as vectorized
+    string operations over the whole table (a few ms for ~10k symbols).
+    """
+
+    def __init__(self, symbols: pd.DataFrame):
+        df = pd.concat([BUILTIN, symbols[COLUMNS]], ignore_index=True)
+        df = df.drop_duplicates("symbol", keep="first").reset_index(drop=True)
+        self.table = df
+        self._sym = df["symbol"].str.upper()
+        self._name = df["name"].str.upper()
+        # O(1) lookups for label() / `in`: label is a Streamlit format_func, called per option on every rerun
+        self._names = dict(zip(self._sym, df["name"]))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.upper() in self._names
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.table["symbol"].tolist()
+
+    def search(self, query: str, limit: int = 50) -> pd.DataFrame:
+        q = query.strip().upper()
+        if not q:
+            return self.table.head(0)
+
+        rank = pd.Series(99, index=self.table.index)
+        rank[self._sym.str.contains(q, regex=False) | self._name.str.contains(q, regex=False)] = 3
+        rank[self._name.str.startswith(q) | self._name.str.contains(" " + q, regex=False)] = 2
+        rank[self._sym.str.startswith(q)] = 1
+        rank[self._sym == q] = 0
+
+        hits = self.table.assign(_rank=rank, _len=self._sym.str.len())
+        hits = hits[hits["_rank"] < 99].sort_values(["_rank", "_len", "symbol"], kind="stable")
+        return hits.drop(columns=["_rank", "_len"]).head(limit).reset_index(drop=True)
+
+    def label(self, symbol: str) -> str:
+        """'AAPL — Apple Inc.' for pickers (the bare symbol when unknown)."""
+        name = self._names.get(symbol.upper())
+        return f"{symbol} — {name}" if name is not None else symbol
+
+    @classmethod
+    def load(cls, cache_path: Union[str, Path] = DEFAULT_INDEX_PATH, max_age_s: float = 86_400.0, fetch: Callable[[], pd.DataFrame] = download_symbol_directory) -> "SymbolIndex":
+        """
+        Index from a Parquet copy of the directory, re-downloaded when older than max_age_s.
+        Falls back to the stale copy, then to the built-in symbols, when the download fails.
+        """
+        path = Path(cache_path)
+        fresh = path.exists() and time.time() - path.stat().st_mtime <= max_age_s
+        if not fresh:
+            try:
+                table = fetch()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".parquet.tmp")
+                table.to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+            except Exception as e:
+                print(f"[WARN] symbol directory download failed: {e}")
+
+        if path.exists():
+            return cls(pd.read_parquet(path))
+        return cls(BUILTIN)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+from .metrics import path_metrics
+
 
 @dataclass
 class BacktestResult:
@@ -15,6 +17,20 @@ class BacktestResult:
     weights_history: pd.DataFrame  # daily weights held 
 
 
+@dataclass
+class BacktestSweep:
+    dates: pd.DatetimeIndex
+    tickers: List[str]
+    weights: np.ndarray  # (n_configs, n_assets) normalized target weights
+    rebalance: List[str]  # rebalance frequency of each config
+    values: np.ndarray  # (n_configs, n_dates) portfolio value paths
+    metrics: pd.DataFrame  # one row per config: ann_return, ann_vol, sharpe, max_drawdown
+
+    def value_frame(self) -> pd.DataFrame:
+        """Value paths as a DataFrame (dates x configs)."""
+        return pd.DataFrame(self.values.T, index=self.dates)
+
+
 def compute_returns(prices: pd.DataFrame) -> pd.DataFrame:
     """Compute simple daily returns from a price DataFrame."""
     if prices is None or prices.empty:
@@ -67,31 +83,65 @@ def rebalance_dates(index: pd.DatetimeIndex, freq: str) -> pd.DatetimeIndex:
     return pd.DatetimeIndex([])
 
 
-def backtest_portfolio(prices: pd.DataFrame, weights: Optional[Dict[str, float]] = None, initial_value: float = 100.0, rebalance: str = "Monthly",) -> BacktestResult:
-    """
-    Simple portfolio backtest:
-    - drift daily using asset returns
-    - optionally rebalance at a chosen frequency
-    """
-    if prices is None or prices.empty:
-        return BacktestResult(prices=pd.DataFrame(),returns=pd.DataFrame(), portfolio_value=pd.Series(dtype=float), weights_history=pd.DataFrame(),)
+def _empty_result() -> BacktestResult:
+    return BacktestResult(prices=pd.DataFrame(), returns=pd.DataFrame(), portfolio_value=pd.Series(dtype=float), weights_history=pd.DataFrame(),)
 
-    # Clean input
+
+def _prepare_backtest(prices: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Clean the price panel and align it on the returns index (shared by every engine)."""
     prices = prices.sort_index().dropna(how="all").dropna(axis=1, how="all")
-    tickers = list(prices.columns)
 
     # Returns start at t1 (after pct_change)
     rets = compute_returns(prices)
     if rets.empty:
-        return BacktestResult(prices=pd.DataFrame(), returns=pd.DataFrame(), portfolio_value=pd.Series(dtype=float), weights_history=pd.DataFrame(),)
+        return pd.DataFrame(), pd.DataFrame()
 
-    prices_bt = prices.loc[rets.index]
+    return prices.loc[rets.index], rets
 
-    # Target weights
+
+def _target_weights(weights: Optional[Dict[str, float]], tickers: List[str]) -> Dict[str, float]:
     if weights is None:
-        target_w = {t: 1.0 / len(tickers) for t in tickers}
-    else:
-        target_w = normalize_weights(weights, tickers)
+        return {t: 1.0 / len(tickers) for t in tickers}
+    return normalize_weights(weights, tickers)
+
+
+def _rebalance_positions(index: pd.DatetimeIndex, freq: str) -> np.ndarray:
+    """Integer positions of rebalance dates in index (position 0 is the initial allocation, never a rebalance)."""
+    pos = np.flatnonzero(index.isin(rebalance_dates(index, freq)))
+    return pos[pos > 0]
+
+
+def drift_holdings(growth: np.ndarray, target_w: np.ndarray, initial_value: float, rb_pos: np.ndarray) -> np.ndarray:
+    """
+    Holdings path (n_dates x n_assets) for a drifting portfolio reset to target_w at rb_pos.
+    growth is 1 + returns with NaN already replaced by 0 return. Between two rebalances the
+    holdings are a cumulative product of growth, seeded with the holdings at the segment start,
+    so each step multiplies in the same order as the reference loop.
+    target_w may also be 2-D (len(rb_pos) + 1, n_assets): one target per segment (walk-forward).
+    """
+    n = growth.shape[0]
+    targets = np.atleast_2d(target_w)
+    holdings = np.empty_like(growth, dtype=float)
+    h0 = initial_value * targets[0]
+
+    bounds = np.concatenate(([0], rb_pos, [n]))
+    for k in range(len(bounds) - 1):
+        s, e = bounds[k], bounds[k + 1]
+        if k > 0:
+            # Drift into the rebalance date, then reset to target weights
+            drifted = holdings[s - 1] * growth[s]
+            h0 = float(drifted.sum()) * targets[min(k, len(targets) - 1)]
+
+        seg = growth[s:e].copy()
+        seg[0] = h0
+        np.cumprod(seg, axis=0, out=holdings[s:e])
+
+    return holdings
+
+
+def _backtest_loop(prices_bt: pd.DataFrame, rets: pd.DataFrame, target_w: Dict[str, float], initial_value: float, rebalance: str) -> Tuple[pd.Series, pd.DataFrame]:
+    """Reference engine: one Python step per date. Kept to check parity of the NumPy engine."""
+    tickers = list(prices_bt.columns)
 
     # Prepare outputs
     portfolio_value = pd.Series(index=prices_bt.index, dtype=float)
@@ -122,5 +172,127 @@ def backtest_portfolio(prices: pd.DataFrame, weights: Optional[Dict[str, float]]
         portfolio_value.loc[dt] = pv
         weights_hist.loc[dt] = (holdings / pv).values
 
+    return portfolio_value, weights_hist
+
+
+def _backtest_numpy(prices_bt: pd.DataFrame, rets: pd.DataFrame, target_w: Dict[str, float], initial_value: float, rebalance: str) -> Tuple[pd.Series, pd.DataFrame]:
+    """Vectorized engine: segment-wise cumulative products between rebalance dates."""
+    tickers = list(prices_bt.columns)
+    w = np.array([target_w[t] for t in tickers], dtype=float)
+
+    growth = 1.0 + np.nan_to_num(rets.to_numpy(dtype=float), nan=0.0)
+    holdings = drift_holdings(growth, w, initial_value, _rebalance_positions(prices_bt.index, rebalance))
+
+    pv = holdings.sum(axis=1)
+    portfolio_value = pd.Series(pv, index=prices_bt.index, dtype=float)
+    weights_hist = pd.DataFrame(holdings / pv[:, None], index=prices_bt.index, columns=tickers, dtype=float)
+    return portfolio_value, weights_hist
+
+
+_ENGINES = {"numpy": _backtest_numpy, "loop": _backtest_loop}
+
+
+def backtest_portfolio(prices: pd.DataFrame, weights: Optional[Dict[str, float]] = None, initial_value: float = 100.0, rebalance: str = "Monthly", engine: str = "numpy",) -> BacktestResult:
+    """
+    Simple portfolio backtest:
+    - drift daily using asset returns
+    - optionally rebalance at a chosen frequency
+    engine: "numpy" (vectorized, default) or "loop" (reference, one step per date)
+    """
+    if engine not in _ENGINES:
+        raise ValueError(f"Unknown backtest engine: {engine!r} (expected one of {sorted(_ENGINES)})")
+
+    if prices is None or prices.empty:
+        return _empty_result()
+
+    # Clean input
+    prices_bt, rets = _prepare_backtest(prices)
+    if rets.empty:
+        return _empty_result()
+
+    # Target weights
+    target_w = _target_weights(weights, list(prices_bt.columns))
+
+    portfolio_value, weights_hist = _ENGINES[engine](prices_bt, rets, target_w, initial_value, rebalance)
+
     return BacktestResult(prices=prices_bt, returns=rets, portfolio_value=portfolio_value, weights_history=weights_hist,)
 
+
+def _normalize_weight_rows(w: np.ndarray) -> np.ndarray:
+    """Row-wise normalize_weights: rows summing to <= 0 fall back to equal-weight."""
+    s = w.sum(axis=1, keepdims=True)
+    equal = np.full_like(w, 1.0 / w.shape[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(s > 0, w / s, equal)
+
+
+def sweep_values(growth: np.ndarray, target_w: np.ndarray, initial_value: float, rb_pos: np.ndarray) -> np.ndarray:
+    """
+    Value paths (n_configs x n_dates) for many target weight vectors sharing one rebalance schedule.
+    Each segment between rebalances is a single matrix product of the configs' holdings with the
+    segment's cumulative growth, so the cost does not depend on the number of dates per config.
+    """
+    n = growth.shape[0]
+    values = np.empty((target_w.shape[0], n), dtype=float)
+    h0 = initial_value * target_w
+
+    bounds = np.concatenate(([0], rb_pos, [n]))
+    for k in range(len(bounds) - 1):
+        s, e = bounds[k], bounds[k + 1]
+        seg = growth[s:e].copy()
+        seg[0] = 1.0
+        cum = np.cumprod(seg, axis=0)
+        values[:, s:e] = h0 @ cum.T
+
+        if e < n:
+            # Drift into the next rebalance date, then reset every config to its targets
+            pv = (h0 * (cum[-1] * growth[e])).sum(axis=1)
+            h0 = pv[:, None] * target_w
+
+    return values
+
+
+def backtest_many(prices: pd.DataFrame, weights_matrix: Union[np.ndarray, pd.DataFrame, Sequence[Dict[str, float]]], rebalance_list: Union[str, Sequence[str]], initial_value: float = 100.0,) -> BacktestSweep:
+    """
+    Run many backtests on one price panel in a single batched computation.
+    weights_matrix: one row per config (ndarray aligned on prices.columns, DataFrame with ticker
+    columns, or a list of weight dicts). rebalance_list: one frequency per config, or a single
+    frequency applied to all. Cleaning, returns and rebalance dates are computed once per panel.
+    """
+    if prices is None or prices.empty:
+        raise ValueError("backtest_many needs a non-empty price panel")
+
+    if isinstance(weights_matrix, np.ndarray):
+        weights_df = pd.DataFrame(np.atleast_2d(weights_matrix), columns=prices.columns)
+    else:
+        weights_df = pd.DataFrame(weights_matrix)
+
+    n_configs = len(weights_df)
+    if isinstance(rebalance_list, str):
+        rebalance_list = [rebalance_list] * n_configs
+    rebalance_list = list(rebalance_list)
+    if len(rebalance_list) != n_configs:
+        raise ValueError(f"Got {n_configs} weight rows but {len(rebalance_list)} rebalance frequencies")
+
+    # Shared preprocessing
+    prices_bt, rets = _prepare_backtest(prices)
+    if rets.empty:
+        raise ValueError("Not enough price history to compute returns")
+
+    tickers = list(prices_bt.columns)
+    w = weights_df.reindex(columns=tickers).fillna(0.0).to_numpy(dtype=float)
+    w = _normalize_weight_rows(w)
+
+    growth = 1.0 + np.nan_to_num(rets.to_numpy(dtype=float), nan=0.0)
+    values = np.empty((n_configs, len(prices_bt)), dtype=float)
+
+    # One batched pass per distinct frequency (at most four)
+    freqs = np.asarray(rebalance_list, dtype=object)
+    for freq in dict.fromkeys(rebalance_list):
+        rows = np.flatnonzero(freqs == freq)
+        values[rows] = sweep_values(growth, w[rows], initial_value, _rebalance_positions(prices_bt.index, freq))
+
+    metrics = path_metrics(values)
+    metrics.insert(0, "rebalance", rebalance_list)
+
+    return BacktestSweep(dates=prices_bt.index, tickers=tickers, weights=w, rebalance=rebalance_list, values=values, metrics=metrics,)
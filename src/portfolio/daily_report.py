@@ -1,50 +1,220 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Union
 
 import pandas as pd
 
-from src.data.market_data import get_prices
-from src.portfolio.backtest import backtest_portfolio
-from src.portfolio.metrics import (annualized_return, annualized_vol, max_drawdown, portfolio_daily_returns, sharpe_ratio,)
+# One import root for the whole app: src/ (what `streamlit run src/...` and `python src/app.py` get
+# for free). `python -m src.portfolio.daily_report` runs from the repo root, so add it here.
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
 
+from data.market_data import price_cache
 
-DEFAULT_TICKERS = ["AAPL", "MSFT", "GOOGL"]
-
+from .backtest import backtest_portfolio
+from .incremental import IncrementalBacktest
+from .metrics import fused_metrics
 
-def run_daily_report(tickers: Optional[List[str]] = None, out_dir: str = "reports") -> Path:
-    """Create a daily CSV report with portfolio metrics and save it in /reports."""
-    tickers = tickers or DEFAULT_TICKERS
 
-    prices = get_prices(tickers, period="2y", interval="1d")
-    if prices.empty:
-        # No data -> no report
-        return Path()
+DEFAULT_TICKERS = ["AAPL", "MSFT", "GOOGL"]
 
-    result = backtest_portfolio(prices=prices, weights=None, initial_value=100.0, rebalance="Monthly")
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CONFIG = Path(os.getenv("REPORT_CONFIG", BASE_DIR / "config" / "portfolios.json"))
+
+REPORT_COLUMNS = ["report_date", "timestamp_utc", "portfolio", "tickers", "rebalance", "period", "start_date", "last_date", "portfolio_last_value", "ann_return", "ann_vol", "sharpe", "max_drawdown", "error"]
+
+
+@dataclass
+class PortfolioSpec:
+    name: str
+    tickers: List[str]
+    weights: Optional[Dict[str, float]] = None  # None -> equal-weight
+    rebalance: str = "Monthly"
+    period: str = "2y"
+    initial_value: float = 100.0
+
+
+@dataclass
+class ReportRun:
+    path: Path  # partition written
+    rows: pd.DataFrame  # one row per portfolio
+    fetched: List[str] = field(default_factory=list)  # distinct tickers fetched (once each)
+
+
+def load_portfolios(path: Union[str, Path] = DEFAULT_CONFIG) -> List[PortfolioSpec]:
+    """
+    Portfolios from a JSON config:
+    {"defaults": {"period": "2y", "rebalance": "Monthly"},
+     "portfolios": [{"name": "core_tech", "tickers": ["AAPL", "MSFT"], "weights": {"AAPL": 0.6, "MSFT": 0.4}}, ...]}
+    Without a config file, the single historical DEFAULT_TICKERS portfolio.
+    """
+    path = Path(path)
+    if not path.exists():
+        return [PortfolioSpec(name="default", tickers=list(DEFAULT_TICKERS))]
+
+    cfg = json.loads(path.read_text(encoding="utf-8"))
+    defaults = cfg.get("defaults", {})
+    specs = []
+    for item in cfg.get("portfolios", []):
+        spec = PortfolioSpec(**{**defaults, **item})
+        spec.tickers = [t.strip().upper() for t in spec.tickers]
+        if not spec.tickers:
+            raise ValueError(f"Portfolio {spec.name!r} has no tickers ({path})")
+        specs.append(spec)
+
+    names = [s.name for s in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate portfolio names in {path}")
+    return specs
+
+
+def fetch_shared_prices(specs: Sequence[PortfolioSpec], interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """
+    One price panel per distinct period, covering the union of the tickers of the portfolios
+    using it: every ticker is read / downloaded once (the price cache fetches missing ones in
+    concurrent batches), then each portfolio slices its own columns.
+    """
+    by_period: Dict[str, List[str]] = {}
+    for spec in specs:
+        by_period.setdefault(spec.period, [])
+        by_period[spec.period] += [t for t in spec.tickers if t not in by_period[spec.period]]
+
+    panels = {}
+    for period, tickers in by_period.items():
+        try:
+            panels[period] = price_cache().get(tickers, period=period, interval=interval)
+        except Exception as e:
+            print(f"[WARN] price fetch failed for {len(tickers)} tickers ({period}): {e}")
+            panels[period] = pd.DataFrame()
+    return panels
+
+
+def _portfolio_prices(panel: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
+    # Same cleaning as get_prices, per portfolio: rows are dropped only for this portfolio's own gaps
+    prices = panel[[t for t in tickers if t in panel.columns]]
+    prices.index = pd.to_datetime(prices.index, errors="coerce")
+    return prices.dropna().sort_index()
+
+
+def evaluate_portfolio(spec: PortfolioSpec, panel: pd.DataFrame, checkpoint_dir: Optional[Path] = None, restate_from: Optional[date] = None) -> dict:
+    """
+    One report row: last value + metrics, or the reason there are none.
+    With checkpoint_dir, the portfolio's IncrementalBacktest only advances over the bars after
+    its checkpoint (metrics since its start date); otherwise a full backtest over the period.
+    """
+    row = {"portfolio": spec.name, "tickers": ",".join(spec.tickers), "rebalance": spec.rebalance, "period": spec.period, "start_date": None, "last_date": None, "portfolio_last_value": float("nan"), "ann_return": float("nan"), "ann_vol": float("nan"), "sharpe": float("nan"), "max_drawdown": float("nan"), "error": None}
+
+    missing = [t for t in spec.tickers if t not in panel.columns]
+    if missing:
+        row["error"] = f"no prices for {','.join(missing)}"
+        return row
+
+    prices = _portfolio_prices(panel, spec.tickers)
+    if checkpoint_dir is not None:
+        bt = IncrementalBacktest(checkpoint_dir, spec.name, spec.tickers, spec.weights, spec.rebalance, spec.initial_value, spec.period)
+        if restate_from is not None:
+            bt.restate(restate_from, prices)
+        else:
+            bt.advance(prices)
+        if bt.checkpoint is None:
+            row["error"] = "empty backtest"
+            return row
+        row.update(bt.summary())
+        return row
+
+    result = backtest_portfolio(prices=prices, weights=spec.weights, initial_value=spec.initial_value, rebalance=spec.rebalance)
     if result.portfolio_value.empty:
-        return Path()
-
-    port_rets = portfolio_daily_returns(result.portfolio_value)
+        row["error"] = "empty backtest"
+        return row
+
+    row.update(start_date=str(result.portfolio_value.index[0].date()), last_date=str(result.portfolio_value.index[-1].date()), portfolio_last_value=float(result.portfolio_value.iloc[-1]), **fused_metrics(result.portfolio_value))
+    return row
+
+
+def _safe_evaluate(spec: PortfolioSpec, panel: pd.DataFrame, checkpoint_dir: Optional[Path], restate_from: Optional[date]) -> dict:
+    # One failing portfolio (corrupt checkpoint, bad prices...) must not cost the others their row
+    try:
+        return evaluate_portfolio(spec, panel, checkpoint_dir, restate_from)
+    except Exception as e:
+        return {"portfolio": spec.name, "tickers": ",".join(spec.tickers), "rebalance": spec.rebalance, "period": spec.period, "error": f"{type(e).__name__}: {e}"}
+
+
+def write_report_partition(rows: pd.DataFrame, report_date: date, out_dir: Union[str, Path] = "reports") -> Path:
+    """
+    Upsert rows into reports/history/date=YYYY-MM-DD/report.parquet (hive-style, readable as one
+    dataset by pyarrow / pandas). Rows of portfolios already in that day's partition are
+    replaced, so rerunning a day is idempotent. Atomic write (temp file + rename).
+    """
+    part_dir = Path(out_dir) / "history" / f"date={report_date.isoformat()}"
+    part_dir.mkdir(parents=True, exist_ok=True)
+    path = part_dir / "report.parquet"
+
+    if path.exists():
+        old = pd.read_parquet(path)
+        rows = pd.concat([old[~old["portfolio"].isin(rows["portfolio"])], rows], ignore_index=True)
+
+    tmp = path.with_suffix(".parquet.tmp")
+    rows.sort_values("portfolio").reset_index(drop=True).to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def read_report_history(out_dir: Union[str, Path] = "reports", start: Optional[date] = None, end: Optional[date] = None, portfolios: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Report rows with report_date in [start, end]; only the partitions in range are opened."""
+    root = Path(out_dir) / "history"
+    days = sorted(date.fromisoformat(p.name.split("=", 1)[1]) for p in root.glob("date=*") if (p / "report.parquet").exists())
+    days = [d for d in days if (start is None or d >= start) and (end is None or d <= end)]
+    if not days:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    filters = [("portfolio", "in", list(portfolios))] if portfolios is not None else None
+    frames = [pd.read_parquet(root / f"date={d.isoformat()}" / "report.parquet", filters=filters) for d in days]
+    out = pd.concat(frames, ignore_index=True)
+    out["report_date"] = pd.to_datetime(out["report_date"]).dt.date
+    return out.sort_values(["report_date", "portfolio"]).reset_index(drop=True)
+
+
+def run_daily_report(config: Union[str, Path, Sequence[PortfolioSpec], None] = None, out_dir: str = "reports", max_workers: Optional[int] = None, incremental: bool = True, restate_from: Optional[date] = None) -> ReportRun:
+    """
+    Evaluate every configured portfolio and append today's rows to the report history.
+    Prices are fetched once per distinct ticker; portfolios are evaluated on a thread pool
+    (the backtests are NumPy-bound and share the read-only price panels).
+    incremental: advance each portfolio's checkpoint (reports/checkpoints/<name>) by the new
+    bars only, rerunning a day is a no-op; restate_from replays every bar from that date
+    (vendor corrections). incremental=False re-runs the full backtest over the period.
+    """
+    specs = load_portfolios(config if config is not None else DEFAULT_CONFIG) if not isinstance(config, (list, tuple)) else list(config)
+    panels = fetch_shared_prices(specs)
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(specs)) or 1) as ex:
+        checkpoint_dir = Path(out_dir) / "checkpoints" if incremental else None
+        rows = list(ex.map(lambda s: _safe_evaluate(s, panels[s.period], checkpoint_dir, restate_from), specs))
 
     now_utc = datetime.now(timezone.utc)
-    report = {"timestamp_utc": now_utc.isoformat(timespec="seconds"), "tickers": ",".join(tickers), "last_date": str(result.portfolio_value.index[-1].date()), "portfolio_last_value": float(result.portfolio_value.iloc[-1]), "ann_return": annualized_return(result.portfolio_value), "ann_vol": annualized_vol(port_rets), "sharpe": sharpe_ratio(port_rets), "max_drawdown": max_drawdown(result.portfolio_value),}
-
-    out_path = Path(out_dir)
-    out_path.mkdir(parents=True, exist_ok=True)
-
-    filename = f"portfolio_report_{now_utc.strftime('%Y%m%d')}.csv"
-    file_path = out_path / filename
+    df = pd.DataFrame(rows, columns=REPORT_COLUMNS[2:])
+    df.insert(0, "timestamp_utc", now_utc.isoformat(timespec="seconds"))
+    df.insert(0, "report_date", now_utc.date().isoformat())
 
-    pd.DataFrame([report]).to_csv(file_path, index=False)
-    return file_path
+    path = write_report_partition(df, now_utc.date(), out_dir)
+    fetched = sorted({t for p in panels.values() for t in p.columns})
+    return ReportRun(path=path, rows=df, fetched=fetched)
 
 
 if __name__ == "__main__":
-    path = run_daily_report()
-    if path:
-        print("Report written to:", path)
-    else:
-        print("No report generated (missing data).")
+    # python -m src.portfolio.daily_report [config.json] [--restate YYYY-MM-DD] [--full]
+    args = sys.argv[1:]
+    restate = date.fromisoformat(args[args.index("--restate") + 1]) if "--restate" in args else None
+    positional = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or args[i - 1] != "--restate")]
+    run = run_daily_report(positional[0] if positional else None, incremental="--full" not in args, restate_from=restate)
+    ok = run.rows["error"].isna()
+    print(f"Report written to: {run.path} ({int(ok.sum())}/{len(run.rows)} portfolios, {len(run.fetched)} tickers fetched once)")
+    for _, r in run.rows[~ok].iterrows():
+        print(f"[WARN] {r['portfolio']}: {r['error']}")
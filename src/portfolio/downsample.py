@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# About two points per horizontal pixel of a full-width chart
+DEFAULT_MAX_POINTS = 2_000
+
+METHODS = ("minmax", "lttb")
+
+
+def _as_float(x: pd.Index) -> np.ndarray:
+    if isinstance(x, pd.DatetimeIndex):
+        return x.asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions of the first, last, and the min and max of each of n_out // 2 equal-count buckets,
+    in time order. Every local extreme that is a bucket extreme survives, so peaks and drawdown
+    troughs are kept exactly. NaN points are ignored. Fully vectorized (one lexsort).
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= n_out:
+        return valid
+
+    n_buckets = max(1, (n_out - 2) // 2)
+    bucket = (np.arange(len(valid)) * n_buckets) // len(valid)
+    order = np.lexsort((y[valid], bucket))  # by bucket, then by value
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    keep = np.concatenate(([valid[0], valid[-1]], valid[order[starts]], valid[order[ends]]))
+    return np.unique(keep)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: one point per bucket, the one forming the largest triangle
+    with the previous pick and the next bucket's average. Smoother than min/max at the same
+    budget, but a single spike can be dropped. One NumPy pass per bucket.
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n <= n_out or n_out < 3:
+        return valid
+
+    xv, yv = x[valid], y[valid]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 inner buckets
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = xv[nlo:nhi].mean(), yv[nlo:nhi].mean()
+        area = np.abs((xv[a] - cx) * (yv[lo:hi] - yv[a]) - (xv[a] - xv[lo:hi]) * (cy - yv[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return valid[out]
+
+
+def downsample(series: pd.Series, max_points: Optional[int] = DEFAULT_MAX_POINTS, method: str = "minmax") -> pd.Series:
+    """Subset of series small enough to plot (unchanged when already short or max_points is None)."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method!r} (expected one of {METHODS})")
+    if max_points is None or series is None or len(series) <= max_points:
+        return series
+
+    y = series.to_numpy(dtype=float)
+    if method == "minmax":
+        idx = minmax_indices(y, max_points)
+    else:
+        idx = lttb_indices(_as_float(series.index), y, max_points)
+    return series.iloc[idx]
+
+
+def make_trace(series: Union[pd.Series, np.ndarray], index: Optional[pd.Index] = None, max_points: Optional[int] = DEFAULT_MAX_POINTS, use_gl: bool = False, method: str = "minmax", **kwargs) -> go.Scatter:
+    """
+    Line trace of one series reduced to max_points (go.Scattergl when use_gl).
+    Resolution is per call: plotting a narrower date range gives back every point.
+    """
+    if not isinstance(series, pd.Series):
+        series = pd.Series(np.asarray(series, dtype=float), index=index)
+    s = downsample(series, max_points, method)
+    cls = go.Scattergl if use_gl else go.Scatter
+    return cls(x=s.index, y=s.to_numpy(), **kwargs)
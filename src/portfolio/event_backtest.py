@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .backtest import BacktestResult, _prepare_backtest, _rebalance_positions, _target_weights
+
+PerAsset = Union[float, Dict[str, float]]
+
+
+@dataclass
+class CostModel:
+    """
+    Proportional trading costs in basis points of the traded value, either one number for every
+    asset or a {ticker: bps} dict (missing tickers cost 0). spread_bps is the full bid/ask
+    spread: a trade pays half of it.
+    """
+    commission_bps: PerAsset = 0.0
+    spread_bps: PerAsset = 0.0
+    slippage_bps: PerAsset = 0.0
+
+    @staticmethod
+    def _per_asset(value: PerAsset, tickers: List[str]) -> np.ndarray:
+        if isinstance(value, dict):
+            return np.array([float(value.get(t, 0.0)) for t in tickers])
+        return np.full(len(tickers), float(value))
+
+    def rates(self, tickers: List[str]) -> np.ndarray:
+        """Cost per unit of traded value for each ticker."""
+        bps = (self._per_asset(self.commission_bps, tickers) + 0.5 * self._per_asset(self.spread_bps, tickers) + self._per_asset(self.slippage_bps, tickers))
+        return bps / 10_000.0
+
+
+@dataclass
+class RebalanceRule:
+    """
+    When to trade back to the target weights:
+    - calendar: "Never", "Weekly", "Monthly" or "Quarterly" (same dates as backtest_portfolio)
+    - band: trade as soon as one weight is more than `band` away from its target, in weight
+      points (0.05 = 5%), or as a fraction of the target when relative=True
+    Both triggers can be combined; the first one hit wins.
+    """
+    calendar: str = "Never"
+    band: Optional[float] = None
+    relative: bool = False
+
+    def thresholds(self, target_w: np.ndarray) -> Optional[np.ndarray]:
+        if self.band is None or self.band <= 0:
+            return None
+        return self.band * target_w if self.relative else np.full_like(target_w, self.band)
+
+
+@dataclass
+class EventBacktestResult(BacktestResult):
+    events: pd.DataFrame = field(default_factory=pd.DataFrame)  # one row per rebalance: trigger, turnover, cost
+
+    @property
+    def total_costs(self) -> float:
+        return float(self.events["cost"].sum()) if not self.events.empty else 0.0
+
+    @property
+    def total_turnover(self) -> float:
+        return float(self.events["turnover"].sum()) if not self.events.empty else 0.0
+
+
+def _trade_to_target(h: np.ndarray, target_w: np.ndarray, rates: np.ndarray, tol: float = 1e-12) -> Tuple[np.ndarray, float, float]:
+    """
+    Post-trade holdings when costs are paid out of the portfolio: the post-trade value V' solves
+    V' = V - sum(|V' w - h| * rates), a contraction solved by fixed point in a few iterations.
+    Returns (holdings, cost, one-way turnover as a fraction of the pre-trade value).
+    """
+    value = float(h.sum())
+    post = value
+    for _ in range(50):
+        cost = float(np.abs(post * target_w - h) @ rates)
+        if abs(value - cost - post) <= tol * value:
+            break
+        post = value - cost
+    post = value - cost
+    turnover = 0.5 * float(np.abs(post * target_w - h).sum()) / value if value else 0.0
+    return post * target_w, cost, turnover
+
+
+def event_holdings(growth: np.ndarray, target_w: np.ndarray, initial_value: float, cal_pos: np.ndarray, thresholds: Optional[np.ndarray] = None, rates: Optional[np.ndarray] = None, block: int = 64,) -> Tuple[np.ndarray, List[Tuple[int, str, float, float]]]:
+    """
+    Holdings path (n_dates x n_assets) with calendar and drift-band rebalancing, plus the events
+    as (position, trigger, turnover, cost).
+    Only events are processed in Python: after each one, the drifted holdings are computed for a
+    block of dates at once (seeded cumulative product, as drift_holdings) and the band is checked
+    on the whole block; the block doubles until a breach or the next calendar date is found.
+    """
+    n, k = growth.shape
+    rates = np.zeros(k) if rates is None else rates
+    holdings = np.empty((n, k), dtype=float)
+    h = holdings[0] = initial_value * target_w
+    events: List[Tuple[int, str, float, float]] = []
+
+    t = 1
+    while t < n:
+        j = int(np.searchsorted(cal_pos, t))
+        has_cal = j < len(cal_pos)
+        stop = int(cal_pos[j]) + 1 if has_cal else n  # search [t, stop)
+
+        hit = None
+        lo, size, carry = t, block, h
+        while lo < stop:
+            hi = min(stop, lo + size)
+            seg = np.empty((hi - lo + 1, k))
+            seg[0] = carry
+            seg[1:] = growth[lo:hi]
+            path = np.cumprod(seg, axis=0)[1:]
+            holdings[lo:hi] = path
+
+            if thresholds is not None:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    w = path / path.sum(axis=1, keepdims=True)
+                out = np.flatnonzero((np.abs(w - target_w) > thresholds).any(axis=1))
+                if len(out):
+                    hit = lo + int(out[0])
+                    break
+            carry = path[-1]
+            lo = hi
+            size *= 2
+
+        if hit is None:
+            if not has_cal:
+                break
+            hit = stop - 1
+
+        trigger = "calendar" if has_cal and hit == stop - 1 else "band"
+        h, cost, turnover = _trade_to_target(holdings[hit], target_w, rates)
+        holdings[hit] = h
+        events.append((hit, trigger, turnover, cost))
+        t = hit + 1
+
+    return holdings, events
+
+
+def backtest_events(prices: pd.DataFrame, weights: Optional[Dict[str, float]] = None, initial_value: float = 100.0, rule: Optional[RebalanceRule] = None, costs: Optional[CostModel] = None,) -> EventBacktestResult:
+    """
+    Portfolio backtest with calendar and/or drift-band rebalancing and trading costs.
+    Same cleaning, returns and calendar dates as backtest_portfolio: with no band and no costs
+    the value path matches it to floating-point rounding. Costs are paid out of the portfolio
+    on each rebalance; the initial allocation is free, as in backtest_portfolio.
+    """
+    rule = rule or RebalanceRule("Monthly")
+    costs = costs or CostModel()
+
+    if prices is None or prices.empty:
+        return EventBacktestResult(prices=pd.DataFrame(), returns=pd.DataFrame(), portfolio_value=pd.Series(dtype=float), weights_history=pd.DataFrame())
+
+    prices_bt, rets = _prepare_backtest(prices)
+    if rets.empty:
+        return EventBacktestResult(prices=pd.DataFrame(), returns=pd.DataFrame(), portfolio_value=pd.Series(dtype=float), weights_history=pd.DataFrame())
+
+    tickers = list(prices_bt.columns)
+    target = _target_weights(weights, tickers)
+    w = np.array([target[t] for t in tickers], dtype=float)
+
+    growth = 1.0 + np.nan_to_num(rets.to_numpy(dtype=float), nan=0.0)
+    holdings, events = event_holdings(
+        growth, w, initial_value, _rebalance_positions(prices_bt.index, rule.calendar), thresholds=rule.thresholds(w), rates=costs.rates(tickers),
+    )
+
+    pv = holdings.sum(axis=1)
+    pos = [e[0] for e in events]
+    events_df = pd.DataFrame(
+        {"trigger": [e[1] for e in events], "turnover": [e[2] for e in events], "cost": [e[3] for e in events], "value": pv[pos]},
+        index=prices_bt.index[pos],
+    )
+
+    return EventBacktestResult(
+        prices=prices_bt,
+        returns=rets,
+        portfolio_value=pd.Series(pv, index=prices_bt.index, dtype=float),
+        weights_history=pd.DataFrame(holdings / pv[:, None], index=prices_bt.index, columns=tickers, dtype=float),
+        events=events_df,
+    )
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .backtest import _rebalance_positions, _target_weights, drift_holdings
+from .metrics import MetricsState
+
+# Relative price gap beyond which a bar already processed is considered changed by the source
+PRICE_TOLERANCE = 1e-4
+
+
+@dataclass
+class BacktestCheckpoint:
+    """Terminal state of an incremental backtest: enough to continue with the next bars only."""
+    tickers: List[str]
+    target: List[float]  # normalized target weights, same order as tickers
+    rebalance: str
+    initial_value: float
+    last_date: str  # ISO date of the last processed bar
+    last_prices: List[float]  # prices at last_date (next bar's returns start from them)
+    holdings: List[float]  # value held per asset at last_date
+    last_rebalance: Optional[str] = None
+    start_date: Optional[str] = None  # first bar (value = initial_value)
+    period: Optional[str] = None  # price history window the backtest was seeded from ("2y")
+    metrics: MetricsState = field(default_factory=MetricsState)
+
+    @property
+    def value(self) -> float:
+        return float(sum(self.holdings))
+
+    def matches(self, tickers: List[str], target: List[float], rebalance: str, initial_value: float, period: Optional[str] = None) -> bool:
+        return self.tickers == tickers and np.allclose(self.target, target, rtol=0, atol=1e-12) and self.rebalance == rebalance and self.initial_value == initial_value and self.period == period
+
+    def to_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self), indent=1)
+
+    @classmethod
+    def from_json(cls, text: str) -> "BacktestCheckpoint":
+        raw = json.loads(text)
+        raw["metrics"] = MetricsState(**raw["metrics"])
+        return cls(**raw)
+
+
+class IncrementalBacktest:
+    """
+    Drifting / calendar-rebalanced backtest (same rules as backtest_portfolio) advanced bar by
+    bar across runs. Under root/<name>/:
+    - checkpoint.json: holdings, last prices, last rebalance date and running MetricsState
+    - journal/part-YYYYMMDD.parquet: the rows added by each run (date, value, holdings, prices,
+      rebalanced), needed only to restate
+    advance() processes the bars after the checkpoint only (O(new bars), whatever the history
+    length) and is idempotent: bars already processed are ignored. restate(from_date) drops
+    everything from that date and replays corrected prices from there.
+    advance() first checks the checkpoint bar against the new prices: a source that re-based its
+    history (split, dividend adjustment) is followed from the new basis, and bars whose returns
+    changed (vendor corrections, a partial last bar) are restated automatically.
+    From the same prices, the path equals backtest_portfolio's on the same window.
+    """
+
+    def __init__(self, root: Union[str, Path], name: str, tickers: List[str], weights: Optional[Dict[str, float]] = None, rebalance: str = "Monthly", initial_value: float = 100.0, period: Optional[str] = None):
+        self.dir = Path(root) / name
+        self.tickers = list(tickers)
+        target = _target_weights(weights, self.tickers)
+        self.target = [float(target[t]) for t in self.tickers]
+        self.rebalance = rebalance
+        self.initial_value = float(initial_value)
+        self.period = period
+        self.checkpoint = self._load()
+
+    @property
+    def _checkpoint_path(self) -> Path:
+        return self.dir / "checkpoint.json"
+
+    @property
+    def _journal_dir(self) -> Path:
+        return self.dir / "journal"
+
+    def _load(self) -> Optional[BacktestCheckpoint]:
+        if not self._checkpoint_path.exists():
+            return None
+        ckpt = BacktestCheckpoint.from_json(self._checkpoint_path.read_text(encoding="utf-8"))
+        if not ckpt.matches(self.tickers, self.target, self.rebalance, self.initial_value, self.period):
+            # Different portfolio definition under the same name: its history no longer applies
+            print(f"[WARN] {self.dir.name}: portfolio definition changed, starting a new backtest")
+            shutil.rmtree(self.dir)
+            return None
+        return ckpt
+
+    def _save(self, ckpt: BacktestCheckpoint) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._checkpoint_path.with_suffix(".json.tmp")
+        tmp.write_text(ckpt.to_json(), encoding="utf-8")
+        os.replace(tmp, self._checkpoint_path)
+        self.checkpoint = ckpt
+
+    def _append_journal(self, rows: pd.DataFrame) -> None:
+        self._journal_dir.mkdir(parents=True, exist_ok=True)
+        path = self._journal_dir / f"part-{rows.index[0]:%Y%m%d}.parquet"
+        tmp = path.with_suffix(".parquet.tmp")
+        rows.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def _clean(self, prices: pd.DataFrame) -> pd.DataFrame:
+        missing = [t for t in self.tickers if t not in prices.columns]
+        if missing:
+            raise ValueError(f"Missing prices for {missing}")
+        out = prices[self.tickers].copy()
+        out.index = pd.DatetimeIndex(pd.to_datetime(out.index)).normalize()
+        return out.dropna().sort_index()
+
+    def _seed(self, prices: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """First run: like backtest_portfolio, the value starts at initial_value on the 2nd price date."""
+        if len(prices) < 2:
+            return None
+        first = prices.index[1]
+        h0 = np.array(self.target) * self.initial_value
+        metrics = MetricsState()
+        metrics.update(float(h0.sum()))
+        self._save(BacktestCheckpoint(
+            tickers=self.tickers, target=self.target, rebalance=self.rebalance, initial_value=self.initial_value,
+            last_date=first.date().isoformat(), last_prices=prices.iloc[1].tolist(), holdings=h0.tolist(),
+            start_date=first.date().isoformat(), period=self.period, metrics=metrics,
+        ))
+        return self._journal_rows(pd.DatetimeIndex([first]), h0[None, :], prices.iloc[[1]].to_numpy(), np.array([False]))
+
+    def _journal_rows(self, dates: pd.DatetimeIndex, holdings: np.ndarray, prices: np.ndarray, rebalanced: np.ndarray) -> pd.DataFrame:
+        rows = pd.DataFrame(holdings, index=dates.rename("date"), columns=[f"h:{t}" for t in self.tickers])
+        rows[[f"p:{t}" for t in self.tickers]] = prices
+        rows.insert(0, "value", holdings.sum(axis=1))
+        rows["rebalanced"] = rebalanced
+        return rows
+
+    def advance(self, prices: pd.DataFrame) -> pd.Series:
+        """Process the bars of prices after the checkpoint; returns their portfolio values (empty if none)."""
+        prices = self._clean(prices)
+        if self.checkpoint is not None:
+            self._reconcile(prices)
+        seeded = None
+        if self.checkpoint is None:
+            seeded = self._seed(prices)
+            if seeded is None:
+                return pd.Series(dtype=float)
+
+        ckpt = self.checkpoint
+        last = pd.Timestamp(ckpt.last_date)
+        new = prices[prices.index > last]
+        if new.empty:
+            if seeded is not None:
+                self._append_journal(seeded)
+                return seeded["value"]
+            return pd.Series(dtype=float)
+
+        # Chain = checkpoint bar + new bars: row 0 is the state we resume from (not re-applied)
+        px = np.vstack([ckpt.last_prices, new.to_numpy(dtype=float)])
+        growth = np.ones_like(px)
+        growth[1:] = px[1:] / px[:-1]
+        growth = np.nan_to_num(growth, nan=1.0)
+        chain = pd.DatetimeIndex([last]).append(new.index)
+        rb_pos = _rebalance_positions(chain, self.rebalance)
+
+        # Segment 0 resumes the checkpoint holdings as-is (initial value 1 x holdings), later ones reset to target
+        targets = np.vstack([np.array(ckpt.holdings)] + [np.array(self.target)] * len(rb_pos))
+        holdings = drift_holdings(growth, targets, 1.0, rb_pos)[1:]
+        values = holdings.sum(axis=1)
+
+        rebalanced = np.zeros(len(new), dtype=bool)
+        rebalanced[rb_pos - 1] = True
+        metrics = dataclasses.replace(ckpt.metrics)
+        metrics.update_many(values)
+
+        rows = self._journal_rows(new.index, holdings, new.to_numpy(dtype=float), rebalanced)
+        if seeded is not None:
+            rows = pd.concat([seeded, rows])
+        self._append_journal(rows)
+        self._save(dataclasses.replace(
+            ckpt, last_date=new.index[-1].date().isoformat(), last_prices=new.iloc[-1].tolist(), holdings=holdings[-1].tolist(),
+            last_rebalance=new.index[rebalanced][-1].date().isoformat() if rebalanced.any() else ckpt.last_rebalance, metrics=metrics,
+        ))
+        return rows["value"]
+
+    def journal(self) -> pd.DataFrame:
+        parts = sorted(self._journal_dir.glob("part-*.parquet"))
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(p) for p in parts]).sort_index()
+
+    def values(self) -> pd.Series:
+        """Full portfolio value history (reads the journal)."""
+        j = self.journal()
+        return j["value"] if not j.empty else pd.Series(dtype=float)
+
+    def _reconcile(self, prices: pd.DataFrame) -> None:
+        """
+        Align the checkpoint with prices when the source changed bars already processed.
+        Journal prices vs new prices, per asset: a constant ratio is a re-basing (returns unchanged,
+        only last_prices move to the new basis); a ratio that changes between two bars means the
+        returns from that bar on changed, so everything from it is restated.
+        """
+        ckpt = self.checkpoint
+        last = pd.Timestamp(ckpt.last_date)
+        if last not in prices.index or np.allclose(prices.loc[last], ckpt.last_prices, rtol=PRICE_TOLERANCE, atol=0):
+            return  # usual case: one row compared, the journal is not read
+
+        j = self.journal()
+        common = j.index.intersection(prices.index)
+        if len(common) > 1:
+            ratio = prices.loc[common].to_numpy(dtype=float) / j.loc[common, [f"p:{t}" for t in self.tickers]].to_numpy(dtype=float)
+            changed = np.flatnonzero((np.abs(ratio[1:] / ratio[:-1] - 1.0) > PRICE_TOLERANCE).any(axis=1))
+            if len(changed):
+                cut = common[changed[0] + 1]
+                print(f"[WARN] {self.dir.name}: prices changed since {cut.date()}, restating from there")
+                self._truncate(cut)
+                if self.checkpoint is None:
+                    return
+                last = pd.Timestamp(self.checkpoint.last_date)
+                if np.allclose(prices.loc[last], self.checkpoint.last_prices, rtol=PRICE_TOLERANCE, atol=0):
+                    return
+
+        print(f"[WARN] {self.dir.name}: prices re-based up to {last.date()} (split / dividend adjustment), continuing from the new basis")
+        self._save(dataclasses.replace(self.checkpoint, last_prices=prices.loc[last].tolist()))
+
+    def _truncate(self, cut: pd.Timestamp) -> None:
+        """Forget every bar from cut on: journal rewritten, checkpoint rebuilt from the row before it."""
+        j = self.journal()
+        keep = j[j.index < cut] if not j.empty else j  # no journal yet: nothing to keep, seed from scratch
+        if keep.empty:
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self.checkpoint = None
+            return
+
+        # Rewrite the journal without the restated rows
+        for p in sorted(self._journal_dir.glob("part-*.parquet")):
+            p.unlink()
+        self._append_journal(keep)
+
+        metrics = MetricsState()
+        metrics.update_many(keep["value"].to_numpy())
+        rb = keep.index[keep["rebalanced"].to_numpy(dtype=bool)]
+        last = keep.iloc[-1]
+        self._save(dataclasses.replace(
+            self.checkpoint, last_date=keep.index[-1].date().isoformat(),
+            last_prices=[float(last[f"p:{t}"]) for t in self.tickers], holdings=[float(last[f"h:{t}"]) for t in self.tickers],
+            last_rebalance=rb[-1].date().isoformat() if len(rb) else None, metrics=metrics,
+        ))
+
+    def restate(self, from_date: Union[str, date, pd.Timestamp], prices: pd.DataFrame) -> pd.Series:
+        """
+        Forget every bar from from_date on (e.g. vendor corrections), rebuild the checkpoint from
+        the journal row just before it, then advance over the corrected prices.
+        Restating from the start date or earlier starts over from prices.
+        """
+        self._truncate(pd.Timestamp(from_date).normalize())
+        return self.advance(prices)
+
+    def summary(self, periods_per_year: int = 252) -> dict:
+        """Last value and metrics since start_date, from the checkpoint alone."""
+        ckpt = self.checkpoint
+        if ckpt is None:
+            return {}
+        return {"start_date": ckpt.start_date, "last_date": ckpt.last_date, "portfolio_last_value": ckpt.value, **ckpt.metrics.summary(periods_per_year=periods_per_year)}
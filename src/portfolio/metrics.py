@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
 
@@ -89,3 +91,121 @@ def diversification_effect(weights: pd.Series, cov: pd.DataFrame) -> float:
     weighted_avg_vol = float(np.sum(np.abs(w) * indiv_vols))
     return float(weighted_avg_vol - port_vol)
 
+
+
+def path_metrics(values: np.ndarray, rf: float = 0.0, periods_per_year: int = 252) -> pd.DataFrame:
+    """Summary metrics for many value paths at once (one row per path, paths stacked along axis 0).
+    Same definitions as annualized_return / annualized_vol / sharpe_ratio / max_drawdown."""
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    n_paths, n = values.shape
+    out = pd.DataFrame(np.nan, index=range(n_paths), columns=["ann_return", "ann_vol", "sharpe", "max_drawdown"])
+    if n == 0:
+        return out
+
+    out["max_drawdown"] = (values / np.maximum.accumulate(values, axis=1) - 1.0).min(axis=1)
+    if n < 2:
+        return out
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = values[:, -1] / values[:, 0]
+        out["ann_return"] = np.where(growth > 0, growth ** (periods_per_year / (n - 1)) - 1.0, np.nan)
+
+        rets = values[:, 1:] / values[:, :-1] - 1.0
+        rets[~np.isfinite(rets)] = np.nan
+        vol = np.nanstd(rets, axis=1, ddof=1) if n > 2 else np.full(n_paths, np.nan)
+        out["ann_vol"] = vol * np.sqrt(periods_per_year)
+
+        excess_mean = np.nanmean(rets, axis=1) - rf / periods_per_year
+        out["sharpe"] = np.where(vol > 0, excess_mean / vol * np.sqrt(periods_per_year), np.nan)
+
+    return out
+
+
+@dataclass
+class MetricsState:
+    """
+    Running accumulators over a portfolio value series: first/last value, running peak, worst
+    drawdown, and Welford moments of the periodic returns. Feed it one value at a time (update)
+    or whole arrays (update_many); summary() gives the same numbers as annualized_return,
+    annualized_vol, sharpe_ratio and max_drawdown without recomputing from scratch.
+    """
+    n_values: int = 0
+    first: float = float("nan")
+    last: float = float("nan")
+    peak: float = -np.inf
+    max_dd: float = float("nan")
+    n_rets: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, value: float) -> None:
+        value = float(value)
+        if self.n_values:
+            r = value / self.last - 1.0 if self.last != 0 else float("nan")
+            if np.isfinite(r):
+                # Welford
+                self.n_rets += 1
+                delta = r - self.mean
+                self.mean += delta / self.n_rets
+                self.m2 += delta * (r - self.mean)
+        else:
+            self.first = value
+
+        self.peak = max(self.peak, value)
+        dd = value / self.peak - 1.0
+        self.max_dd = dd if np.isnan(self.max_dd) else min(self.max_dd, dd)
+        self.last = value
+        self.n_values += 1
+
+    def update_many(self, values) -> None:
+        v = np.asarray(values, dtype=float).ravel()
+        if v.size == 0:
+            return
+
+        chain = np.concatenate(([self.last], v)) if self.n_values else v
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rets = chain[1:] / chain[:-1] - 1.0
+        rets = rets[np.isfinite(rets)]
+        if rets.size:
+            # Merge the chunk's moments into the running ones (Chan et al.)
+            nb, mb = rets.size, float(rets.mean())
+            m2b = float(((rets - mb) ** 2).sum())
+            n = self.n_rets + nb
+            delta = mb - self.mean
+            self.mean += delta * nb / n
+            self.m2 += m2b + delta * delta * self.n_rets * nb / n
+            self.n_rets = n
+
+        peak = np.maximum(np.maximum.accumulate(v), self.peak)
+        dd = float((v / peak - 1.0).min())
+        self.max_dd = dd if np.isnan(self.max_dd) else min(self.max_dd, dd)
+        self.peak = float(peak[-1])
+
+        if not self.n_values:
+            self.first = float(v[0])
+        self.last = float(v[-1])
+        self.n_values += v.size
+
+    def summary(self, rf: float = 0.0, periods_per_year: int = 252) -> dict:
+        nan = float("nan")
+        out = {"ann_return": nan, "ann_vol": nan, "sharpe": nan, "max_drawdown": self.max_dd if self.n_values else nan}
+
+        if self.n_values >= 2:
+            growth = self.last / self.first
+            if growth > 0:
+                out["ann_return"] = float(growth ** (periods_per_year / (self.n_values - 1)) - 1.0)
+
+        if self.n_rets >= 2:
+            vol = float(np.sqrt(self.m2 / (self.n_rets - 1)))
+            out["ann_vol"] = float(vol * np.sqrt(periods_per_year))
+            if vol > 0:
+                out["sharpe"] = float((self.mean - rf / periods_per_year) / vol * np.sqrt(periods_per_year))
+        return out
+
+
+def fused_metrics(values: pd.Series, rf: float = 0.0, periods_per_year: int = 252) -> dict:
+    """ann_return, ann_vol, sharpe and max_drawdown of a portfolio value series in one go."""
+    state = MetricsState()
+    if values is not None and not values.empty:
+        state.update_many(values.to_numpy(dtype=float))
+    return state.summary(rf=rf, periods_per_year=periods_per_year)
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import diversification_effect
+
+SHRINKAGE_METHODS = ("sample", "ledoit_wolf")
+
+
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf (2004) shrinkage of the sample covariance towards a scaled identity.
+    Returns (covariance, intensity in [0, 1]). Keeps the matrix well conditioned when the number
+    of assets is not small compared to the number of observations.
+    """
+    x = returns - returns.mean(axis=0)
+    t, k = x.shape
+    sample = x.T @ x / t
+    mu = np.trace(sample) / k
+    target = mu * np.eye(k)
+
+    d2 = float(((sample - target) ** 2).sum())
+    # average squared distance of the one-observation estimates x_t x_t' to the sample covariance
+    sq = x * x
+    b2 = float(((sq.T @ sq).sum() - t * (sample ** 2).sum()) / (t * t))
+    b2 = min(max(b2, 0.0), d2)
+    intensity = b2 / d2 if d2 > 0 else 1.0
+
+    cov = intensity * target + (1.0 - intensity) * sample
+    return cov * t / max(t - 1, 1), intensity  # same ddof=1 scale as DataFrame.cov()
+
+
+@dataclass
+class CovarianceModel:
+    """
+    Annualized expected returns and covariance of a set of assets, with the factorizations the
+    optimizers need. The inverse of each covariance sub-matrix (assets left free by the long-only
+    constraint) is computed once from its Cholesky factor and reused by every later solve, so
+    frontier points and reruns sharing an active set cost a few matrix-vector products.
+    """
+    tickers: List[str]
+    mu: np.ndarray  # (k,) annualized mean returns
+    cov: np.ndarray  # (k, k) annualized covariance
+    method: str = "sample"
+    shrinkage: float = 0.0
+    max_factors: int = 512
+    _inv: "OrderedDict[bytes, np.ndarray]" = field(default_factory=OrderedDict, repr=False)
+    _frontiers: Dict[int, "Frontier"] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def cov_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.cov, index=self.tickers, columns=self.tickers)
+
+    def inverse(self, free: np.ndarray) -> np.ndarray:
+        """Inverse of cov[free][:, free] (free: boolean mask), cached per mask."""
+        key = free.tobytes()
+        with self._lock:
+            inv = self._inv.get(key)
+            if inv is not None:
+                self._inv.move_to_end(key)
+                return inv
+
+        idx = np.flatnonzero(free)
+        sub = self.cov[np.ix_(idx, idx)]
+        try:
+            chol_inv = np.linalg.inv(np.linalg.cholesky(sub))
+            inv = chol_inv.T @ chol_inv
+        except np.linalg.LinAlgError:
+            inv = np.linalg.pinv(sub)  # singular (e.g. duplicated asset): least-squares inverse
+
+        with self._lock:
+            self._inv[key] = inv
+            if len(self._inv) > self.max_factors:
+                self._inv.popitem(last=False)
+        return inv
+
+    def stats(self, weights: np.ndarray, rf: float = 0.0) -> Dict[str, float]:
+        ret = float(weights @ self.mu)
+        vol = float(np.sqrt(max(weights @ self.cov @ weights, 0.0)))
+        return {
+            "ann_return": ret,
+            "ann_vol": vol,
+            "sharpe": (ret - rf) / vol if vol > 0 else float("nan"),
+            "diversification": diversification_effect(pd.Series(weights, index=self.tickers), self.cov_frame),
+        }
+
+
+def build_model(returns: pd.DataFrame, method: str = "sample", periods_per_year: int = 252) -> CovarianceModel:
+    """Model from periodic returns. method="sample" is returns.cov() * periods_per_year, as on the Portfolio page."""
+    if method not in SHRINKAGE_METHODS:
+        raise ValueError(f"Unknown covariance method: {method!r} (expected one of {SHRINKAGE_METHODS})")
+
+    rets = returns.dropna(how="all")
+    if method == "sample":
+        cov, intensity = rets.cov().fillna(0.0).to_numpy(dtype=float), 0.0
+    else:
+        cov, intensity = ledoit_wolf(rets.fillna(0.0).to_numpy(dtype=float))
+
+    return CovarianceModel(
+        tickers=list(rets.columns),
+        mu=rets.mean().fillna(0.0).to_numpy(dtype=float) * periods_per_year,
+        cov=cov * periods_per_year,
+        method=method,
+        shrinkage=intensity,
+    )
+
+
+_MODELS: "OrderedDict[Hashable, CovarianceModel]" = OrderedDict()
+_MODELS_LOCK = threading.Lock()
+MAX_MODELS = 32
+
+
+def covariance_model(returns: pd.DataFrame, key: Hashable = None, method: str = "sample", periods_per_year: int = 252) -> CovarianceModel:
+    """
+    build_model with a process-wide LRU. key identifies the data set, e.g. (tickers, period);
+    the last date and the number of rows are added so a refreshed download builds a new model.
+    """
+    if returns is None or returns.empty:
+        raise ValueError("covariance_model needs a non-empty returns DataFrame")
+
+    full_key = (key if key is not None else tuple(returns.columns), method, periods_per_year, returns.index[-1], len(returns))
+    with _MODELS_LOCK:
+        model = _MODELS.get(full_key)
+        if model is not None:
+            _MODELS.move_to_end(full_key)
+            return model
+
+    model = build_model(returns, method=method, periods_per_year=periods_per_year)
+    with _MODELS_LOCK:
+        _MODELS[full_key] = model
+        while len(_MODELS) > MAX_MODELS:
+            _MODELS.popitem(last=False)
+    return model
+
+
+def _solve_long_only(model: CovarianceModel, t: float, a: np.ndarray, w0: Optional[np.ndarray] = None, tol: float = 1e-10) -> np.ndarray:
+    """
+    Primal active-set solver for  min 1/2 w'Cw - t mu'w  s.t.  a'w = 1, w >= 0.
+    On the free set the KKT system has a closed form from the cached inverse:
+        w = t C^-1 mu - nu C^-1 a,  with nu such that a'w = 1.
+    w0 (a feasible point, e.g. the previous frontier point) warm-starts the active set.
+    """
+    k = len(a)
+    if w0 is None:
+        pos = np.maximum(a, 0.0)
+        w = pos / float(pos @ pos)  # a'w = 1, w >= 0
+    else:
+        w = w0.copy()
+    free = w > 0
+
+    for _ in range(10 * k + 10):
+        inv = model.inverse(free)
+        a_f, mu_f = a[free], model.mu[free]
+        inv_a, inv_mu = inv @ a_f, inv @ mu_f
+        nu = (t * float(a_f @ inv_mu) - 1.0) / float(a_f @ inv_a)
+        target = np.zeros(k)
+        target[free] = t * inv_mu - nu * inv_a
+
+        step = target - w
+        blocking = free & (step < -tol)
+        if blocking.any():
+            ratios = w[blocking] / -step[blocking]
+            alpha = float(ratios.min())
+            if alpha < 1.0:
+                # Walk to the first weight hitting zero and pin it
+                w = w + alpha * step
+                hit = np.flatnonzero(blocking)[int(np.argmin(ratios))]
+                w[hit] = 0.0
+                free[hit] = False
+                continue
+        w = np.where(free, target, 0.0)
+
+        # Optimal on this free set: release the pinned weight with the most negative multiplier
+        grad = model.cov @ w - t * model.mu + nu * a
+        lam = np.where(free, np.inf, grad)
+        j = int(np.argmin(lam))
+        if lam[j] >= -tol:
+            break
+        free[j] = True
+
+    return np.maximum(w, 0.0)
+
+
+def min_variance(model: CovarianceModel, w0: Optional[np.ndarray] = None) -> np.ndarray:
+    """Long-only minimum-variance weights. w0 (e.g. the previous weights) warm-starts the solver."""
+    w0 = None if w0 is None else np.maximum(w0, 0.0) / np.maximum(w0, 0.0).sum()
+    return _solve_long_only(model, 0.0, np.ones(len(model.tickers)), w0)
+
+
+def max_sharpe(model: CovarianceModel, rf: float = 0.0, w0: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Long-only tangency portfolio: min y'Cy s.t. (mu - rf)'y = 1, y >= 0, then w = y / sum(y).
+    Falls back to minimum variance when no asset beats rf.
+    """
+    excess = model.mu - rf
+    if not (excess > 0).any():
+        return min_variance(model, w0)
+    y0 = None
+    if w0 is not None:
+        scale = float(excess @ np.maximum(w0, 0.0))
+        y0 = np.maximum(w0, 0.0) / scale if scale > 0 else None
+    y = _solve_long_only(model, 0.0, excess, y0)
+    return y / y.sum()
+
+
+def risk_parity(model: CovarianceModel, budgets: Optional[np.ndarray] = None, tol: float = 1e-10, max_iter: int = 100, w0: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Equal (or budgeted) risk contributions: Newton on  1/2 y'Cy - sum(b log y),  whose minimum
+    satisfies y_i (Cy)_i = b_i; w = y / sum(y).
+    """
+    k = len(model.tickers)
+    b = np.full(k, 1.0 / k) if budgets is None else np.asarray(budgets, dtype=float) / np.sum(budgets)
+    y = 1.0 / np.sqrt(np.diag(model.cov)) if w0 is None or np.any(w0 <= 0) else np.asarray(w0, dtype=float).copy()
+    y *= np.sqrt(1.0 / float(y @ model.cov @ y))
+
+    for _ in range(max_iter):
+        grad = model.cov @ y - b / y
+        if np.abs(grad).max() < tol:
+            break
+        hess = model.cov + np.diag(b / (y * y))
+        step = np.linalg.solve(hess, grad)
+        # Damped step keeping y > 0
+        alpha = 1.0
+        while np.any(y - alpha * step <= 0):
+            alpha *= 0.5
+        y = y - alpha * step
+
+    return y / y.sum()
+
+
+@dataclass
+class Frontier:
+    tickers: List[str]
+    returns: np.ndarray  # (n_points,)
+    vols: np.ndarray
+    weights: np.ndarray  # (n_points, k)
+
+    def frame(self, rf: float = 0.0) -> pd.DataFrame:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = np.where(self.vols > 0, (self.returns - rf) / self.vols, np.nan)
+        out = pd.DataFrame({"ann_return": self.returns, "ann_vol": self.vols, "sharpe": sharpe})
+        return pd.concat([out, pd.DataFrame(self.weights, columns=self.tickers)], axis=1)
+
+
+def efficient_frontier(model: CovarianceModel, n_points: int = 100, tol: float = 1e-9) -> Frontier:
+    """
+    Long-only efficient frontier at evenly spaced target returns, from the minimum-variance
+    portfolio to the best single asset. Each target is found by bisection on the risk tolerance
+    t of  min 1/2 w'Cw - t mu'w ; successive solves are warm-started and share the cached inverses.
+    The frontier itself is kept on the model, so reruns on the same data return it directly.
+    """
+    cached = model._frontiers.get(n_points)
+    if cached is not None:
+        return cached
+
+    k = len(model.tickers)
+    ones = np.ones(k)
+    w_lo = min_variance(model)
+    r_lo, r_hi = float(w_lo @ model.mu), float(model.mu.max())
+    targets = np.linspace(r_lo, r_hi, n_points)
+
+    weights = np.empty((n_points, k))
+    weights[0] = w_lo
+    t_lo, w_prev = 0.0, w_lo
+    t_hi = 1.0
+    for i, r in enumerate(targets[1:], start=1):
+        if i == n_points - 1:
+            weights[i] = np.eye(k)[int(np.argmax(model.mu))]
+            break
+        w_hi = _solve_long_only(model, t_hi, ones, w_prev)
+        while w_hi @ model.mu < r - tol:
+            t_lo, t_hi = t_hi, 2.0 * t_hi
+            w_hi = _solve_long_only(model, t_hi, ones, w_hi)
+
+        lo, hi, w = t_lo, t_hi, w_prev
+        for _ in range(100):
+            mid = 0.5 * (lo + hi)
+            w = _solve_long_only(model, mid, ones, w)
+            got = float(w @ model.mu)
+            if abs(got - r) <= tol * max(1.0, abs(r)):
+                break
+            if got < r:
+                lo = mid
+            else:
+                hi = mid
+        weights[i] = w
+        t_lo, w_prev = lo, w
+
+    rets = weights @ model.mu
+    vols = np.sqrt(np.maximum(np.einsum("pi,ij,pj->p", weights, model.cov, weights), 0.0))
+    frontier = Frontier(tickers=model.tickers, returns=rets, vols=vols, weights=weights)
+    model._frontiers[n_points] = frontier
+    return frontier
+
+
+OPTIMIZERS = {"Min variance": min_variance, "Max Sharpe": max_sharpe, "Risk parity": risk_parity}
+
+
+def optimize_weights(model: CovarianceModel, objective: str) -> Dict[str, float]:
+    """Weights dict (ticker -> weight) for one of OPTIMIZERS, ready for backtest_portfolio."""
+    if objective not in OPTIMIZERS:
+        raise ValueError(f"Unknown objective: {objective!r} (expected one of {list(OPTIMIZERS)})")
+    w = OPTIMIZERS[objective](model)
+    return dict(zip(model.tickers, map(float, w)))
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .backtest import backtest_portfolio
+from .metrics import annualized_return, annualized_vol, max_drawdown, portfolio_daily_returns, sharpe_ratio
+
+
+@dataclass
+class BacktestConfig:
+    weights: Optional[Dict[str, float]] = None  # None -> equal-weight
+    rebalance: str = "Monthly"
+    start: Optional[pd.Timestamp] = None  # optional window (walk-forward / rolling runs)
+    end: Optional[pd.Timestamp] = None
+
+
+# Per-worker price panel, attached once by _init_worker (read-only view on the memmap file)
+_PANEL: Optional[pd.DataFrame] = None
+
+
+def _init_worker(panel_path: str, index: pd.DatetimeIndex, columns: List[str]) -> None:
+    global _PANEL
+    values = np.load(panel_path, mmap_mode="r")
+    _PANEL = pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _run_one(prices: pd.DataFrame, cfg: BacktestConfig, initial_value: float) -> dict:
+    window = prices.loc[cfg.start:cfg.end] if (cfg.start is not None or cfg.end is not None) else prices
+    res = backtest_portfolio(prices=window, weights=cfg.weights, initial_value=initial_value, rebalance=cfg.rebalance)
+
+    row = {"rebalance": cfg.rebalance, "start": cfg.start, "end": cfg.end, "final_value": float("nan"), "ann_return": float("nan"), "ann_vol": float("nan"), "sharpe": float("nan"), "max_drawdown": float("nan"),}
+    if res.portfolio_value.empty:
+        return row
+
+    port_rets = portfolio_daily_returns(res.portfolio_value)
+    row.update(final_value=float(res.portfolio_value.iloc[-1]), ann_return=annualized_return(res.portfolio_value), ann_vol=annualized_vol(port_rets), sharpe=sharpe_ratio(port_rets), max_drawdown=max_drawdown(res.portfolio_value),)
+    return row
+
+
+def _run_chunk(chunk: Sequence[BacktestConfig], initial_value: float) -> List[dict]:
+    return [_run_one(_PANEL, cfg, initial_value) for cfg in chunk]
+
+
+def rolling_windows(index: pd.DatetimeIndex, window: int, step: int) -> List[tuple]:
+    """(start, end) date pairs of `window` rows every `step` rows, for rolling / walk-forward runs."""
+    index = pd.DatetimeIndex(index).sort_values()
+    return [(index[i], index[i + window - 1]) for i in range(0, len(index) - window + 1, step)]
+
+
+def run_parallel(prices: pd.DataFrame, configs: Sequence[BacktestConfig], max_workers: Optional[int] = None, chunk_size: int = 64, initial_value: float = 100.0,) -> pd.DataFrame:
+    """
+    Run backtest_portfolio + the standard metrics for every config on a process pool.
+    The cleaned price panel is written once to a memory-mapped .npy file that workers open
+    read-only, so it is never pickled per task. Rows come back in the order of `configs`.
+    max_workers defaults to the CPU count; max_workers=1 runs in-process.
+    """
+    if prices is None or prices.empty or not configs:
+        return pd.DataFrame()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, int(chunk_size))
+
+    # Clean once in the parent so each worker only slices
+    panel = prices.sort_index().dropna(how="all").dropna(axis=1, how="all").astype(float)
+
+    if max_workers == 1:
+        rows = [_run_one(panel, cfg, initial_value) for cfg in configs]
+        return pd.DataFrame(rows)
+
+    chunks = [list(configs[i:i + chunk_size]) for i in range(0, len(configs), chunk_size)]
+
+    with tempfile.TemporaryDirectory(prefix="bt_panel_") as tmp:
+        panel_path = os.path.join(tmp, "prices.npy")
+        mm = np.lib.format.open_memmap(panel_path, mode="w+", dtype=np.float64, shape=panel.shape)
+        mm[:] = panel.to_numpy()
+        mm.flush()
+        del mm
+
+        init_args = (panel_path, panel.index, list(panel.columns))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=init_args) as pool:
+            # map() yields in submission order -> deterministic output
+            rows = [row for chunk_rows in pool.map(_run_chunk, chunks, [initial_value] * len(chunks)) for row in chunk_rows]
+
+    return pd.DataFrame(rows)
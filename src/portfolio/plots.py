@@ -1,46 +1,50 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import pandas as pd
 import plotly.graph_objects as go
 
+from .downsample import DEFAULT_MAX_POINTS, make_trace
+
 
-def plot_prices_and_portfolio(prices: pd.DataFrame, portfolio_value: pd.Series) -> go.Figure:
-    """Plot asset price series and the portfolio value on the same chart."""
+def plot_prices_and_portfolio(prices: pd.DataFrame, portfolio_value: pd.Series, max_points: Optional[int] = DEFAULT_MAX_POINTS, use_gl: bool = False) -> go.Figure:
+    """
+    Plot asset price series and the portfolio value on the same chart.
+    Each line is reduced to max_points (min/max per bucket, None = every point); use_gl emits Scattergl traces.
+    """
     fig = go.Figure()
 
     if prices is not None and not prices.empty:
         for ticker in prices.columns:
-            fig.add_trace(
-                go.Scatter(x=prices.index, y=prices[ticker], mode="lines", name=str(ticker))
-            )
+            fig.add_trace(make_trace(prices[ticker], max_points=max_points, use_gl=use_gl, mode="lines", name=str(ticker)))
 
     if portfolio_value is not None and not portfolio_value.empty:
-        fig.add_trace(go.Scatter(x=portfolio_value.index, y=portfolio_value.values, mode="lines", name="Portfolio Value",))
+        fig.add_trace(make_trace(portfolio_value, max_points=max_points, use_gl=use_gl, mode="lines", name="Portfolio Value",))
 
     fig.update_layout(title="Asset Prices + Portfolio Value", xaxis_title="Date", yaxis_title="Price / Value", legend_title="Series", height=520,)
     return fig
 
 
-def plot_cum_returns(asset_returns: pd.DataFrame, portfolio_returns: pd.Series) -> go.Figure:
-    """Plot cumulative performance (growth of $1) for assets and portfolio."""
+def plot_cum_returns(asset_returns: pd.DataFrame, portfolio_returns: pd.Series, max_points: Optional[int] = DEFAULT_MAX_POINTS, use_gl: bool = False) -> go.Figure:
+    """Plot cumulative performance (growth of $1) for assets and portfolio (downsampled as in plot_prices_and_portfolio)."""
     fig = go.Figure()
 
     if asset_returns is not None and not asset_returns.empty:
+        # Compounded at full resolution, reduced only for drawing
         cum_assets = (1.0 + asset_returns).cumprod()
         for ticker in cum_assets.columns:
-            fig.add_trace(go.Scatter(x=cum_assets.index, y=cum_assets[ticker], mode="lines", name=f"{ticker} (cum)",))
+            fig.add_trace(make_trace(cum_assets[ticker], max_points=max_points, use_gl=use_gl, mode="lines", name=f"{ticker} (cum)",))
 
     if portfolio_returns is not None and not portfolio_returns.empty:
         cum_port = (1.0 + portfolio_returns).cumprod()
-        fig.add_trace(
-            go.Scatter(x=cum_port.index, y=cum_port.values, mode="lines", name="Portfolio (cum)")
-        )
+        fig.add_trace(make_trace(cum_port, max_points=max_points, use_gl=use_gl, mode="lines", name="Portfolio (cum)"))
 
     fig.update_layout(title="Cumulative Performance: Assets vs Portfolio", xaxis_title="Date", yaxis_title="Cumulative Growth", height=520,)
     return fig
 
 
-def plot_corr_heatmap(corr: pd.DataFrame) -> go.Figure:
+def plot_corr_heatmap(corr: pd.DataFrame, title: str = "Correlation Matrix") -> go.Figure:
     """Plot a correlation matrix as a heatmap."""
     if corr is None or corr.empty:
         return go.Figure()
@@ -48,7 +52,48 @@ def plot_corr_heatmap(corr: pd.DataFrame) -> go.Figure:
     fig = go.Figure(data=go.Heatmap(z=corr.values, x=corr.columns.astype(str), y=corr.index.astype(str), zmin=-1, zmax=1,)
     )
     fig.update_layout(
-        title="Correlation Matrix",
+        title=title,
         height=520,
     )
     return fig
+
+
+def plot_rolling_metrics(series: pd.DataFrame, title: str, yaxis_title: str, tickformat: str = ".2f", max_points: Optional[int] = DEFAULT_MAX_POINTS, use_gl: bool = False) -> go.Figure:
+    """Plot rolling / expanding metric time series (one line per column)."""
+    fig = go.Figure()
+
+    if series is not None and not series.empty:
+        for col in series.columns:
+            fig.add_trace(make_trace(series[col], max_points=max_points, use_gl=use_gl, mode="lines", name=str(col)))
+
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title=yaxis_title, height=420,)
+    fig.update_yaxes(tickformat=tickformat)
+    return fig
+
+
+def plot_efficient_frontier(frontier: pd.DataFrame, points: pd.DataFrame, title: str = "Efficient Frontier") -> go.Figure:
+    """Frontier (ann_vol / ann_return columns) as a line, named portfolios (same columns, one row each) as markers."""
+    fig = go.Figure()
+
+    if frontier is not None and not frontier.empty:
+        fig.add_trace(go.Scatter(x=frontier["ann_vol"], y=frontier["ann_return"], mode="lines", name="Frontier"))
+
+    if points is not None and not points.empty:
+        fig.add_trace(go.Scatter(x=points["ann_vol"], y=points["ann_return"], mode="markers+text", text=points.index.astype(str), textposition="top center", marker=dict(size=10), name="Portfolios",))
+
+    fig.update_layout(title=title, xaxis_title="Ann. Vol", yaxis_title="Ann. Return", height=480,)
+    fig.update_xaxes(tickformat=".0%")
+    fig.update_yaxes(tickformat=".0%")
+    return fig
+
+
+def plot_distribution(values, title: str, xaxis_title: str, markers: dict = None, tickformat: str = ".2f") -> go.Figure:
+    """Histogram of simulated outcomes, with optional vertical markers ({label: x})."""
+    fig = go.Figure(data=go.Histogram(x=values, nbinsx=100, name=xaxis_title))
+
+    for label, x in (markers or {}).items():
+        fig.add_vline(x=x, line_dash="dash", annotation_text=label)
+
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title="Paths", height=420, showlegend=False,)
+    fig.update_xaxes(tickformat=tickformat)
+    return fig
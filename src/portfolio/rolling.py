@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+Frame = Union[pd.Series, pd.DataFrame]
+
+
+def _as_frame(x: Frame) -> pd.DataFrame:
+    return x.to_frame() if isinstance(x, pd.Series) else x
+
+
+def _like(x: Frame, values: np.ndarray) -> Frame:
+    if isinstance(x, pd.Series):
+        return pd.Series(values[:, 0], index=x.index, name=x.name)
+    return pd.DataFrame(values, index=x.index, columns=x.columns)
+
+
+def _window_moments(x: np.ndarray, window: int):
+    """
+    Rolling count / mean / unbiased variance per column from running sums: O(n) whatever the window.
+    Columns are demeaned first so the running sums stay small (variance is shift-invariant).
+    """
+    n = x.shape[0]
+    center = x.mean(axis=0) if n else 0.0
+    z = x - center
+
+    c1 = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(z, axis=0)])
+    c2 = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(z * z, axis=0)])
+
+    lo = np.maximum(np.arange(1, n + 1) - window, 0)
+    hi = np.arange(1, n + 1)
+    cnt = (hi - lo).astype(float)[:, None]
+    s1 = c1[hi] - c1[lo]
+    s2 = c2[hi] - c2[lo]
+
+    mean = s1 / cnt
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.maximum(s2 - s1 * s1 / cnt, 0.0) / (cnt - 1.0)
+    return cnt, mean + center, var
+
+
+def rolling_vol(returns: Frame, window: int, periods_per_year: int = 252) -> Frame:
+    """Annualized rolling volatility (NaN until `window` observations). Missing returns count as 0."""
+    x = _as_frame(returns).fillna(0.0).to_numpy(dtype=float)
+    cnt, _, var = _window_moments(x, window)
+    vol = np.sqrt(var) * np.sqrt(periods_per_year)
+    vol[cnt[:, 0] < window] = np.nan
+    return _like(returns, vol)
+
+
+def rolling_sharpe(returns: Frame, window: int, rf: float = 0.0, periods_per_year: int = 252) -> Frame:
+    """Annualized rolling Sharpe ratio, same definition as metrics.sharpe_ratio on each window."""
+    x = _as_frame(returns).fillna(0.0).to_numpy(dtype=float)
+    cnt, mean, var = _window_moments(x, window)
+    std = np.sqrt(var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(std > 0, (mean - rf / periods_per_year) / std * np.sqrt(periods_per_year), np.nan)
+    sharpe[cnt[:, 0] < window] = np.nan
+    return _like(returns, sharpe)
+
+
+def expanding_vol(returns: Frame, periods_per_year: int = 252, min_periods: int = 2) -> Frame:
+    x = _as_frame(returns).fillna(0.0).to_numpy(dtype=float)
+    cnt, _, var = _window_moments(x, len(x))
+    vol = np.sqrt(var) * np.sqrt(periods_per_year)
+    vol[cnt[:, 0] < min_periods] = np.nan
+    return _like(returns, vol)
+
+
+def expanding_sharpe(returns: Frame, rf: float = 0.0, periods_per_year: int = 252, min_periods: int = 2) -> Frame:
+    x = _as_frame(returns).fillna(0.0).to_numpy(dtype=float)
+    cnt, mean, var = _window_moments(x, len(x))
+    std = np.sqrt(var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(std > 0, (mean - rf / periods_per_year) / std * np.sqrt(periods_per_year), np.nan)
+    sharpe[cnt[:, 0] < min_periods] = np.nan
+    return _like(returns, sharpe)
+
+
+def rolling_drawdown(values: Frame, window: int) -> Frame:
+    """Drawdown from the trailing `window`-period peak (rolling max is a monotonic-deque pass in pandas)."""
+    peak = values.rolling(window, min_periods=1).max()
+    return values / peak - 1.0
+
+
+def rolling_max_drawdown(values: Frame, window: int) -> Frame:
+    """
+    Maximum drawdown of each trailing `window`-period window, same definition as
+    metrics.max_drawdown applied to that window (the peak must lie inside it).
+    O(n) whatever the window: (max, min, worst drawdown) of consecutive segments compose, so with
+    blocks of `window` rows every window is the suffix of one block followed by the prefix of the
+    next (van Herk / Gil-Werman), and block prefixes / suffixes are accumulate() passes.
+    """
+    x = _as_frame(values).to_numpy(dtype=float)
+    n, k = x.shape
+    out = np.full((n, k), np.nan)
+    if n < window or window < 1:
+        return _like(values, out)
+
+    nb = -(-n // window)
+    blocks = np.full((nb * window, k), np.nan)
+    blocks[:n] = x
+    b = blocks.reshape(nb, window, k)
+    rev = b[:, ::-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Prefix of each block up to a row: running peak / trough and worst drawdown so far
+        p_max = np.fmax.accumulate(b, axis=1)
+        p_min = np.fmin.accumulate(b, axis=1)
+        p_worst = np.fmin.accumulate(b / p_max - 1.0, axis=1)
+        # Suffix of each block from a row: worst drawdown = min over peaks j of (trough after j) / x_j - 1
+        s_max = np.fmax.accumulate(rev, axis=1)[:, ::-1]
+        s_min = np.fmin.accumulate(rev, axis=1)[:, ::-1]
+        s_worst = np.fmin.accumulate((s_min / b - 1.0)[:, ::-1], axis=1)[:, ::-1]
+
+        p_min, p_worst = p_min.reshape(-1, k), p_worst.reshape(-1, k)
+        s_max, s_worst = s_max.reshape(-1, k), s_worst.reshape(-1, k)
+        end = np.arange(window - 1, n)
+        start = end - window + 1
+        # Suffix of start's block, then prefix of end's block, plus drawdowns from a peak in the first to a trough in the second
+        spanning = np.fmin(np.fmin(s_worst[start], p_worst[end]), p_min[end] / s_max[start] - 1.0)
+    aligned = (start % window == 0)[:, None]  # window == one whole block
+    out[window - 1:] = np.where(aligned, p_worst[end], spanning)
+    return _like(values, out)
+
+
+def expanding_drawdown(values: Frame) -> Frame:
+    return values / values.cummax() - 1.0
+
+
+@dataclass
+class RollingMatrix:
+    index: pd.DatetimeIndex  # end date of each window
+    columns: List[str]
+    values: np.ndarray  # (n_windows, n_assets, n_assets)
+
+    def at(self, dt) -> pd.DataFrame:
+        """Matrix of the last window ending on or before dt."""
+        i = max(0, int(self.index.searchsorted(pd.Timestamp(dt), side="right")) - 1)
+        return pd.DataFrame(self.values[i], index=self.columns, columns=self.columns)
+
+    def pair(self, a: str, b: str) -> pd.Series:
+        """Time series of one matrix entry (e.g. rolling correlation of two assets)."""
+        i, j = self.columns.index(a), self.columns.index(b)
+        return pd.Series(self.values[:, i, j], index=self.index, name=f"{a}/{b}")
+
+
+def rolling_cov(returns: pd.DataFrame, window: int, step: int = 1, periods_per_year: int = 1) -> RollingMatrix:
+    """
+    Rolling covariance matrices for every window ending every `step` rows, as one batched tensor
+    computation over cumulative sums of outer products (O(n * k^2), independent of the window).
+    periods_per_year=252 annualizes.
+    """
+    x = returns.fillna(0.0).to_numpy(dtype=float)
+    n, k = x.shape
+    if n < window:
+        return RollingMatrix(index=pd.DatetimeIndex([]), columns=list(returns.columns), values=np.empty((0, k, k)))
+
+    z = x - x.mean(axis=0)
+    ends = np.arange(window, n + 1, step)  # exclusive end of each window
+    if ends[-1] != n:
+        ends = np.append(ends, n)  # always include the latest window
+
+    c1 = np.vstack([np.zeros((1, k)), np.cumsum(z, axis=0)])
+    c2 = np.concatenate([np.zeros((1, k, k)), np.cumsum(np.einsum("ti,tj->tij", z, z), axis=0)])
+
+    s1 = c1[ends] - c1[ends - window]
+    s2 = c2[ends] - c2[ends - window]
+    cov = (s2 - np.einsum("ti,tj->tij", s1, s1) / window) / (window - 1) * periods_per_year
+
+    return RollingMatrix(index=returns.index[ends - 1], columns=list(returns.columns), values=cov)
+
+
+def rolling_corr(returns: pd.DataFrame, window: int, step: int = 1) -> RollingMatrix:
+    """Rolling correlation matrices (see rolling_cov)."""
+    cov = rolling_cov(returns, window, step=step)
+    d = np.sqrt(np.einsum("tii->ti", cov.values))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov.values / (d[:, :, None] * d[:, None, :])
+    return RollingMatrix(index=cov.index, columns=cov.columns, values=np.clip(corr, -1.0, 1.0))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtest import BacktestResult, _prepare_backtest, _rebalance_positions, drift_holdings
+from .optimize import OPTIMIZERS, SHRINKAGE_METHODS, CovarianceModel, ledoit_wolf
+
+
+class TrailingMoments:
+    """
+    Sums and cross-product sums of the last `window` rows of a returns array, moved forward by
+    adding the rows that entered the window and subtracting the ones that left it
+    (O(rows moved x k^2) per move instead of O(window x k^2) for a fresh covariance).
+    Rows are shifted by the mean of the first window so the running sums stay small.
+    """
+
+    def __init__(self, x: np.ndarray, window: int):
+        self.window = window
+        self.z = x - x[:window].mean(axis=0)
+        self.shift = x[:window].mean(axis=0)
+        k = x.shape[1]
+        self.lo = self.hi = 0
+        self.s1 = np.zeros(k)
+        self.s2 = np.zeros((k, k))
+
+    def advance(self, end: int) -> None:
+        """Move the window to rows [end - window, end)."""
+        lo = max(0, end - self.window)
+        if lo >= self.hi:
+            # No overlap with the current window: start over
+            self.s1[:] = 0.0
+            self.s2[:] = 0.0
+            self.lo = self.hi = lo
+        add = self.z[self.hi:end]
+        drop = self.z[self.lo:lo]
+        self.s1 += add.sum(axis=0) - drop.sum(axis=0)
+        self.s2 += add.T @ add - drop.T @ drop
+        self.lo, self.hi = lo, end
+
+    @property
+    def count(self) -> int:
+        return self.hi - self.lo
+
+    def mean(self) -> np.ndarray:
+        return self.s1 / self.count + self.shift
+
+    def cov(self) -> np.ndarray:
+        """Sample covariance (ddof=1) of the rows in the window."""
+        m = self.count
+        return (self.s2 - np.outer(self.s1, self.s1) / m) / (m - 1)
+
+    def model(self, tickers: List[str], method: str = "sample", periods_per_year: int = 252) -> CovarianceModel:
+        if method == "sample":
+            cov, intensity = self.cov(), 0.0
+        else:
+            # Shrinkage intensity needs fourth moments: computed on the window rows directly
+            cov, intensity = ledoit_wolf(self.z[self.lo:self.hi])
+        return CovarianceModel(tickers=tickers, mu=self.mean() * periods_per_year, cov=cov * periods_per_year, method=method, shrinkage=intensity)
+
+
+@dataclass
+class WalkForwardResult(BacktestResult):
+    targets: pd.DataFrame = field(default_factory=pd.DataFrame)  # target weights chosen at each (re)allocation date
+
+
+def walk_forward(prices: pd.DataFrame, objective: str = "Min variance", lookback: int = 252, rebalance: str = "Monthly", initial_value: float = 100.0, method: str = "sample", periods_per_year: int = 252,) -> WalkForwardResult:
+    """
+    Backtest re-optimizing the target weights at each rebalance date from the trailing `lookback`
+    returns (up to and including that date), then drifting until the next one.
+    The backtest starts once `lookback` returns are available. Missing returns count as 0,
+    as in the drift simulation.
+    """
+    if objective not in OPTIMIZERS:
+        raise ValueError(f"Unknown objective: {objective!r} (expected one of {list(OPTIMIZERS)})")
+    if method not in SHRINKAGE_METHODS:
+        raise ValueError(f"Unknown covariance method: {method!r} (expected one of {SHRINKAGE_METHODS})")
+
+    empty = WalkForwardResult(prices=pd.DataFrame(), returns=pd.DataFrame(), portfolio_value=pd.Series(dtype=float), weights_history=pd.DataFrame())
+    if prices is None or prices.empty:
+        return empty
+
+    prices_all, rets_all = _prepare_backtest(prices)
+    if len(rets_all) < max(lookback, 2):
+        return empty
+
+    tickers = list(rets_all.columns)
+    x = rets_all.fillna(0.0).to_numpy(dtype=float)
+
+    # Initial allocation at the close of the lookback-th return date
+    index = rets_all.index[lookback - 1:]
+    rb_pos = _rebalance_positions(index, rebalance)
+    window_ends = np.concatenate(([lookback], lookback + rb_pos))  # exclusive end row in x
+
+    moments = TrailingMoments(x, lookback)
+    targets = np.empty((len(window_ends), len(tickers)))
+    prev: Optional[np.ndarray] = None
+    for i, end in enumerate(window_ends):
+        moments.advance(int(end))
+        prev = targets[i] = OPTIMIZERS[objective](moments.model(tickers, method, periods_per_year), w0=prev)
+
+    growth = 1.0 + x[lookback - 1:]
+    holdings = drift_holdings(growth, targets, initial_value, rb_pos)
+    pv = holdings.sum(axis=1)
+
+    return WalkForwardResult(
+        prices=prices_all.loc[index],
+        returns=rets_all.loc[index],
+        portfolio_value=pd.Series(pv, index=index, dtype=float),
+        weights_history=pd.DataFrame(holdings / pv[:, None], index=index, columns=tickers, dtype=float),
+        targets=pd.DataFrame(targets, index=index[np.concatenate(([0], rb_pos))].rename("date"), columns=tickers),
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data.market_data import get_prices
+from data.result_cache import content_key
+from data.result_store import ResultStore, StoredResult
+from portfolio.backtest import backtest_portfolio
+from strategy.engine import PERIODICITIES, PriceData, StrategyEngine
+
+# Default views of the pages (what a viewer sees before touching any control)
+DEFAULT_MOM_WINDOW = 20
+DEFAULT_FEE_BPS = 0.0
+DEFAULT_PORTFOLIO_TICKERS = ["AAPL", "MSFT", "GOOGL"]
+DEFAULT_PORTFOLIO_PERIOD = "2y"
+DEFAULT_PORTFOLIO_REBALANCE = "Monthly"
+
+
+@dataclass
+class PrecomputeJob:
+    name: str
+    inputs: Callable[[], Any]  # cheap: everything the result depends on (content-hashed into its version)
+    compute: Callable[[Any], Any]  # inputs -> result
+
+
+def strategy_view(symbol: str, periodicity: str, mom_window: int, fee_bps: float) -> str:
+    return f"strategy/{symbol}/{periodicity}/w{int(mom_window)}/fee{float(fee_bps):g}"
+
+
+def strategy_inputs(engine: StrategyEngine, periodicity: str, mom_window: int, fee_bps: float, start: Optional[date], end: Optional[date]) -> Tuple:
+    # data.version() is stat-based: new ticks / rollups change it without reading any price
+    return (engine.data.source, engine.data.version(), periodicity, int(mom_window), float(fee_bps), start, end)
+
+
+def portfolio_view(tickers: Sequence[str], period: str, rebalance: str) -> str:
+    return f"portfolio/{'-'.join(tickers)}/{period}/{rebalance}"
+
+
+def portfolio_inputs(prices: pd.DataFrame, weights: Dict[str, float], rebalance: str, initial_value: float = 100.0) -> Tuple:
+    return (prices, dict(weights), rebalance, float(initial_value))
+
+
+def lookup(store: ResultStore, name: str, inputs: Any) -> Optional[StoredResult]:
+    """The stored result for a view when it was computed from exactly these inputs, else None."""
+    item = store.get(name)
+    if item is None or item.version != content_key(inputs):
+        return None
+    return item
+
+
+def strategy_job(engine: StrategyEngine, symbol: str, periodicity: str, mom_window: int = DEFAULT_MOM_WINDOW, fee_bps: float = DEFAULT_FEE_BPS) -> PrecomputeJob:
+    """Momentum vs Buy & Hold over the whole available range (the dashboard's default dates)."""
+
+    def inputs() -> Tuple:
+        start, end = engine.data.bounds() or (None, None)
+        return strategy_inputs(engine, periodicity, mom_window, fee_bps, start, end)
+
+    def compute(inp: Tuple):
+        start, end = inp[-2], inp[-1]
+        return engine.run(periodicity, mom_window, fee_bps, start, end)
+
+    return PrecomputeJob(strategy_view(symbol, periodicity, mom_window, fee_bps), inputs, compute)
+
+
+def portfolio_job(tickers: Sequence[str] = DEFAULT_PORTFOLIO_TICKERS, period: str = DEFAULT_PORTFOLIO_PERIOD, rebalance: str = DEFAULT_PORTFOLIO_REBALANCE) -> PrecomputeJob:
+    """Equal-weight backtest of the Portfolio page's default selection (prices from the shared price cache)."""
+    tickers = list(tickers)
+
+    def inputs() -> Tuple:
+        prices = get_prices(tickers, period=period, interval="1d")
+        return portfolio_inputs(prices, {t: 1.0 / len(tickers) for t in tickers}, rebalance)
+
+    def compute(inp: Tuple):
+        prices, weights, rb, initial_value = inp
+        return backtest_portfolio(prices=prices, weights=weights, initial_value=initial_value, rebalance=rb)
+
+    return PrecomputeJob(portfolio_view(tickers, period, rebalance), inputs, compute)
+
+
+def default_jobs(base_dir: str, symbol: str = "AAPL") -> List[PrecomputeJob]:
+    engine = StrategyEngine(PriceData(base_dir, symbol))
+    return [*(strategy_job(engine, symbol, p) for p in PERIODICITIES), portfolio_job()]
+
+
+class Precomputer:
+    """
+    Keeps the stored result of every job current: on each pass, a job whose inputs changed
+    (new ticks, rollups or daily closes) is recomputed and written to the store, the others cost
+    one version check. Meant to run next to the collectors (`python src/app.py precompute`),
+    so the first viewer after new data finds the default views ready.
+    """
+
+    def __init__(self, jobs: Sequence[PrecomputeJob], store: Optional[ResultStore] = None):
+        self.jobs = list(jobs)
+        self.store = store if store is not None else ResultStore()
+        self.passes = 0
+        self.computed = 0
+        self.errors = 0
+
+    def run_once(self) -> List[str]:
+        """Recompute the stale jobs; returns their names."""
+        updated = []
+        for job in self.jobs:
+            try:
+                inp = job.inputs()
+                if lookup(self.store, job.name, inp) is not None:
+                    continue
+                t0 = time.perf_counter()
+                value = job.compute(inp)
+                self.store.put(job.name, value, content_key(inp), seconds=time.perf_counter() - t0)
+                updated.append(job.name)
+            except Exception as e:
+                self.errors += 1
+                print(f"[WARN] precompute {job.name}: {e}")
+        self.passes += 1
+        self.computed += len(updated)
+        return updated
+
+    def run_forever(self, poll_s: float = 5.0, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            updated = self.run_once()
+            if updated:
+                print(f"[OK] {len(updated)} vues précalculées en {time.perf_counter() - t0:.2f}s : {', '.join(updated)}")
+            stop.wait(poll_s)
+
+
+def format_age(seconds: float) -> str:
+    """'42 s' / '7 min' / '3.5 h', for freshness indicators."""
+    if seconds < 120:
+        return f"{seconds:.0f} s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
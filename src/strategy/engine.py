@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Hashable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data.csv_tail import CsvTailReader
+from data.result_cache import ResultCache, content_key, shared_cache
+from data.rollups import LEVELS, RollupStore, slice_days
+from data.tick_store import TickStore
+
+from .momentum_grid import MomentumGrid, infer_periods_per_year, momentum_grid
+
+PERIODICITIES = ["Raw", *LEVELS]
+
+
+def max_drawdown(equity: pd.Series) -> float:
+    peak = equity.cummax()
+    dd = equity / peak - 1.0
+    return float(dd.min())
+
+
+def drawdown_series(equity: pd.Series) -> pd.Series:
+    peak = equity.cummax()
+    return equity / peak - 1.0
+
+
+def perf_metrics(ret: pd.Series, equity: pd.Series, ppy: float) -> dict:
+    # ret: série de rendements périodiques
+    mean_r = float(ret.mean())
+    std_r = float(ret.std(ddof=0))
+    tot_return = float(equity.iloc[-1] - 1.0)
+    vol = (std_r * np.sqrt(ppy)) if (std_r > 0 and ppy > 0) else np.nan
+    sharpe = (mean_r / std_r * np.sqrt(ppy)) if (std_r > 0 and ppy > 0) else np.nan
+    mdd = max_drawdown(equity)
+
+    win_rate = float((ret > 0).mean()) if len(ret) else np.nan
+
+    return {
+        "Total return": tot_return,
+        "Vol (ann.)": vol,
+        "Sharpe (ann.)": sharpe,
+        "Max drawdown": mdd,
+        "Win rate": win_rate,
+    }
+
+
+@dataclass(frozen=True)
+class StrategyResult:
+    s: pd.Series  # prix après périodicité
+    ret: pd.Series
+    bh_ret: pd.Series
+    mom_raw: pd.Series
+    position: pd.Series
+    mom_ret: pd.Series
+    bh_equity: pd.Series
+    mom_equity: pd.Series
+    price_norm: pd.Series
+    bh_dd: pd.Series
+    mom_dd: pd.Series
+    ppy: float
+    n_trades: int
+    metrics_df: pd.DataFrame
+
+    def tail(self, n: int = 50) -> pd.DataFrame:
+        return pd.DataFrame({
+            "price": self.s,
+            "ret": self.ret,
+            "bh_ret": self.bh_ret,
+            "mom_signal": self.mom_raw,
+            "position": self.position,
+            "mom_ret_net": self.mom_ret,
+            "bh_equity": self.bh_equity,
+            "mom_equity": self.mom_equity,
+        }).tail(n)
+
+
+def run_strategy(s: pd.Series, mom_window: int, fee_bps: float) -> StrategyResult:
+    """Buy & Hold vs Momentum long/flat on one price series (pure function, no I/O)."""
+    # Returns & strategies
+    ret = s.pct_change().fillna(0.0)
+
+    # Buy & Hold
+    bh_ret = ret.copy()
+
+    # Momentum (long/flat) : investi si perf sur N périodes précédentes > 0 (avec shift pour éviter look-ahead)
+    mom_raw = s.pct_change(mom_window)
+    position = (mom_raw.shift(1) > 0).astype(float)  # 1.0 ou 0.0
+    mom_ret_gross = (position * ret).fillna(0.0)
+
+    # Frais sur changement de position (trades)
+    # fee_bps = basis points, ex: 10 bps = 0.001
+    fee = fee_bps / 10_000.0
+    turnover = position.diff().abs().fillna(0.0)  # 1 quand on entre/sort (approx)
+    mom_ret = mom_ret_gross - turnover * fee
+
+    # Equity curves normalisées (base = 1)
+    bh_equity = (1.0 + bh_ret).cumprod()
+    mom_equity = (1.0 + mom_ret).cumprod()
+    price_norm = s / float(s.iloc[0])
+
+    # Annualisation approx
+    ppy = infer_periods_per_year(s.index)
+
+    bh_m = perf_metrics(bh_ret, bh_equity, ppy)
+    mom_m = perf_metrics(mom_ret, mom_equity, ppy)
+
+    nb_trades = int((position.diff().abs() > 0).sum())
+    mom_m["# Trades (approx)"] = nb_trades
+    bh_m["# Trades (approx)"] = 0
+
+    return StrategyResult(
+        s=s, ret=ret, bh_ret=bh_ret, mom_raw=mom_raw, position=position, mom_ret=mom_ret,
+        bh_equity=bh_equity, mom_equity=mom_equity, price_norm=price_norm,
+        bh_dd=drawdown_series(bh_equity), mom_dd=drawdown_series(mom_equity),
+        ppy=ppy, n_trades=nb_trades,
+        metrics_df=pd.DataFrame([bh_m, mom_m], index=["Buy & Hold", "Momentum"]),
+    )
+
+
+def _stat_key(path: Path) -> Tuple:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return (str(path), None)
+    return (str(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class PriceData:
+    """
+    Prices of one symbol from the tick store (with its rollups), or from the legacy CSV
+    when the store is empty. version() is a few os.stat calls, cheap enough for every rerun.
+    """
+
+    def __init__(self, base_dir: Union[str, Path], symbol: str = "AAPL"):
+        data_dir = Path(base_dir) / "data"
+        self.symbol = symbol.upper()
+        self.csv_path = data_dir / f"{symbol.lower()}_prices.csv"
+        self.ticks = TickStore(data_dir / "ticks")
+        self.rollups = RollupStore(data_dir / "rollups")
+        self._csv = CsvTailReader(str(self.csv_path))
+
+    def from_store(self) -> bool:
+        return self.ticks.exists(self.symbol)
+
+    @property
+    def source(self) -> str:
+        return str(self.ticks.root if self.from_store() else self.csv_path)
+
+    def version(self) -> Hashable:
+        """Changes whenever new prices can be visible: last tick partition + last rollup months, or the CSV."""
+        days = self.ticks.partitions(self.symbol)
+        if not days:
+            return ("csv", _stat_key(self.csv_path))
+        sym_dir = self.rollups.root / self.symbol
+        last_months = tuple(_stat_key(sym_dir / level / f"{days[-1]:%Y-%m}.parquet") for level in LEVELS)
+        return ("store", len(days), _stat_key(self.ticks._path(self.symbol, days[-1])), last_months)
+
+    def csv_frame(self) -> pd.DataFrame:
+        # Ne parse que les lignes ajoutées depuis le dernier appel
+        return self._csv.refresh()
+
+    def bounds(self) -> Optional[Tuple[date, date]]:
+        """First and last day available (None when there is no data at all)."""
+        days = self.ticks.partitions(self.symbol)
+        if days:
+            return days[0], days[-1]
+        if not self.csv_path.exists():
+            return None
+        df = self.csv_frame()
+        if df.empty:
+            return None
+        return df.index.min().date(), df.index.max().date()
+
+    def series(self, periodicity: str, start: Optional[date], end: Optional[date]) -> pd.Series:
+        """Price series over the days [start, end] at a dashboard periodicity ("Raw", "15min", "1H", "1D")."""
+        if periodicity != "Raw" and periodicity not in LEVELS:
+            raise ValueError(f"Unknown periodicity '{periodicity}'. Use one of {PERIODICITIES}.")
+
+        if self.from_store():
+            if periodicity == "Raw":
+                return self.ticks.read(self.symbol, start, end).set_index("timestamp_utc")["price"]
+            if self.rollups.exists(self.symbol, periodicity):
+                return self.rollups.read(self.symbol, periodicity, start, end)["close"]
+            # Rollups pas encore construits (`python src/app.py migrate`) : resample à la volée
+            ticks = self.ticks.read(self.symbol, start, end).set_index("timestamp_utc")
+            return ticks["price"].resample(LEVELS[periodicity]).last().dropna()
+
+        df = self.csv_frame()
+        # Index trié : recherche binaire des bornes plutôt qu'un masque sur index.date
+        dfw = df.iloc[slice_days(df.index, start, end)]
+        if periodicity == "Raw":
+            return dfw["price"].copy()
+        return dfw["price"].resample(LEVELS[periodicity]).last().dropna()
+
+
+class StrategyEngine:
+    """
+    Memoized strategy runs for one PriceData.
+    Results are keyed by the content hash of (price source, data version, periodicity, window,
+    fee, start, end) in the process-wide ResultCache, so every session and every engine on the
+    same data shares them, and reruns that only change display options reuse the previous
+    result untouched. Concurrent identical requests are computed once.
+    """
+
+    def __init__(self, data: PriceData, cache: Optional[ResultCache] = None):
+        self.data = data
+        self.cache = cache if cache is not None else shared_cache()
+
+    def _memo(self, key: Tuple, compute: Callable[[], object]):
+        return self.cache.get_or_compute(content_key("strategy", self.data.source, self.data.symbol, key), compute)
+
+    def series(self, periodicity: str, start: Optional[date] = None, end: Optional[date] = None) -> pd.Series:
+        key = ("series", self.data.version(), periodicity, start, end)
+        return self._memo(key, lambda: self.data.series(periodicity, start, end))
+
+    def run(self, periodicity: str, mom_window: int, fee_bps: float, start: Optional[date] = None, end: Optional[date] = None) -> StrategyResult:
+        """Strategy result for the current data; the caller checks len(result.s) beforehand if needed."""
+        key = ("run", self.data.version(), periodicity, int(mom_window), float(fee_bps), start, end)
+        return self._memo(key, lambda: run_strategy(self.series(periodicity, start, end), int(mom_window), float(fee_bps)))
+
+    def grid(self, periodicity: str, start: Optional[date] = None, end: Optional[date] = None) -> MomentumGrid:
+        """Window x fee grid (default ranges) on the same series as run()."""
+        key = ("grid", self.data.version(), periodicity, start, end)
+        return self._memo(key, lambda: momentum_grid(self.series(periodicity, start, end)))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOWS = range(2, 201)
+DEFAULT_FEES_BPS = (0.0, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0)
+
+
+def infer_periods_per_year(index: pd.DatetimeIndex) -> float:
+    diffs = index.to_series().diff().dropna().dt.total_seconds()
+    if len(diffs) == 0:
+        return 0.0
+    dt = float(diffs.median())
+    if dt <= 0:
+        return 0.0
+    return (365.0 * 24.0 * 3600.0) / dt
+
+
+@dataclass
+class MomentumGrid:
+    windows: np.ndarray  # (n_windows,)
+    fees_bps: np.ndarray  # (n_fees,)
+    sharpe: np.ndarray  # (n_fees, n_windows)
+    total_return: np.ndarray  # (n_fees, n_windows)
+    n_trades: np.ndarray  # (n_windows,)
+
+    def frame(self, metric: str = "sharpe") -> pd.DataFrame:
+        """One metric as a fee x window table."""
+        return pd.DataFrame(getattr(self, metric), index=pd.Index(self.fees_bps, name="fee_bps"), columns=pd.Index(self.windows, name="window"))
+
+    def best(self, metric: str = "sharpe") -> dict:
+        values = getattr(self, metric)
+        if np.all(np.isnan(values)):
+            return {}
+        fi, wi = np.unravel_index(np.nanargmax(values), values.shape)
+        return {"window": int(self.windows[wi]), "fee_bps": float(self.fees_bps[fi]), "sharpe": float(self.sharpe[fi, wi]), "total_return": float(self.total_return[fi, wi])}
+
+
+def momentum_grid(prices: pd.Series, windows: Sequence[int] = DEFAULT_WINDOWS, fees_bps: Sequence[float] = DEFAULT_FEES_BPS, chunk: int = 32) -> MomentumGrid:
+    """
+    Long/flat momentum (invested when the N-period return up to t-1 is > 0) for every window and
+    fee at once. Positions are a (windows x time) boolean array built per chunk of windows.
+    Fees only change returns on trade bars, so each fee reuses the window's moments:
+      mean(net) = mean(g) - f mean(turnover),  var(net) = var(g) + f^2 var(t) - 2 f cov(g, t)
+    and the compounded return only needs a correction on the (sparse) trade bars.
+    Same definitions as the dashboard (Sharpe with ddof=0, periods/year inferred from the index).
+    """
+    s = prices.to_numpy(dtype=float)
+    n = len(s)
+    W = np.asarray(list(windows), dtype=int)
+    F = np.asarray(list(fees_bps), dtype=float)
+    f = F / 10_000.0
+
+    ret = np.zeros(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret[1:] = s[1:] / s[:-1] - 1.0
+    ret = np.nan_to_num(ret, nan=0.0, posinf=0.0, neginf=0.0)
+    ret2 = ret * ret
+    log1p_ret = np.log1p(ret)
+    prev = np.concatenate(([np.nan], s[:-1]))
+    t_idx = np.arange(n)
+
+    mean_g = np.empty(len(W))
+    var_g = np.empty(len(W))
+    mean_t = np.empty(len(W))
+    var_t = np.empty(len(W))
+    cov_gt = np.empty(len(W))
+    log_g = np.empty(len(W))
+    n_trades = np.empty(len(W), dtype=int)
+    adj = np.zeros((len(F), len(W)))
+
+    for lo in range(0, len(W), chunk):
+        wc = W[lo:lo + chunk]
+        lag = t_idx[None, :] - 1 - wc[:, None]
+        lagged = np.where(lag >= 0, s[np.maximum(lag, 0)], np.nan)
+        with np.errstate(invalid="ignore"):
+            pos = prev[None, :] > lagged  # NaN comparisons are False -> flat
+
+        # g = pos * ret is never materialized: its sums are matrix-vector products
+        posf = pos.astype(float)
+        sl = slice(lo, lo + len(wc))
+        mean_g[sl] = posf @ ret / n
+        var_g[sl] = posf @ ret2 / n - mean_g[sl] ** 2
+        log_g[sl] = posf @ log1p_ret
+
+        # Turnover is 0/1 and sparse: work on the trade bars only
+        rows, cols = np.nonzero(pos[:, 1:] != pos[:, :-1])
+        cols = cols + 1
+        g_trade = np.where(pos[rows, cols], ret[cols], 0.0)
+        trades = np.bincount(rows, minlength=len(wc))
+        n_trades[sl] = trades
+        mean_t[sl] = trades / n
+        var_t[sl] = mean_t[sl] * (1.0 - mean_t[sl])
+        cov_gt[sl] = np.bincount(rows, weights=g_trade, minlength=len(wc)) / n - mean_g[sl] * mean_t[sl]
+
+        base = np.log1p(g_trade)
+        for fi, fee in enumerate(f):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                adj[fi, sl] = np.bincount(rows, weights=np.log1p(g_trade - fee) - base, minlength=len(wc))
+
+    ppy = infer_periods_per_year(prices.index)
+    mean = mean_g[None, :] - f[:, None] * mean_t[None, :]
+    var = var_g[None, :] + (f ** 2)[:, None] * var_t[None, :] - 2.0 * f[:, None] * cov_gt[None, :]
+    std = np.sqrt(np.maximum(var, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where((std > 0) & (ppy > 0), mean / std * np.sqrt(ppy), np.nan)
+
+    total_return = np.expm1(log_g[None, :] + adj)
+    return MomentumGrid(windows=W, fees_bps=F, sharpe=sharpe, total_return=total_return, n_trades=n_trades)
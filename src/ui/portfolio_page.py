@@ -2,41 +2,100 @@ from __future__ import annotations
 
 from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from data.market_data import get_prices
-from portfolio.backtest import backtest_portfolio
-from portfolio.metrics import (annualized_return, annualized_vol, correlation_matrix, diversification_effect, max_drawdown, portfolio_daily_returns, sharpe_ratio,)
-from portfolio.plots import plot_corr_heatmap, plot_cum_returns, plot_prices_and_portfolio
+from data.result_cache import shared_cache
+from data.result_store import ResultStore
+from data.universe import BUILTIN, SymbolIndex
+from portfolio.backtest import backtest_portfolio, compute_returns
+from portfolio.downsample import DEFAULT_MAX_POINTS
+from portfolio.event_backtest import CostModel, RebalanceRule, backtest_events
+from portfolio.metrics import (correlation_matrix, diversification_effect, fused_metrics, portfolio_daily_returns,)
+from portfolio.monte_carlo import simulate_risk
+from portfolio.optimize import OPTIMIZERS, covariance_model, efficient_frontier, optimize_weights
+from portfolio.plots import plot_corr_heatmap, plot_cum_returns, plot_distribution, plot_efficient_frontier, plot_prices_and_portfolio, plot_rolling_metrics
+from portfolio.rolling import rolling_corr, rolling_drawdown, rolling_max_drawdown, rolling_sharpe, rolling_vol
+from portfolio.walk_forward import walk_forward
+from precompute import DEFAULT_PORTFOLIO_PERIOD, DEFAULT_PORTFOLIO_REBALANCE, DEFAULT_PORTFOLIO_TICKERS, format_age, lookup, portfolio_inputs, portfolio_view
 
 
-ASSET_UNIVERSE = [
-    "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA",
-    "SPY", "QQQ", "GLD", "BTC-USD", "ETH-USD",
-]
+# Suggested assets; any symbol of the index can be searched and added
+ASSET_UNIVERSE = BUILTIN["symbol"].tolist()
+
+# Above this many assets the rolling correlation is computed for the chosen date only
+ROLLING_CORR_MAX_ASSETS = 50
+
+
+@st.cache_resource
+def result_store() -> ResultStore:
+    # Default views written by `python src/app.py precompute`
+    return ResultStore()
+
+
+@st.cache_resource(ttl=86_400, show_spinner=False)
+def symbol_index() -> SymbolIndex:
+    return SymbolIndex.load()
 
 
-@st.cache_data(ttl=300, show_spinner=False)  # refresh every 5 minutes
 def cached_prices(tickers: List[str], period: str) -> pd.DataFrame:
+    # The price cache keeps one series per ticker (disk + memory): a new selection is assembled
+    # from cached columns and only the missing tickers are downloaded, in concurrent batches
     return get_prices(tickers, period=period, interval="1d")
 
 
+def _add_symbols() -> None:
+    extra = [t.strip().upper() for t in st.session_state.get("add_symbols", "").replace(";", ",").split(",") if t.strip()]
+    st.session_state["tickers"] = list(dict.fromkeys(st.session_state.get("tickers", []) + extra))
+    st.session_state["add_symbols"] = ""
+
+
 def render_portfolio_page() -> None:
     st.title("Quant Dashboard — Portfolio (Quant B)")
     st.subheader("Multi-Asset Portfolio")
 
     #Inputs
-    tickers = st.multiselect("Choose at least 3 assets", options=ASSET_UNIVERSE, default=["AAPL", "MSFT", "GOOGL"],)
+    index = symbol_index()
+    st.session_state.setdefault("tickers", list(DEFAULT_PORTFOLIO_TICKERS))
+
+    qcol, acol = st.columns(2)
+    with qcol:
+        query = st.text_input(f"Search {len(index):,} symbols (ticker or name)", value="")
+    with acol:
+        st.text_input("Add symbols (comma-separated)", key="add_symbols", on_change=_add_symbols)
+
+    found = index.search(query, limit=50)["symbol"].tolist() if query else []
+    options = list(dict.fromkeys(st.session_state["tickers"] + found + ASSET_UNIVERSE))
+    tickers = st.multiselect("Choose at least 3 assets", options=options, key="tickers", format_func=index.label if len(options) <= 500 else str)
 
     if len(tickers) < 3:
         st.warning("Select at least 3 assets to build the portfolio.")
         return
 
-    period = st.selectbox("Data window", ["6mo", "1y", "2y", "5y"], index=2)
-    rebalance = st.selectbox("Rebalancing", ["Never", "Weekly", "Monthly", "Quarterly"], index=2)
+    periods = ["6mo", "1y", "2y", "5y"]
+    rebalances = ["Never", "Weekly", "Monthly", "Quarterly"]
+    period = st.selectbox("Data window", periods, index=periods.index(DEFAULT_PORTFOLIO_PERIOD))
+    rebalance = st.selectbox("Rebalancing", rebalances, index=rebalances.index(DEFAULT_PORTFOLIO_REBALANCE))
+
+    bcol, ccol, scol = st.columns(3)
+    with bcol:
+        band_pct = st.number_input("Drift band (% points, 0 = off)", min_value=0.0, max_value=50.0, value=0.0, step=0.5)
+    with ccol:
+        commission_bps = st.number_input("Commission (bps per trade)", min_value=0.0, max_value=100.0, value=0.0, step=1.0)
+    with scol:
+        spread_bps = st.number_input("Bid/ask spread (bps)", min_value=0.0, max_value=200.0, value=0.0, step=1.0)
 
-    weight_mode = st.radio("Weights", ["Equal", "Custom"], horizontal=True)
+    weight_mode = st.radio("Weights", ["Equal", "Custom", *OPTIMIZERS], horizontal=True)
+    cov_method = "sample"
+    if weight_mode in OPTIMIZERS:
+        cov_label = st.selectbox("Covariance estimator", ["Sample", "Ledoit-Wolf shrinkage"], index=0)
+        cov_method = "sample" if cov_label == "Sample" else "ledoit_wolf"
+        walk = st.checkbox("Re-optimize at each rebalance (walk-forward)", value=False)
+        lookback = st.select_slider("Lookback (days)", options=[63, 126, 252], value=126) if walk else 0
+    else:
+        walk, lookback = False, 0
 
     #Weights
     weights: Dict[str, float] = {}
@@ -44,6 +103,8 @@ def render_portfolio_page() -> None:
         w = 1.0 / len(tickers)
         weights = {t: w for t in tickers}
         st.caption(f"Equal weights: {w*100:.2f}% per asset")
+    elif weight_mode in OPTIMIZERS:
+        st.caption(f"{weight_mode} weights are computed from the selected data window (long-only).")
     else:
         cols = st.columns(min(4, len(tickers)))
         raw: Dict[str, float] = {}
@@ -73,8 +134,37 @@ def render_portfolio_page() -> None:
         st.error("No data returned. Try different tickers or a different time window.")
         return
 
-    #Backtest
-    res = backtest_portfolio(prices=prices, weights=weights, initial_value=100.0, rebalance=rebalance)
+    asset_rets = compute_returns(prices)
+    if asset_rets.empty:
+        st.error("Not enough price history to compute returns.")
+        return
+
+    # Annualized mean / covariance, cached per (tickers, period) with their factorizations
+    model = covariance_model(asset_rets, key=(tuple(tickers), period), method=cov_method)
+
+    if weight_mode in OPTIMIZERS:
+        weights = optimize_weights(model, weight_mode)
+        weights_df = pd.DataFrame({"Ticker": list(weights.keys()), "Weight (%)": [round(v * 100, 2) for v in weights.values()]})
+        st.dataframe(weights_df, use_container_width=True)
+
+    #Backtest (memoized by content of prices + parameters, shared by every session of the server)
+    results = shared_cache()
+    if walk:
+        res = results.call(walk_forward, prices, objective=weight_mode, lookback=lookback, rebalance=rebalance, initial_value=100.0, method=cov_method)
+        st.caption(f"Walk-forward: {len(res.targets)} re-optimizations on a trailing {lookback}-day window (no drift band / costs).")
+    elif band_pct > 0 or commission_bps > 0 or spread_bps > 0:
+        rule = RebalanceRule(calendar=rebalance, band=band_pct / 100.0 if band_pct > 0 else None)
+        res = results.call(backtest_events, prices=prices, weights=weights, initial_value=100.0, rule=rule, costs=CostModel(commission_bps=commission_bps, spread_bps=spread_bps))
+        st.caption(f"{len(res.events)} rebalances, turnover {res.total_turnover*100:.1f}%, costs {res.total_costs:.2f} (initial value 100)")
+    else:
+        # Precomputed default view when it was built from exactly these prices and weights
+        pre = lookup(result_store(), portfolio_view(tickers, period, rebalance), portfolio_inputs(prices, weights, rebalance))
+        if pre is not None:
+            res = pre.value
+            st.caption(f"Precomputed {format_age(pre.age_s())} ago on the current prices.")
+        else:
+            res = results.call(backtest_portfolio, prices=prices, weights=weights, initial_value=100.0, rebalance=rebalance)
+            st.caption("Computed on demand.")
 
     if res.portfolio_value.empty:
         st.error("Backtest failed (empty results).")
@@ -83,13 +173,11 @@ def render_portfolio_page() -> None:
     #Metrics
     port_rets = portfolio_daily_returns(res.portfolio_value)
 
-    ann_ret = annualized_return(res.portfolio_value)
-    ann_vol = annualized_vol(port_rets)
-    sharpe = sharpe_ratio(port_rets)
-    mdd = max_drawdown(res.portfolio_value)
+    m = fused_metrics(res.portfolio_value)
+    ann_ret, ann_vol, sharpe, mdd = m["ann_return"], m["ann_vol"], m["sharpe"], m["max_drawdown"]
 
     corr = correlation_matrix(res.returns)
-    cov = res.returns.cov() * 252 if not res.returns.empty else pd.DataFrame()
+    cov = model.cov_frame
 
     last_w = res.weights_history.iloc[-1] if not res.weights_history.empty else pd.Series(weights)
     div_eff = diversification_effect(last_w, cov) if not cov.empty else float("nan")
@@ -103,7 +191,74 @@ def render_portfolio_page() -> None:
 
     st.divider()
 
-    #Charts
-    st.plotly_chart(plot_prices_and_portfolio(res.prices, res.portfolio_value), use_container_width=True)
-    st.plotly_chart(plot_cum_returns(res.returns, port_rets), use_container_width=True)
+    #Charts (each line downsampled to the chart width unless full resolution is asked for)
+    gcol1, gcol2 = st.columns(2)
+    with gcol1:
+        full_res = st.checkbox("Full resolution", value=False)
+    with gcol2:
+        use_gl = st.checkbox("WebGL traces", value=len(res.returns.columns) > 20)
+    max_points = None if full_res else DEFAULT_MAX_POINTS
+
+    st.plotly_chart(plot_prices_and_portfolio(res.prices, res.portfolio_value, max_points=max_points, use_gl=use_gl), use_container_width=True)
+    st.plotly_chart(plot_cum_returns(res.returns, port_rets, max_points=max_points, use_gl=use_gl), use_container_width=True)
     st.plotly_chart(plot_corr_heatmap(corr), use_container_width=True)
+
+    #Efficient frontier
+    if st.checkbox("Show efficient frontier", value=False):
+        frontier = efficient_frontier(model, n_points=100)
+        points = pd.DataFrame({name: model.stats(np.fromiter(optimize_weights(model, name).values(), dtype=float)) for name in OPTIMIZERS}).T
+        points.loc["Current"] = model.stats(pd.Series(weights).reindex(model.tickers).fillna(0.0).to_numpy())
+        st.plotly_chart(plot_efficient_frontier(frontier.frame(), points), use_container_width=True)
+        st.dataframe(points.style.format({"ann_return": "{:.2%}", "ann_vol": "{:.2%}", "sharpe": "{:.2f}", "diversification": "{:.4f}"}), use_container_width=True)
+
+    #Forward risk
+    if st.checkbox("Forward risk (Monte Carlo)", value=False):
+        mc1, mc2, mc3 = st.columns(3)
+        with mc1:
+            mc_method = st.selectbox("Simulation", ["Block bootstrap", "Multivariate normal"], index=0)
+        with mc2:
+            horizon = st.select_slider("Horizon (days)", options=[21, 63, 126, 252], value=252)
+        with mc3:
+            n_paths = st.select_slider("Paths", options=[1_000, 10_000, 50_000], value=10_000)
+
+        sim = results.call(simulate_risk, res.returns, weights=weights, horizon=horizon, n_paths=n_paths, method="bootstrap" if mc_method == "Block bootstrap" else "normal", seed=0)
+        summary = sim.summary()
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("VaR 95%", f"{summary['VaR 95%']*100:.2f}%")
+        r2.metric("CVaR 95%", f"{summary['CVaR 95%']*100:.2f}%")
+        r3.metric("Median terminal value", f"{summary['terminal_p50']:.2f}")
+        r4.metric("Median max drawdown", f"{summary['max_drawdown_median']*100:.2f}%")
+        st.plotly_chart(plot_distribution(sim.horizon_return, f"Horizon return over {horizon} days ({sim.n_paths:,} paths)", "Return", markers={"VaR 95%": -summary["VaR 95%"]}, tickformat=".0%"), use_container_width=True)
+        st.plotly_chart(plot_distribution(sim.max_drawdown, "Max drawdown distribution", "Max drawdown", tickformat=".0%"), use_container_width=True)
+        st.caption(f"Simulated at {sim.paths_per_sec:,.0f} paths/sec (constant-mix portfolio, seed 0).")
+
+    #Rolling analytics
+    st.divider()
+    st.subheader("Rolling analytics")
+
+    window = st.select_slider("Rolling window (days)", options=[20, 63, 126, 252], value=63)
+    if len(port_rets) <= window:
+        st.info("Not enough history for this rolling window.")
+        return
+
+    roll_risk = pd.DataFrame({"Sharpe": rolling_sharpe(port_rets, window), "Vol (ann.)": rolling_vol(port_rets, window)}).dropna()
+    st.plotly_chart(plot_rolling_metrics(roll_risk[["Sharpe"]], f"Rolling Sharpe ({window}d)", "Sharpe", max_points=max_points, use_gl=use_gl), use_container_width=True)
+    st.plotly_chart(plot_rolling_metrics(roll_risk[["Vol (ann.)"]], f"Rolling Volatility ({window}d)", "Vol", tickformat=".0%", max_points=max_points, use_gl=use_gl), use_container_width=True)
+
+    roll_dd = pd.DataFrame({"Drawdown": rolling_drawdown(res.portfolio_value, window), "Max drawdown": rolling_max_drawdown(res.portfolio_value, window)}).dropna()
+    st.plotly_chart(plot_rolling_metrics(roll_dd, f"Rolling Drawdown ({window}d)", "Drawdown", tickformat=".0%", max_points=max_points, use_gl=use_gl), use_container_width=True)
+
+    if len(res.returns.columns) <= ROLLING_CORR_MAX_ASSETS:
+        roll_corr = rolling_corr(res.returns, window)
+        corr_dates = list(roll_corr.index.date)
+        corr_end = st.select_slider("Correlation window ending", options=corr_dates, value=corr_dates[-1])
+        corr_at = roll_corr.at(corr_end)
+    else:
+        # The (dates x assets x assets) tensor would not fit: one window, on demand
+        corr_dates = list(res.returns.index[window - 1:].date)
+        corr_end = st.select_slider("Correlation window ending", options=corr_dates, value=corr_dates[-1])
+        corr_at = correlation_matrix(res.returns.loc[:pd.Timestamp(corr_end)].tail(window))
+    st.plotly_chart(plot_corr_heatmap(corr_at, title=f"Rolling Correlation ({window}d, ending {corr_end})"), use_container_width=True)
+
+    stats = results.stats()
+    st.caption(f"Server result cache: {stats['entries']} entries, {stats['mb']:.0f}/{stats['max_mb']:.0f} MB, hit rate {stats['hit_rate']*100:.0f}%, {stats['saved_s']:.1f}s of compute saved.")
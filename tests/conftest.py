@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Same import root as the app (streamlit run src/dashboard.py, python src/app.py): src/ on sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
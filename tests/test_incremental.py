@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio.backtest import backtest_portfolio
+from portfolio.incremental import IncrementalBacktest
+from portfolio.metrics import annualized_return, annualized_vol, max_drawdown, portfolio_daily_returns, sharpe_ratio
+
+TICKERS = ["A", "B", "C"]
+WEIGHTS = {"A": 0.5, "B": 0.3, "C": 0.2}
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    steps = rng.normal(0.0003, 0.015, size=(400, len(TICKERS)))
+    return pd.DataFrame(100.0 * np.exp(np.cumsum(steps, axis=0)), index=pd.bdate_range("2024-01-02", periods=400), columns=TICKERS)
+
+
+def _backtest(root, name="p") -> IncrementalBacktest:
+    return IncrementalBacktest(root, name, TICKERS, WEIGHTS, "Monthly", 100.0, "2y")
+
+
+def _assert_matches_full(bt: IncrementalBacktest, prices: pd.DataFrame) -> None:
+    expected = backtest_portfolio(prices, weights=WEIGHTS, initial_value=100.0, rebalance="Monthly").portfolio_value
+    values = bt.values()
+    assert list(values.index) == list(expected.index)
+    np.testing.assert_allclose(values.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+    summary = bt.summary()
+    rets = portfolio_daily_returns(expected)
+    assert summary["last_date"] == expected.index[-1].date().isoformat()
+    assert summary["portfolio_last_value"] == pytest.approx(expected.iloc[-1], rel=1e-12)
+    assert summary["ann_return"] == pytest.approx(annualized_return(expected), rel=1e-9)
+    assert summary["ann_vol"] == pytest.approx(annualized_vol(rets), rel=1e-9)
+    assert summary["sharpe"] == pytest.approx(sharpe_ratio(rets), rel=1e-9)
+    assert summary["max_drawdown"] == pytest.approx(max_drawdown(expected), rel=1e-9)
+
+
+def test_advance_in_steps_matches_full_backtest(tmp_path, prices):
+    bt = _backtest(tmp_path)
+    for end in (50, 51, 120, 120, 260, 400):
+        bt.advance(prices.iloc[:end])
+    _assert_matches_full(bt, prices)
+
+    # A new instance resumes from the checkpoint on disk
+    resumed = _backtest(tmp_path)
+    assert resumed.advance(prices).empty
+    _assert_matches_full(resumed, prices)
+
+
+def test_restate_without_checkpoint_seeds(tmp_path, prices):
+    bt = _backtest(tmp_path)
+    assert bt.checkpoint is None
+    bt.restate(prices.index[100], prices)
+    _assert_matches_full(bt, prices)
+
+
+def test_restate_mid_history(tmp_path, prices):
+    bt = _backtest(tmp_path)
+    bt.advance(prices.iloc[:300])
+
+    corrected = prices.copy()
+    corrected.iloc[180:, 1] *= 1.03  # vendor correction from bar 180 on
+    bt.restate(corrected.index[180], corrected)
+    _assert_matches_full(bt, corrected)
+
+
+def test_rebased_history_then_restate(tmp_path, prices):
+    bt = _backtest(tmp_path)
+    bt.advance(prices.iloc[:300])
+
+    # 10:1 split re-adjusted by the source: same returns, new price basis
+    rebased = prices.copy()
+    rebased["A"] /= 10.0
+    bt.advance(rebased.iloc[:340])
+    _assert_matches_full(bt, prices.iloc[:340])
+
+    bt.restate(rebased.index[250], rebased)
+    _assert_matches_full(bt, prices)
+
+
+def test_partial_last_bar_is_restated(tmp_path, prices):
+    bt = _backtest(tmp_path)
+    partial = prices.iloc[:200].copy()
+    partial.iloc[-1] *= 0.98
+    bt.advance(partial)
+    bt.advance(prices)
+    _assert_matches_full(bt, prices)
+
+
+def test_definition_change_starts_over(tmp_path, prices):
+    _backtest(tmp_path).advance(prices.iloc[:100])
+    assert IncrementalBacktest(tmp_path, "p", TICKERS, WEIGHTS, "Monthly", 100.0, "5y").checkpoint is None
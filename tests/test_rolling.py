@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio.metrics import max_drawdown
+from portfolio.rolling import rolling_max_drawdown
+
+
+@pytest.mark.parametrize("n, window", [(500, 1), (500, 7), (500, 60), (503, 252), (252, 252), (100, 252)])
+def test_rolling_max_drawdown_matches_each_window(n, window):
+    rng = np.random.default_rng(n + window)
+    values = pd.Series(100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, n))), index=pd.bdate_range("2020-01-01", periods=n))
+    values[rng.random(n) < 0.03] = np.nan
+
+    got = rolling_max_drawdown(values, window)
+    assert got.iloc[:window - 1].isna().all()
+    expected = [max_drawdown(values.iloc[i - window + 1:i + 1]) for i in range(window - 1, n)]
+    np.testing.assert_allclose(got.iloc[window - 1:].to_numpy(), expected, rtol=0, atol=1e-12)
+
+
+def test_rolling_max_drawdown_per_column():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, (300, 3)), axis=0)), columns=["A", "B", "C"])
+    got = rolling_max_drawdown(frame, 40)
+    for col in frame.columns:
+        pd.testing.assert_series_equal(got[col], rolling_max_drawdown(frame[col], 40))